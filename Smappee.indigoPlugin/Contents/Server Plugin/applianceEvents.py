@@ -0,0 +1,197 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Appliance Events © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import collections
+import datetime
+import logging
+import sys
+import threading
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeApplianceEventEngine:
+
+    # This class updates the Smappee Appliance devices of a service location from a batch of Smappee appliance events.
+    # The target states of every appliance are first derived from the whole batch (in timestamp order) and then only the
+    # states that differ from the device's current states are written to the Indigo server.
+    # The events endpoint returns overlapping time ranges, so events already seen are dropped before any device is looked up
+
+    def __init__(self, pluginGlobals):
+
+        self.globals = pluginGlobals
+
+        self.applianceEventsLogger = logging.getLogger("Plugin.applianceEvents")
+        self.tracer = self.globals[TRACER]
+
+        self.stateImages = dict()  # Per device id, state image last written (device state images can't be read back)
+        self.lastRecordedTimestamps = dict()  # Per device id, timestamp of the newest event recorded (seeded from the device state by seed_device)
+        self.seenEvents = dict()  # Per service location, OrderedDict of recent (Smappee appliance id, timestamp) pairs - least recently seen first
+        self.duplicateEvents = 0
+
+        self.writesLock = threading.Lock()
+        self.statesWritten = 0
+        self.writesAvoided = 0
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.applianceEventsLogger.error(log_message)
+
+    def process_events(self, serviceLocationId, events):
+        # Returns True if the batch contained any events not previously recorded
+        try:
+            events = self.unseen_events(serviceLocationId, events)
+
+            applianceDevIds = dict()  # Smappee appliance id -> Indigo device id, for the service location's appliance devices
+            if serviceLocationId in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]:
+                for applianceId, appliance in list(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][APPLIANCE_IDS].items()):  # Snapshot: deviceStartComm also adds appliances
+                    if appliance[DEV_ID] != 0 and appliance[DEV_ID] in indigo.devices:
+                        applianceDevIds[applianceId] = appliance[DEV_ID]
+
+            # Default target: no events (as if the appliance isn't in the batch)
+            targets = dict()
+            for devId in applianceDevIds.values():
+                targets[devId] = dict(states={"smappeeApplianceEventStatus": ("NONE", "No Events")}, image=indigo.kStateImageSel.EnergyMeterOff)
+
+            newEvents = False
+            appliedEvents = list()  # Events for the location's appliance devices - remembered as seen once their states have been written
+            lastRecordedTimestamps = dict()  # Per device id, newest event timestamp in this batch - kept once the states have been written
+            for event in sorted(events, key=lambda k: k['timestamp']):
+                applianceId = f"A00{event['applianceId'][-3:]}"
+                if applianceId not in applianceDevIds:
+                    continue  # Not remembered as seen, so it is processed once the appliance's device has been created
+                devId = applianceDevIds[applianceId]
+                appliedEvents.append(event)
+
+                # Only process events newer than the last one recorded (events are processed in timestamp order)
+                eventTimestamp = float(event['timestamp'])
+                lastRecordedTimestamp = lastRecordedTimestamps.get(devId, self.lastRecordedTimestamps.get(devId))
+                if lastRecordedTimestamp is None:
+                    lastRecordedTimestamp = self.seed_device(indigo.devices[devId])
+                if eventTimestamp <= lastRecordedTimestamp:
+                    continue
+                lastRecordedTimestamps[devId] = eventTimestamp
+                newEvents = True
+
+                dev = indigo.devices[devId]
+                target = targets[devId]
+
+                activePower = event['activePower']
+                activePowerStr = f"{int(activePower)} W"
+
+                eventTimestampStr = datetime.datetime.fromtimestamp(int(eventTimestamp / 1000)).strftime('%Y-%b-%d %H:%M:%S')
+                target["states"]["smappeeApplianceEventLastRecordedTimestamp"] = (eventTimestamp, eventTimestampStr)
+                if dev.pluginProps["SupportsEnergyMeterCurPower"]:
+                    target["states"]["curEnergyLevel"] = (activePower, activePowerStr)
+                if dev.pluginProps["showApplianceEventStatus"]:
+                    target["states"]["smappeeApplianceEventStatus"] = ("UP" if activePower > 0.0 else "DOWN", activePowerStr)
+                target["image"] = indigo.kStateImageSel.EnergyMeterOn
+
+                if not dev.pluginProps["hideApplianceSmappeeEvents"]:
+                    eventTimeStr = datetime.datetime.fromtimestamp(int(eventTimestamp / 1000)).strftime('%H:%M:%S')
+                    self.applianceEventsLogger.info(f"recorded Smappee Appliance '{dev.name}' event at [{eventTimeStr}], reading: {activePowerStr}")
+
+            statesWritten = 0
+            writesAvoided = 0
+            for devId, target in targets.items():
+                written, avoided = self.write_changed_states(indigo.devices[devId], target)
+                statesWritten += written
+                writesAvoided += avoided
+
+            # The batch has been applied
+            self.lastRecordedTimestamps.update(lastRecordedTimestamps)
+            self.remember_events(serviceLocationId, appliedEvents)
+
+            with self.writesLock:
+                self.statesWritten += statesWritten
+                self.writesAvoided += writesAvoided
+
+            self.tracer.debug(self.applianceEventsLogger, "Location [{}]: {} unseen events for {} appliances, {} states written, {} writes avoided",
+                              serviceLocationId, len(events), len(targets), statesWritten, writesAvoided)
+
+            return newEvents
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return False
+
+    def unseen_events(self, serviceLocationId, events):
+        # Returns the events not already seen for the service location, in the order received
+        seenEvents = self.seenEvents.setdefault(serviceLocationId, collections.OrderedDict())
+        unseenEvents = list()
+        for event in events:
+            eventKey = (event['applianceId'], event['timestamp'])
+            if eventKey in seenEvents:
+                seenEvents.move_to_end(eventKey)
+                continue
+            unseenEvents.append(event)
+
+        with self.writesLock:
+            self.duplicateEvents += len(events) - len(unseenEvents)
+
+        return unseenEvents
+
+    def remember_events(self, serviceLocationId, events):
+        # Called once the events have been applied, so that an event is never dropped as seen if handling its batch failed
+        seenEvents = self.seenEvents.setdefault(serviceLocationId, collections.OrderedDict())
+        for event in events:
+            seenEvents[(event['applianceId'], event['timestamp'])] = True
+            if len(seenEvents) > SMAPPEE_EVENT_DEDUP_CACHE_SIZE:
+                seenEvents.popitem(last=False)
+
+    def write_changed_states(self, dev, target):
+        # Returns (states written, writes avoided) for the device
+        written = 0
+        avoided = 0
+        for key, (value, uiValue) in target["states"].items():
+            if dev.states.get(key) == value and dev.states.get(f"{key}.ui", uiValue) == uiValue:
+                avoided += 1
+                continue
+            dev.updateStateOnServer(key, value, uiValue=uiValue)
+            written += 1
+
+        if self.stateImages.get(dev.id) == target["image"]:
+            avoided += 1
+        else:
+            dev.updateStateImageOnServer(target["image"])
+            self.stateImages[dev.id] = target["image"]
+            written += 1
+
+        return written, avoided
+
+    def seed_device(self, dev):
+        # Called from deviceStartComm - the device state is only read once, afterwards the timestamp is maintained here. Returns the seeded timestamp
+        try:
+            lastRecordedTimestamp = float(dev.states['smappeeApplianceEventLastRecordedTimestamp'])
+        except (KeyError, ValueError):
+            lastRecordedTimestamp = 0.0
+        self.lastRecordedTimestamps[dev.id] = lastRecordedTimestamp
+        return lastRecordedTimestamp
+
+    def state_image_written(self, devId, stateImage):
+        # Called when the device's state image is written other than by the engine (e.g. by deviceStartComm)
+        self.stateImages[devId] = stateImage
+
+    def forget_device(self, devId):
+        # Called when a device's comms are stopped as its state image may then be changed elsewhere
+        self.stateImages.pop(devId, None)
+        self.lastRecordedTimestamps.pop(devId, None)
@@ -0,0 +1,197 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Backfill © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import concurrent.futures
+import datetime
+import logging
+import queue
+import sys
+import threading
+import time
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class ThreadBackfill(threading.Thread):
+
+    # This class fills gaps in the consumption history (e.g. whilst the plugin wasn't running) by fetching the missing readings from Smappee.
+    # It also periodically checks the stored 5 minute history for missing readings and re-fetches just those.
+    # It only writes to the history store - device states are left to live polling, whose requests it doesn't hold up
+
+    def __init__(self, pluginGlobals, event):
+
+        threading.Thread.__init__(self)
+
+        self.globals = pluginGlobals
+        self.threadStop = event
+
+        self.backfillLogger = logging.getLogger("Plugin.backfill")
+
+        self.backfillQueue = queue.Queue()  # [serviceLocationId, utc (ms) up to which the history is to be filled]
+
+        self.requestsSent = 0
+        self.readingsBackfilled = 0
+
+        self.nextRepairTime = time.monotonic() + SMAPPEE_REPAIR_INTERVAL_SECONDS
+        self.repairAttempted = dict()  # Per service location gaps already re-fetched (Smappee has no readings for e.g. periods the monitor was offline)
+        self.coverage = dict()  # Per service location [readings stored, readings expected] in the 5 minute history last checked
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.backfillLogger.error(log_message)
+
+    def run(self):
+        try:
+            while not self.threadStop.is_set():
+                try:
+                    service_location_id, to_utc = self.backfillQueue.get(True, SMAPPEE_BACKFILL_QUEUE_WAIT_SECONDS)
+                    self.backfill(service_location_id, to_utc)
+                except queue.Empty:
+                    pass
+
+                if time.monotonic() >= self.nextRepairTime:
+                    self.nextRepairTime = time.monotonic() + SMAPPEE_REPAIR_INTERVAL_SECONDS
+                    if self.globals[HISTORY_STORE].enabled:
+                        for service_location_id in list(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID].keys()):
+                            self.repair(str(service_location_id))
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+        self.backfillLogger.debug(f"Backfill Thread ended.")
+
+    def request_backfill(self, service_location_id, to_utc):
+        # Called when live polling restarts its readings from to_utc - the history between the newest stored reading and to_utc is then filled
+        if self.globals[HISTORY_STORE].enabled:
+            self.backfillQueue.put([service_location_id, int(to_utc)])
+
+    def backfill(self, service_location_id, to_utc):
+        try:
+            latestReadingTime = self.globals[HISTORY_STORE].latest_reading_time(service_location_id, to_utc)
+            if latestReadingTime is None:
+                self.backfillLogger.debug(f"Location [{service_location_id}]: no consumption history stored yet - nothing to backfill")
+                return
+
+            from_utc = max(int(latestReadingTime) + 1, to_utc - (SMAPPEE_BACKFILL_MAXIMUM_DAYS * SMAPPEE_MILLISECONDS_PER_DAY))
+            chunks = self.plan_chunks(from_utc, to_utc, int(time.time() * 1000))
+            if len(chunks) == 0:
+                return
+
+            from_ui = datetime.datetime.fromtimestamp(from_utc / 1000).strftime("%Y-%m-%d %H:%M")
+            to_ui = datetime.datetime.fromtimestamp(to_utc / 1000).strftime("%Y-%m-%d %H:%M")
+            self.backfillLogger.info(f"Location [{service_location_id}]: backfilling consumption history from {from_ui} to {to_ui} [{len(chunks)} requests]")
+
+            backfill_start_time = time.time()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(chunks), SMAPPEE_BACKFILL_WORKERS)) as executor:
+                readingsStored = sum(executor.map(lambda chunk: self.fetch_chunk(service_location_id, *chunk), chunks))
+
+            self.readingsBackfilled += readingsStored
+            self.backfillLogger.info(f"Location [{service_location_id}]: backfilled {readingsStored} consumption readings in {time.time() - backfill_start_time:.1f} seconds")
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def plan_chunks(self, from_utc, to_utc, now_utc):
+        # Splits the gap into [aggregation, from, to] requests: 5 minute values where Smappee still has them, coarser values further back
+        chunks = list()
+        fiveMinuteStartUtc = now_utc - (SMAPPEE_BACKFILL_5_MINUTE_DAYS * SMAPPEE_MILLISECONDS_PER_DAY)
+        hourlyStartUtc = now_utc - (SMAPPEE_BACKFILL_HOURLY_DAYS * SMAPPEE_MILLISECONDS_PER_DAY)
+
+        chunkFromUtc = from_utc
+        while chunkFromUtc < to_utc:
+            if chunkFromUtc >= fiveMinuteStartUtc:
+                aggregation, aggregationEndUtc = SMAPPEE_AGGREGATION_5_MINUTES, to_utc
+            elif chunkFromUtc >= hourlyStartUtc:
+                aggregation, aggregationEndUtc = SMAPPEE_AGGREGATION_HOURLY, min(to_utc, fiveMinuteStartUtc)
+            else:
+                aggregation, aggregationEndUtc = SMAPPEE_AGGREGATION_DAILY, min(to_utc, hourlyStartUtc)
+            chunkToUtc = min(chunkFromUtc + (SMAPPEE_BACKFILL_CHUNK_DAYS[aggregation] * SMAPPEE_MILLISECONDS_PER_DAY), aggregationEndUtc)
+            chunks.append([aggregation, chunkFromUtc, chunkToUtc])
+            chunkFromUtc = chunkToUtc
+
+        return chunks
+
+    def fetch_chunk(self, service_location_id, aggregation, from_utc, to_utc):
+        # Returns the number of readings stored
+        try:
+            if self.threadStop.is_set():
+                return 0
+
+            url = f"https://app1pub.smappee.net/dev/v3/servicelocation/{service_location_id}/consumption?aggregation={aggregation}&from={from_utc}&to={to_utc}"
+
+            self.requestsSent += 1
+            result_ok, reply = self.globals[THREADS][SMAPPEE_INTERFACE][THREAD].smappee_api_call(SMAPPEE_GET_API_CALL, url, reserve_tokens=SMAPPEE_BACKFILL_RESERVE_TOKENS)
+            if not result_ok:
+                return 0
+
+            return self.globals[HISTORY_STORE].store_consumption(service_location_id, reply.get("consumptions", list()), aggregation)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return 0
+
+    def repair(self, service_location_id):
+        # Checks the stored 5 minute history (between its first and newest readings in the repair window) and re-fetches any missing readings
+        try:
+            now_utc = int(time.time() * 1000)
+            readingTimes = self.globals[HISTORY_STORE].reading_times(service_location_id, SMAPPEE_AGGREGATION_5_MINUTES, now_utc - (SMAPPEE_REPAIR_DAYS * SMAPPEE_MILLISECONDS_PER_DAY), now_utc)
+            if len(readingTimes) == 0:
+                return
+
+            gaps, readingsExpected = self.find_gaps(readingTimes)
+            self.coverage[service_location_id] = [len(readingTimes), readingsExpected]
+
+            attempted = self.repairAttempted.setdefault(service_location_id, set())
+            gaps = [gap for gap in gaps if gap not in attempted]
+            if len(gaps) == 0:
+                return
+
+            chunks = list()
+            for gap_from_utc, gap_to_utc in gaps:
+                attempted.add((gap_from_utc, gap_to_utc))
+                chunks.extend(self.plan_chunks(gap_from_utc, gap_to_utc, now_utc))
+
+            self.backfillLogger.info(f"Location [{service_location_id}]: consumption history coverage {self.coverage_percent(service_location_id):.1f}% - re-fetching {len(gaps)} gaps [{len(chunks)} requests]")
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(chunks), SMAPPEE_BACKFILL_WORKERS)) as executor:
+                readingsStored = sum(executor.map(lambda chunk: self.fetch_chunk(service_location_id, *chunk), chunks))
+
+            self.readingsBackfilled += readingsStored
+            self.coverage[service_location_id][0] += readingsStored
+            self.backfillLogger.info(f"Location [{service_location_id}]: repaired {readingsStored} consumption readings - coverage now {self.coverage_percent(service_location_id):.1f}%")
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def find_gaps(self, readingTimes):
+        # readingTimes: ascending timestamps (utc ms) of stored 5 minute readings
+        # Returns ([(from, to) of each run of missing readings], number of readings expected between the first and last reading)
+        gaps = list()
+        for previousTime, readingTime in zip(readingTimes, readingTimes[1:]):
+            if readingTime - previousTime > SMAPPEE_READING_INTERVAL_MILLISECONDS:
+                gaps.append((previousTime + 1, readingTime - 1))
+        readingsExpected = ((readingTimes[-1] - readingTimes[0]) // SMAPPEE_READING_INTERVAL_MILLISECONDS) + 1
+        return gaps, readingsExpected
+
+    def coverage_percent(self, service_location_id):
+        readingsStored, readingsExpected = self.coverage.get(service_location_id, [0, 0])
+        return (100.0 * min(readingsStored, readingsExpected) / readingsExpected) if readingsExpected > 0 else 100.0
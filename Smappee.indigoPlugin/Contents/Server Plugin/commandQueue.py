@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Command Queue © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import collections
+import logging
+import queue
+import threading
+import time
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeCommandQueue:
+
+    # This class queues commands to be sent to Smappee, merging a command with an identical one that is still pending.
+    # Interactive commands (actuator ON / OFF, authentication) are held in their own lane and are always returned ahead of background polling work.
+    # It supports the subset of the queue.Queue interface used by the plugin: put, get, get_nowait, qsize and empty
+
+    def __init__(self):
+
+        self.commandQueueLogger = logging.getLogger("Plugin.commandQueue")
+
+        self.condition = threading.Condition()
+        self.pendingKeys = dict()  # Priority -> keys of pending commands in the order they were first queued
+        self.pendingKeys[PRIORITY_INTERACTIVE] = collections.deque()
+        self.pendingKeys[PRIORITY_BACKGROUND] = collections.deque()
+        self.pendingCommands = dict()  # Key -> [pending command, time first queued]
+
+        self.coalescedCount = 0  # Number of commands merged into an already pending command
+
+        self.queueWaitStatistics = dict()  # Priority -> [commands dequeued, total seconds waited, maximum seconds waited]
+        self.queueWaitStatistics[PRIORITY_INTERACTIVE] = [0, 0.0, 0.0]
+        self.queueWaitStatistics[PRIORITY_BACKGROUND] = [0, 0.0, 0.0]
+
+    def command_key(self, command):
+        # Commands are keyed by (command, serviceLocationId, actuator); ON and OFF for the same actuator share a key so that only the latest is sent
+        smappeeCommand = command[0]
+        if smappeeCommand == COMMAND_ON or smappeeCommand == COMMAND_OFF:
+            smappeeCommand = COMMAND_ON
+        service_location_id = command[1] if len(command) > 1 else None
+        actuator_id = command[2] if len(command) > 2 else None
+        return smappeeCommand, service_location_id, actuator_id
+
+    def command_priority(self, command):
+        return PRIORITY_INTERACTIVE if command[0] in SMAPPEE_INTERACTIVE_COMMANDS else PRIORITY_BACKGROUND
+
+    def put(self, command):
+        with self.condition:
+            key = self.command_key(command)
+            if key in self.pendingCommands:
+                self.pendingCommands[key][0] = command  # Latest wins (only differs for ON / OFF)
+                self.coalescedCount += 1
+                self.commandQueueLogger.debug(f"Command coalesced with pending command: {command}")
+            else:
+                self.pendingKeys[self.command_priority(command)].append(key)
+                self.pendingCommands[key] = [command, time.monotonic()]
+            self.condition.notify_all()
+
+    def get(self, block=True, timeout=None):
+        return self.get_from_lanes((PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND), block, timeout)
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def get_interactive(self, block=True, timeout=None):
+        # Only returns interactive commands - used to service them while a poll batch is in progress
+        return self.get_from_lanes((PRIORITY_INTERACTIVE,), block, timeout)
+
+    def get_from_lanes(self, priorities, block, timeout):
+        with self.condition:
+            def command_pending():
+                return any(len(self.pendingKeys[priority]) > 0 for priority in priorities)
+
+            if not block:
+                if not command_pending():
+                    raise queue.Empty
+            elif not self.condition.wait_for(command_pending, timeout):
+                raise queue.Empty
+
+            for priority in priorities:
+                if len(self.pendingKeys[priority]) > 0:
+                    key = self.pendingKeys[priority].popleft()
+                    command, queuedTime = self.pendingCommands.pop(key)
+
+                    waitedSeconds = time.monotonic() - queuedTime
+                    queueWaitStatistics = self.queueWaitStatistics[priority]
+                    queueWaitStatistics[0] += 1
+                    queueWaitStatistics[1] += waitedSeconds
+                    queueWaitStatistics[2] = max(queueWaitStatistics[2], waitedSeconds)
+
+                    return command
+
+    def qsize(self):
+        with self.condition:
+            return len(self.pendingCommands)
+
+    def empty(self):
+        return self.qsize() == 0
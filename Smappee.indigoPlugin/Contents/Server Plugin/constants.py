@@ -52,11 +52,18 @@ ACCESS_TOKEN = constant_id("ACCESS_TOKEN")
 ACCUMULATED_ENERGY_TOTAL = constant_id("ACCUMULATED_ENERGY_TOTAL")
 ACCUM_UNITS = constant_id("ACCUM_UNITS")
 ACTUATOR_IDS = constant_id("ACTUATOR_IDS")
+ADAPTIVE = constant_id("ADAPTIVE")
 ADDRESS = constant_id("ADDRESS")
 ALWAYS_ON = constant_id("ALWAYS_ON")
+API_RATE_LIMIT = constant_id("API_RATE_LIMIT")
+API_RATE_LIMITER = constant_id("API_RATE_LIMITER")
+API_RATE_LIMIT_BURST = constant_id("API_RATE_LIMIT_BURST")
+API_RATE_LIMIT_PER_MINUTE = constant_id("API_RATE_LIMIT_PER_MINUTE")
 API_VERSION = constant_id("API_VERSION")
+APPLIANCE_EVENT_ENGINE = constant_id("APPLIANCE_EVENT_ENGINE")
 APPLIANCE_IDS = constant_id("APPLIANCE_IDS")
 APP_NAME = constant_id("APP_NAME")
+BACKFILL = constant_id("BACKFILL")
 BATTERY_LEVEL_LAST_UPDATED = constant_id("BATTERY_LEVEL_LAST_UPDATED")
 CLIENT_ID = constant_id("CLIENT_ID")
 COMMAND_END_THREAD = constant_id("COMMAND_END_THREAD")
@@ -66,6 +73,8 @@ COMMAND_GET_SENSOR_CONSUMPTION = constant_id("COMMAND_GET_SENSOR_CONSUMPTION")
 COMMAND_GET_SERVICE_LOCATIONS = constant_id("COMMAND_GET_SERVICE_LOCATIONS")
 COMMAND_GET_SERVICE_LOCATION_INFO = constant_id("COMMAND_GET_SERVICE_LOCATION_INFO")
 COMMAND_INITIALISE = constant_id("COMMAND_INITIALISE")
+COMMAND_MQTT_PRESENCE = constant_id("COMMAND_MQTT_PRESENCE")
+COMMAND_MQTT_REALTIME = constant_id("COMMAND_MQTT_REALTIME")
 COMMAND_NEW_ACTUATOR = constant_id("COMMAND_NEW_ACTUATOR")
 COMMAND_NEW_APPLIANCE = constant_id("COMMAND_NEW_APPLIANCE")
 COMMAND_NEW_SENSOR = constant_id("COMMAND_NEW_SENSOR")
@@ -76,6 +85,7 @@ COMMAND_RESET_CONSUMPTION = constant_id("COMMAND_RESET_CONSUMPTION")
 COMMAND_RESET_SENSOR_CONSUMPTION = constant_id("COMMAND_RESET_SENSOR_CONSUMPTION")
 CONFIG = constant_id("CONFIG")
 CONSUMPTION_DATA_RECEIVED = constant_id("CONSUMPTION_DATA_RECEIVED")
+CONSUMPTION_RECORDS = constant_id("CONSUMPTION_RECORDS")
 CURRENCY_CODE = constant_id("CURRENCY_CODE")
 CURRENT_ENERGY_LEVEL = constant_id("CURRENT_ENERGY_LEVEL")
 CURRENT_UNITS = constant_id("CURRENT_UNITS")
@@ -87,6 +97,7 @@ DAILY_TOTAL_COST_SAVING = constant_id("DAILY_TOTAL_COST_SAVING")
 DATETIME_STARTED = constant_id("DATETIME_STARTED")
 DEFAULT = constant_id("DEFAULT")
 DEVICES_FOLDER_ID = constant_id("DEVICES_FOLDER_ID")
+DEVICE_ADDRESS_INDEX = constant_id("DEVICE_ADDRESS_INDEX")
 DEVICE_TYPE = constant_id("DEVICE_TYPE")
 DEV_ID = constant_id("DEV_ID")
 ELECTRICITY_COST = constant_id("ELECTRICITY_COST")
@@ -137,7 +148,10 @@ HIDE_SOLAR_METER_CURRENT_GENERATION = constant_id("HIDE_SOLAR_METER_CURRENT_GENE
 HIDE_SOLAR_USED_METER_ACCUMULATED_GENERATION = constant_id("HIDE_SOLAR_USED_METER_ACCUMULATED_GENERATION")
 HIDE_SOLAR_USED_METER_CURRENT_GENERATION = constant_id("HIDE_SOLAR_USED_METER_CURRENT_GENERATION")
 HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION = constant_id("HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION")
+HISTORY_ENABLED = constant_id("HISTORY_ENABLED")
+HISTORY_STORE = constant_id("HISTORY_STORE")
 HUMIDITY_LAST_UPDATED = constant_id("HUMIDITY_LAST_UPDATED")
+IDLE_POLLS = constant_id("IDLE_POLLS")
 INDIGO_SERVER_ADDRESS = constant_id("INDIGO_SERVER_ADDRESS")
 INITIALISED = constant_id("INITIALISED")
 KWH = constant_id("KWH")
@@ -170,7 +184,13 @@ LATITUDE = constant_id("LATITUDE")
 LITRES = constant_id("LITRES")
 LONGDITUDE = constant_id("LONGDITUDE")
 MEASUREMENT_TIME_MULTIPLIER = constant_id("MEASUREMENT_TIME_MULTIPLIER")
+MQTT_CLIENT_ID = constant_id("MQTT_CLIENT_ID")
+MQTT_ENABLED = constant_id("MQTT_ENABLED")
+MQTT_HOST = constant_id("MQTT_HOST")
+MQTT_INTERFACE = constant_id("MQTT_INTERFACE")
+MQTT_PORT = constant_id("MQTT_PORT")
 M_3 = constant_id("M_3")
+MAX_CONCURRENT_REQUESTS = constant_id("MAX_CONCURRENT_REQUESTS")
 NAME = constant_id("NAME")
 NEW_ACTUATOR = constant_id("NEW_ACTUATOR")
 NEW_APPLIANCE = constant_id("NEW_APPLIANCE")
@@ -186,19 +206,29 @@ PLUGIN_INITIALIZED = constant_id("PLUGIN_INITIALIZED")
 PLUGIN_PREFS_FOLDER = constant_id("PLUGIN_PREFS_FOLDER")
 PLUGIN_VERSION = constant_id("PLUGIN_VERSION")
 POLLING = constant_id("POLLING")
+PRIORITY_BACKGROUND = constant_id("PRIORITY_BACKGROUND")
+PRIORITY_INTERACTIVE = constant_id("PRIORITY_INTERACTIVE")
 PROCESS = constant_id("PROCESS")
 PULSES_PER_UNIT = constant_id("PULSES_PER_UNIT")
 QUEUED_ADD = constant_id("QUEUED_ADD")
 QUEUED_REMOVE = constant_id("QUEUED_REMOVE")
 QUEUES = constant_id("QUEUES")
+RATE_LIMITED_RESPONSES = constant_id("RATE_LIMITED_RESPONSES")
 READINGS_LAST_UPDATED = constant_id("READINGS_LAST_UPDATED")
+REALTIME_POWER = constant_id("REALTIME_POWER")
+RECORDS_FETCHED = constant_id("RECORDS_FETCHED")
+RECORDS_NEW = constant_id("RECORDS_NEW")
 REFRESH_TOKEN = constant_id("REFRESH_TOKEN")
+RESPONSE_PROCESSOR = constant_id("RESPONSE_PROCESSOR")
+SCHEDULE = constant_id("SCHEDULE")
 SECONDS = constant_id("SECONDS")
 SECRET = constant_id("SECRET")
 SEND_TO_SMAPPEE = constant_id("SEND_TO_SMAPPEE")
 SENSOR_IDS = constant_id("SENSOR_IDS")
 SERVICE_LOCATION_ID = constant_id("SERVICE_LOCATION_ID")
 SERVICE_LOCATION_NAME = constant_id("SERVICE_LOCATION_NAME")
+SERVICE_LOCATION_UUIDS = constant_id("SERVICE_LOCATION_UUIDS")
+SETTLE_SECONDS = constant_id("SETTLE_SECONDS")
 SMAPPEES = constant_id("SMAPPEES")
 SMAPPEE_APPLIANCES = constant_id("SMAPPEE_APPLIANCES")
 SMAPPEE_DEVICE_FOLDER = constant_id("SMAPPEE_DEVICE_FOLDER")
@@ -207,12 +237,14 @@ SMAPPEE_PLUGS = constant_id("SMAPPEE_PLUGS")
 SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID = constant_id("SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID")
 SMAPPEE_UNIT_COST = constant_id("SMAPPEE_UNIT_COST")
 SMAPPEE_UNIT_CURRENCY = constant_id("SMAPPEE_UNIT_CURRENCY")
+SMAPPEE_UUID = constant_id("SMAPPEE_UUID")
 SOLAR_EXPORTED_ID = constant_id("SOLAR_EXPORTED_ID")
 SOLAR_ID = constant_id("SOLAR_ID")
 SOLAR_USED_ID = constant_id("SOLAR_USED_ID")
 SQL = constant_id("SQL")
 SQL_CONNECTION = constant_id("SQL_CONNECTION")
 SQL_CURSOR = constant_id("SQL_CURSOR")
+STATE_SHADOW = constant_id("STATE_SHADOW")
 STATUS = constant_id("STATUS")
 SUPPORTS_ELECTRICITY = constant_id("SUPPORTS_ELECTRICITY")
 SUPPORTS_ELECTRICITY_NET = constant_id("SUPPORTS_ELECTRICITY_NET")
@@ -233,8 +265,12 @@ THREAD = constant_id("THREAD")
 THREADS = constant_id("THREADS")
 THREAD_ACTIVE = constant_id("THREAD_ACTIVE")
 THREAD_END = constant_id("THREAD_END")
+THROTTLED_REQUESTS = constant_id("THROTTLED_REQUESTS")
+THROTTLED_SECONDS = constant_id("THROTTLED_SECONDS")
 TOKEN_EXPIRES_DATETIME_UTC = constant_id("TOKEN_EXPIRES_DATETIME_UTC")
 TOKEN_EXPIRES_IN = constant_id("TOKEN_EXPIRES_IN")
+TOKEN_MANAGER = constant_id("TOKEN_MANAGER")
+TRACER = constant_id("TRACER")
 UNITS = constant_id("UNITS")
 UNIT_COST = constant_id("UNIT_COST")
 UNIT_TABLE = constant_id("UNIT_TABLE")
@@ -261,3 +297,72 @@ LOG_LEVEL_TRANSLATION[LOG_LEVEL_CRITICAL] = "Critical"
 
 SMAPPEE_POST_API_CALL = True
 SMAPPEE_GET_API_CALL = False
+
+SMAPPEE_API_CONNECT_TIMEOUT = 10.0  # Seconds allowed to establish a connection to the Smappee cloud
+SMAPPEE_API_READ_TIMEOUT = 30.0  # Seconds allowed to wait for a Smappee response once connected
+SMAPPEE_SENSOR_WORKERS = 4  # Maximum number of Gas / Water sensor consumption requests in flight at once
+SMAPPEE_API_MAX_RETRIES = 3  # Number of times a request is retried when Smappee responds 429 / 503
+SMAPPEE_API_BACKOFF_BASE = 2.0  # Seconds of backoff after the first throttled response (doubled for each consecutive one)
+SMAPPEE_API_BACKOFF_MAXIMUM = 300.0  # Upper limit on the backoff in seconds
+SMAPPEE_API_POOL_SIZE = 8  # Number of keep-alive connections held open to the Smappee cloud (at least the maximum concurrent requests)
+
+SMAPPEE_INTERACTIVE_COMMANDS = (COMMAND_ON, COMMAND_OFF, COMMAND_INITIALISE)  # Commands sent ahead of background polling work
+SMAPPEE_FAST_LANE_POLL_SECONDS = 0.25  # How often the fast lane checks for interactive commands while a poll batch is in progress
+SMAPPEE_TOKEN_CHECK_SECONDS = 60.0  # Maximum interval at which the token manager checks the access token expiry
+SMAPPEE_TOKEN_RETRY_SECONDS = 60.0  # Seconds before a failed token refresh is retried
+SMAPPEE_TOKEN_REFRESH_MARGIN_SECONDS = 300  # The access token is refreshed this many seconds before it expires
+SMAPPEE_POLL_COMMANDS = (COMMAND_GET_CONSUMPTION, COMMAND_GET_EVENTS, COMMAND_GET_SENSOR_CONSUMPTION)  # Commands polled for each service location (in the order they are sent when due together)
+SMAPPEE_POLL_CHECK_SECONDS = 60.0  # Maximum interval at which the polling thread checks for newly discovered service locations
+SMAPPEE_POLL_IDLE_THRESHOLD = 3  # Adaptive polling: consumption polling interval is doubled after each run of this many polls with no new readings
+SMAPPEE_POLL_BACKOFF_MAXIMUM_SECONDS = 3600.0  # Adaptive polling: upper limit on the consumption polling interval
+SMAPPEE_MQTT_STALE_SECONDS = 60.0  # Cloud readings update the current power again if no MQTT realtime message has been received for this long
+SMAPPEE_AGGREGATION_5_MINUTES = 1  # Smappee consumption aggregation types (5 minute values are only available for the last 14 days)
+SMAPPEE_AGGREGATION_HOURLY = 2
+SMAPPEE_AGGREGATION_DAILY = 3
+SMAPPEE_HISTORY_AGGREGATIONS = (SMAPPEE_AGGREGATION_5_MINUTES, SMAPPEE_AGGREGATION_HOURLY, SMAPPEE_AGGREGATION_DAILY)  # Aggregations kept in the consumption history
+SMAPPEE_HISTORY_DATABASE = "smappee_history.sqlite"  # Consumption history database (in the plugin preferences folder)
+SMAPPEE_MILLISECONDS_PER_DAY = 86400000
+SMAPPEE_BACKFILL_5_MINUTE_DAYS = 14  # Backfill: history within this many days is fetched as 5 minute values
+SMAPPEE_BACKFILL_HOURLY_DAYS = 90  # Backfill: history within this many days (and beyond the 5 minute window) is fetched as hourly values, anything older as daily values
+SMAPPEE_BACKFILL_MAXIMUM_DAYS = 365  # Backfill: upper limit on how far back a gap is filled
+SMAPPEE_BACKFILL_CHUNK_DAYS = {SMAPPEE_AGGREGATION_5_MINUTES: 1, SMAPPEE_AGGREGATION_HOURLY: 7, SMAPPEE_AGGREGATION_DAILY: 90}  # Days of history requested per backfill request
+SMAPPEE_BACKFILL_WORKERS = 2  # Maximum number of backfill requests in flight at once
+SMAPPEE_BACKFILL_RESERVE_TOKENS = 4.0  # Backfill requests leave this many rate limiter tokens for live polling
+SMAPPEE_BACKFILL_QUEUE_WAIT_SECONDS = 5.0  # How often the backfill thread checks for a stop request while idle
+SMAPPEE_READING_INTERVAL_MILLISECONDS = 300000  # Smappee 5 minute readings are timestamped on 5 minute boundaries
+SMAPPEE_REPAIR_INTERVAL_SECONDS = 3600.0  # How often the stored 5 minute history is checked for missing readings
+SMAPPEE_REPAIR_DAYS = 13  # How far back the 5 minute history is checked (within the 14 days Smappee keeps 5 minute values)
+SMAPPEE_TRACE_SAMPLE_EVERY = 12  # Sampled trace messages (e.g. per reading) are output for the first and then every this many calls
+SMAPPEE_RESPONSE_WORKERS = 4  # Number of threads handling Smappee responses (each service location's responses are always handled by the same thread)
+SMAPPEE_RESPONSE_WORKER_STOP_SECONDS = 10.0  # Time allowed for each response worker to finish the responses queued to it when the plugin stops
+SMAPPEE_EVENT_DEDUP_CACHE_SIZE = 256  # Per service location, number of (appliance id, timestamp) pairs of recent Smappee events remembered to drop repeated events
+SMAPPEE_STATE_WRITE_TOLERANCES = {  # State writes with an unchanged uiValue and within this much of the value last written are skipped - other states need an unchanged value
+    "alwaysOn": 0.5,  # Watts, shown as a whole number
+    "dailyNetTotalCost": 0.005,  # Currency amounts, shown to 2 decimal places
+    "dailyTotalCost": 0.005,
+    "dailyTotalCostSaving": 0.005,
+    "dailyTotalExportOnlyIncome": 0.005,
+    "dailyTotalGenOnlyIncome": 0.005,
+    "dailyTotalIncome": 0.005,
+    "dailyTotalPlusSavedElecIncome": 0.005,
+}
+SMAPPEE_CONCURRENT_RESPONSES = (COMMAND_GET_CONSUMPTION, COMMAND_RESET_CONSUMPTION, COMMAND_GET_EVENTS, COMMAND_GET_SENSOR_CONSUMPTION, COMMAND_RESET_SENSOR_CONSUMPTION,
+                                COMMAND_MQTT_REALTIME, COMMAND_MQTT_PRESENCE)  # Responses whose handlers only read shared state (other responses are handled exclusively)
+
+COMMAND_TRANSLATION = dict()  # Command names used in statistics
+COMMAND_TRANSLATION[COMMAND_GET_CONSUMPTION] = "Get Consumption"
+COMMAND_TRANSLATION[COMMAND_GET_EVENTS] = "Get Events"
+COMMAND_TRANSLATION[COMMAND_GET_SENSOR_CONSUMPTION] = "Get Sensor Consumption"
+COMMAND_TRANSLATION[COMMAND_GET_SERVICE_LOCATIONS] = "Get Service Locations"
+COMMAND_TRANSLATION[COMMAND_GET_SERVICE_LOCATION_INFO] = "Get Service Location Info"
+COMMAND_TRANSLATION[COMMAND_INITIALISE] = "Initialise"
+COMMAND_TRANSLATION[COMMAND_MQTT_PRESENCE] = "MQTT Presence"
+COMMAND_TRANSLATION[COMMAND_MQTT_REALTIME] = "MQTT Realtime"
+COMMAND_TRANSLATION[COMMAND_NEW_ACTUATOR] = "New Actuator"
+COMMAND_TRANSLATION[COMMAND_NEW_APPLIANCE] = "New Appliance"
+COMMAND_TRANSLATION[COMMAND_NEW_SENSOR] = "New Sensor"
+COMMAND_TRANSLATION[COMMAND_OFF] = "Off"
+COMMAND_TRANSLATION[COMMAND_ON] = "On"
+COMMAND_TRANSLATION[COMMAND_REFRESH_TOKEN] = "Refresh Token"
+COMMAND_TRANSLATION[COMMAND_RESET_CONSUMPTION] = "Reset Consumption"
+COMMAND_TRANSLATION[COMMAND_RESET_SENSOR_CONSUMPTION] = "Reset Sensor Consumption"
@@ -0,0 +1,136 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Consumption Channels © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class ConsumptionChannel:
+
+    # This class describes one of the channels (Indigo device types) updated from a Smappee consumption reading.
+    # The plugin and Smappee interface process every channel in SMAPPEE_CONSUMPTION_CHANNELS with the same code, driven by these descriptors.
+    # Only the channels' costs / income are calculated per channel (see consumptionChannelAmounts) as the tariffs are held on the electricity and solar devices
+
+    def __init__(self, name, deviceTypeId, devIdKey, supportsKey, statisticsKeys, column, resetKey, cursorKey, lastReadingKey, onlineState, totalDescription, hideFlags,
+                 currentDescription, accumulatedDescription, currentHideKey, accumulatedHideKey, currentZeroHideKey=None, accumulatedCostHideKey=None,
+                 noChangeHideKey=None, alwaysOnHideKey=None, realtimePower=False, percentageOf=None, currentPercentageState=None, dailyPercentageState=None,
+                 costStates=(), tariffProps=()):
+
+        self.name = name  # Also the prefix of the channel's statistics attributes e.g. 'electricityNet' -> consumption.electricityNetTotal
+        self.attributeSuffix = name[0].upper() + name[1:]  # e.g. 'electricityNet' -> consumption.lastReadingElectricityNetUtc
+        self.deviceTypeId = deviceTypeId
+        self.devIdKey = devIdKey  # Key of the channel's device id in the service location's SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID entry
+        self.supportsKey = supportsKey  # CONFIG key set True when the service location has a device for the channel
+        self.statisticsKeys = statisticsKeys  # CONFIG keys that must all be True for the channel's statistics to be calculated
+        self.column = column  # Column (see decodeConsumptionReadings) the channel's readings are taken from
+        self.resetKey = resetKey
+        self.cursorKey = cursorKey  # Timestamp (utc ms) of the newest bucket processed
+        self.lastReadingKey = lastReadingKey  # Reading of the newest bucket processed
+        self.onlineState = onlineState
+        self.totalDescription = totalDescription  # Used when logging the reset of the accumulated total
+        self.hideFlags = hideFlags  # (SMAPPEES key, pluginProps key) of each of the device's logging options
+
+        # Device updates (see handleGetConsumption)
+        self.currentDescription = currentDescription  # Used when logging the current power (curEnergyLevel)
+        self.accumulatedDescription = accumulatedDescription  # Used when logging the accumulated total (accumEnergyTotal)
+        self.currentHideKey = currentHideKey  # SMAPPEES keys (see hideFlags) of the logging options - None if the device has no such option
+        self.accumulatedHideKey = accumulatedHideKey
+        self.currentZeroHideKey = currentZeroHideKey
+        self.accumulatedCostHideKey = accumulatedCostHideKey
+        self.noChangeHideKey = noChangeHideKey
+        self.alwaysOnHideKey = alwaysOnHideKey  # Only the electricity device has an alwaysOn state
+        self.realtimePower = realtimePower  # True if the current power can be received from the Smappee monitor via MQTT instead (see realtimePowerActive)
+        self.percentageOf = percentageOf  # Name of the channel the percentage states are relative to
+        self.currentPercentageState = currentPercentageState
+        self.dailyPercentageState = dailyPercentageState
+
+        # Device start (see startConsumptionChannel)
+        self.costStates = costStates  # (SMAPPEES key, state) of each cost state initialised when the device is started
+        self.tariffProps = tariffProps  # (SMAPPEES key, pluginProps key, default) of each tariff - the value is converted to the type of the default
+
+
+SMAPPEE_CONSUMPTION_CHANNELS = (
+    ConsumptionChannel("electricity", "smappeeElectricity", ELECTRICITY_ID, SUPPORTS_ELECTRICITY, (SUPPORTS_ELECTRICITY,), "consumption",
+                       LAST_RESET_ELECTRICITY_UTC, LAST_READING_ELECTRICITY_UTC, LAST_READING_ELECTRICITY, "smappeeElectricityOnline", "electricity total",
+                       ((HIDE_ENERGY_METER_CURRENT_POWER, "hideEnergyMeterCurPower"),
+                        (HIDE_ENERGY_METER_ACCUMULATED_POWER, "hideEnergyMeterAccumPower"),
+                        (HIDE_ENERGY_METER_ACCUMULATED_POWER_COST, "hideEnergyMeterAccumPowerCost"),
+                        (HIDE_ALWAYS_ON_POWER, "hideAlwaysOnPower")),
+                       "power load reading", "energy total", HIDE_ENERGY_METER_CURRENT_POWER, HIDE_ENERGY_METER_ACCUMULATED_POWER,
+                       accumulatedCostHideKey=HIDE_ENERGY_METER_ACCUMULATED_POWER_COST, alwaysOnHideKey=HIDE_ALWAYS_ON_POWER, realtimePower=True,
+                       costStates=((DAILY_TOTAL_COST, "dailyTotalCost"),),
+                       tariffProps=((CURRENCY_CODE, "currencyCode", 'UKP'),
+                                    (DAILY_STANDING_CHARGE, "dailyStandingCharge", 8.88),  # Defaults to make it obvious there is an error
+                                    (KWH_UNIT_COST, "kwhUnitCost", 9.99))),
+    ConsumptionChannel("electricityNet", "smappeeElectricityNet", ELECTRICITY_NET_ID, SUPPORTS_ELECTRICITY_NET, (SUPPORTS_ELECTRICITY, SUPPORTS_ELECTRICITY_NET, SUPPORTS_SOLAR), "electricityNet",
+                       LAST_RESET_ELECTRICITY_NET_UTC, LAST_READING_ELECTRICITY_NET_UTC, LAST_READING_ELECTRICITY_NET, "smappeeElectricityNetOnline", "electricity net total",
+                       ((HIDE_ENERGY_METER_CURRENT_NET_POWER, "hideEnergyMeterCurNetPower"),
+                        (HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER, "hideEnergyMeterCurZeroNetPower"),
+                        (HIDE_ENERGY_METER_ACCUMULATED_NET_POWER, "hideEnergyMeterAccumNetPower"),
+                        (HIDE_ENERGY_METER_ACCUMULATED_NET_POWER_COST, "hideEnergyMeterAccumNetPowerCost"),
+                        (HIDE_NO_CHANGE_ENERGY_METER_ACCUMULATED_NET_POWER, "hideNoChangeEnergyMeterAccumNetPower")),
+                       "electricity net reading", "net energy total", HIDE_ENERGY_METER_CURRENT_NET_POWER, HIDE_ENERGY_METER_ACCUMULATED_NET_POWER,
+                       currentZeroHideKey=HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER, accumulatedCostHideKey=HIDE_ENERGY_METER_ACCUMULATED_NET_POWER_COST,
+                       noChangeHideKey=HIDE_NO_CHANGE_ENERGY_METER_ACCUMULATED_NET_POWER,
+                       percentageOf="electricity", currentPercentageState="kwhCurrentNetPercentage", dailyPercentageState="kwhDailyTotalNetPercentage",
+                       costStates=((DAILY_NET_TOTAL_COST, "dailyNetTotalCost"),)),
+    ConsumptionChannel("electricitySaved", "smappeeElectricitySaved", ELECTRICITY_SAVED_ID, SUPPORTS_ELECTRICITY_SAVED, (SUPPORTS_ELECTRICITY, SUPPORTS_ELECTRICITY_SAVED, SUPPORTS_SOLAR), "electricitySaved",
+                       LAST_RESET_ELECTRICITY_SAVED_UTC, LAST_READING_ELECTRICITY_SAVED_UTC, LAST_READING_ELECTRICITY_SAVED, "smappeeElectricitySavedOnline", "electricity Saved total",
+                       ((HIDE_ENERGY_METER_CURRENT_SAVED_POWER, "hideEnergyMeterCurSavedPower"),
+                        (HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER, "hideEnergyMeterCurZeroSavedPower"),
+                        (HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER, "hideEnergyMeterAccumSavedPower"),
+                        (HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER_COST, "hideEnergyMeterAccumSavedPowerCost"),
+                        (HIDE_NO_CHANGE_ENERGY_METER_ACCUMULATED_SAVED_POWER, "hideNoChangeEnergyMeterAccumSavedPower")),
+                       "electricity saved reading", "saved energy total", HIDE_ENERGY_METER_CURRENT_SAVED_POWER, HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER,
+                       currentZeroHideKey=HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER, accumulatedCostHideKey=HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER_COST,
+                       noChangeHideKey=HIDE_NO_CHANGE_ENERGY_METER_ACCUMULATED_SAVED_POWER,
+                       percentageOf="electricity", currentPercentageState="kwhCurrentSavedPercentage", dailyPercentageState="kwhDailyTotalSavedPercentage",
+                       costStates=((DAILY_TOTAL_COST_SAVING, "dailyTotalCostSaving"),)),
+    ConsumptionChannel("solar", "smappeeSolar", SOLAR_ID, SUPPORTS_SOLAR, (SUPPORTS_SOLAR,), "solar",
+                       LAST_RESET_SOLAR_UTC, LAST_READING_SOLAR_UTC, LAST_READING_SOLAR, "smappeeSolarOnline", "solar generation total",
+                       ((HIDE_SOLAR_METER_CURRENT_GENERATION, "hideSolarMeterCurGeneration"),
+                        (HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION, "hideZeroSolarMeterCurGeneration"),
+                        (HIDE_SOLAR_METER_ACCUMULATED_GENERATION, "hideSolarMeterAccumGeneration"),
+                        (HIDE_SOLAR_METER_ACCUMULATED_GENERATION_COST, "hideSolarMeterAccumGenerationCost"),
+                        (HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION, "hideNoChangeInSolarMeterAccumGeneration")),
+                       "solar generation reading", "solar generation total", HIDE_SOLAR_METER_CURRENT_GENERATION, HIDE_SOLAR_METER_ACCUMULATED_GENERATION,
+                       currentZeroHideKey=HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION, accumulatedCostHideKey=HIDE_SOLAR_METER_ACCUMULATED_GENERATION_COST,
+                       noChangeHideKey=HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION, realtimePower=True,
+                       tariffProps=((CURRENCY_CODE, "currencyCode", 'UKP'),
+                                    (GENERATION_RATE, "generationRate", 8.88),  # Defaults to make it obvious there is an error
+                                    (EXPORT_TYPE, "exportType", 'percentage'),
+                                    (EXPORT_PERCENTAGE, "exportPercentage", 50.0),
+                                    (EXPORT_RATE, "exportRate", 9.99))),
+    ConsumptionChannel("solarUsed", "smappeeSolarUsed", SOLAR_USED_ID, SUPPORTS_SOLAR_USED, (SUPPORTS_ELECTRICITY, SUPPORTS_SOLAR_USED), "solarUsed",
+                       LAST_RESET_SOLAR_USED_UTC, LAST_READING_SOLAR_USED_UTC, LAST_READING_SOLAR_USED, "smappeeSolarUsedOnline", "solar used total",
+                       ((HIDE_SOLAR_USED_METER_CURRENT_GENERATION, "hideSolarUsedMeterCurGeneration"),
+                        (HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION, "hideZeroSolarUsedMeterCurGeneration"),
+                        (HIDE_SOLAR_USED_METER_ACCUMULATED_GENERATION, "hideSolarUsedMeterAccumGeneration"),
+                        (HIDE_NO_CHANGE_IN_SOLAR_USED_METER_ACCUMULATED_GENERATION, "hideNoChangeInSolarUsedMeterAccumGeneration")),
+                       "solar power used reading", "solar energy used total", HIDE_SOLAR_USED_METER_CURRENT_GENERATION, HIDE_SOLAR_USED_METER_ACCUMULATED_GENERATION,
+                       currentZeroHideKey=HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION, noChangeHideKey=HIDE_NO_CHANGE_IN_SOLAR_USED_METER_ACCUMULATED_GENERATION,
+                       percentageOf="solar", currentPercentageState="kwhCurrentUsedPercentage", dailyPercentageState="kwhDailyTotalUsedPercentage"),
+    ConsumptionChannel("solarExported", "smappeeSolarExported", SOLAR_EXPORTED_ID, SUPPORTS_SOLAR_EXPORTED, (SUPPORTS_SOLAR_EXPORTED,), "solarExported",
+                       LAST_RESET_SOLAR_EXPORTED_UTC, LAST_READING_SOLAR_EXPORTED_UTC, LAST_READING_SOLAR_EXPORTED, "smappeeSolarExportedOnline", "solar exported total",
+                       ((HIDE_SOLAR_EXPORTED_METER_CURRENT_GENERATION, "hideSolarExportedMeterCurGeneration"),
+                        (HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION, "hideZeroSolarExportedMeterCurGeneration"),
+                        (HIDE_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION, "hideSolarExportedMeterAccumGeneration"),
+                        (HIDE_NO_CHANGE_IN_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION, "hideNoChangeInSolarExportedMeterAccumGeneration")),
+                       "solar energy exported reading", "solar energy exported total", HIDE_SOLAR_EXPORTED_METER_CURRENT_GENERATION, HIDE_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION,
+                       currentZeroHideKey=HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION, noChangeHideKey=HIDE_NO_CHANGE_IN_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION,
+                       percentageOf="solar", currentPercentageState="kwhCurrentExportedPercentage", dailyPercentageState="kwhDailyTotalExportedPercentage"),
+)
+
+SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE = {channel.deviceTypeId: channel for channel in SMAPPEE_CONSUMPTION_CHANNELS}
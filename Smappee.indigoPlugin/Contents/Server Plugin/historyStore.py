@@ -0,0 +1,148 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - History Store © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeHistoryStore:
+
+    # This class stores the consumption readings received from Smappee (live polls and backfills) in an SQLite database in the plugin preferences folder.
+    # Readings are keyed by (service location, aggregation, timestamp) so that re-fetched readings replace rather than duplicate those already stored
+
+    def __init__(self, pluginGlobals):
+
+        self.globals = pluginGlobals
+
+        self.historyStoreLogger = logging.getLogger("Plugin.historyStore")
+
+        self.lock = threading.Lock()  # The connection is shared by the plugin, Smappee interface and backfill threads
+        self.connection = None
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.historyStoreLogger.error(log_message)
+
+    @property
+    def enabled(self):
+        return self.connection is not None
+
+    def open(self):
+        try:
+            with self.lock:
+                if self.connection is not None:
+                    return
+
+                os.makedirs(self.globals[PLUGIN_INFO][PLUGIN_PREFS_FOLDER], exist_ok=True)
+                database = os.path.join(self.globals[PLUGIN_INFO][PLUGIN_PREFS_FOLDER], SMAPPEE_HISTORY_DATABASE)
+
+                self.connection = sqlite3.connect(database, check_same_thread=False)
+                self.connection.execute("CREATE TABLE IF NOT EXISTS consumption_history ("
+                                        "service_location_id TEXT NOT NULL, aggregation INTEGER NOT NULL, reading_time INTEGER NOT NULL,"
+                                        " consumption REAL, solar REAL, always_on REAL,"
+                                        " PRIMARY KEY (service_location_id, aggregation, reading_time))")
+                self.connection.commit()
+
+            self.historyStoreLogger.info(f"Keeping consumption history in '{database}'")
+
+        except sqlite3.Error as error_message:
+            self.historyStoreLogger.error(f"Unable to open consumption history database: {error_message}")
+            self.connection = None
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def close(self):
+        try:
+            with self.lock:
+                if self.connection is not None:
+                    self.connection.close()
+                    self.connection = None
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def store_consumption(self, service_location_id, readings, aggregation):
+        # readings: list of consumption readings as returned by Smappee i.e. {"timestamp": <utc ms>, "consumption": <Wh>, "solar": <Wh>, "alwaysOn": <Wh>}
+        # Returns the number of readings stored
+        try:
+            rows = [(str(service_location_id), int(aggregation), int(reading["timestamp"]), reading.get("consumption"), reading.get("solar"), reading.get("alwaysOn"))
+                    for reading in readings if "timestamp" in reading]
+            if len(rows) == 0:
+                return 0
+
+            with self.lock:
+                if self.connection is None:
+                    return 0
+                self.connection.executemany("INSERT OR REPLACE INTO consumption_history"
+                                            " (service_location_id, aggregation, reading_time, consumption, solar, always_on) VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self.connection.commit()
+            return len(rows)
+
+        except sqlite3.Error as error_message:
+            self.historyStoreLogger.error(f"Unable to store consumption history: {error_message}")
+            return 0
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return 0
+
+    def latest_reading_time(self, service_location_id, before_utc):
+        # Returns the timestamp (utc ms) of the newest reading stored (at any aggregation) before before_utc - None if there isn't one
+        try:
+            with self.lock:
+                if self.connection is None:
+                    return None
+                latestReadingTime = None
+                for aggregation in SMAPPEE_HISTORY_AGGREGATIONS:  # One indexed lookup per aggregation
+                    row = self.connection.execute("SELECT MAX(reading_time) FROM consumption_history WHERE service_location_id = ? AND aggregation = ? AND reading_time < ?",
+                                                  (str(service_location_id), int(aggregation), int(before_utc))).fetchone()
+                    if row[0] is not None and (latestReadingTime is None or row[0] > latestReadingTime):
+                        latestReadingTime = row[0]
+            return latestReadingTime
+
+        except sqlite3.Error as error_message:
+            self.historyStoreLogger.error(f"Unable to read consumption history: {error_message}")
+            return None
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return None
+
+    def reading_times(self, service_location_id, aggregation, from_utc, to_utc):
+        # Returns the timestamps (utc ms, ascending) of the readings stored between from_utc and to_utc inclusive - a range scan of the primary key index
+        try:
+            with self.lock:
+                if self.connection is None:
+                    return list()
+                rows = self.connection.execute("SELECT reading_time FROM consumption_history WHERE service_location_id = ? AND aggregation = ? AND reading_time BETWEEN ? AND ?"
+                                               " ORDER BY reading_time", (str(service_location_id), int(aggregation), int(from_utc), int(to_utc))).fetchall()
+            return [row[0] for row in rows]
+
+        except sqlite3.Error as error_message:
+            self.historyStoreLogger.error(f"Unable to read consumption history: {error_message}")
+            return list()
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return list()
@@ -0,0 +1,146 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - MQTT Interface © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import json
+import logging
+import sys
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeMqttInterface:
+
+    # This class subscribes to the realtime topics a Smappee monitor publishes to a local MQTT broker.
+    # Decoded messages are queued to the PROCESS queue (in the same format as responses from the Smappee cloud) for the plugin to handle.
+
+    def __init__(self, pluginGlobals):
+
+        self.globals = pluginGlobals
+
+        self.mqttInterfaceLogger = logging.getLogger("Plugin.mqttInterface")
+
+        self.mqttClient = None
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.mqttInterfaceLogger.error(log_message)
+
+    def start(self):
+        try:
+            if mqtt is None:
+                self.mqttInterfaceLogger.error("Unable to start MQTT realtime updates as the 'paho-mqtt' library is not installed")
+                return
+
+            if hasattr(mqtt, "CallbackAPIVersion"):
+                self.mqttClient = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, client_id=self.globals[CONFIG][MQTT_CLIENT_ID])  # paho-mqtt 2.x
+            else:
+                self.mqttClient = mqtt.Client(client_id=self.globals[CONFIG][MQTT_CLIENT_ID])
+            self.mqttClient.on_connect = self.on_connect
+            self.mqttClient.on_disconnect = self.on_disconnect
+            self.mqttClient.on_message = self.on_message
+
+            # Connect in the background - the client reconnects automatically if the broker is unavailable
+            self.mqttClient.connect_async(self.globals[CONFIG][MQTT_HOST], self.globals[CONFIG][MQTT_PORT], keepalive=60)
+            self.mqttClient.loop_start()
+
+            self.mqttInterfaceLogger.info(f"Connecting to MQTT broker at {self.globals[CONFIG][MQTT_HOST]}:{self.globals[CONFIG][MQTT_PORT]} for Smappee realtime updates")
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def stop(self):
+        try:
+            if self.mqttClient is not None:
+                self.mqttClient.disconnect()
+                self.mqttClient.loop_stop()
+                self.mqttClient = None
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def on_connect(self, client, userdata, flags, rc):
+        try:
+            if rc != 0:
+                self.mqttInterfaceLogger.error(f"MQTT broker refused connection [rc={rc}]")
+                return
+
+            # Subscribe to the configured monitor's topics (or those of every monitor publishing to the broker if no UUID is configured)
+            smappeeUuid = self.globals[CONFIG][SMAPPEE_UUID] if self.globals[CONFIG][SMAPPEE_UUID] != "" else "+"
+            client.subscribe([(f"servicelocation/{smappeeUuid}/realtime", 0), (f"servicelocation/{smappeeUuid}/presence", 0)])
+
+            self.mqttInterfaceLogger.info("Connected to MQTT broker - receiving Smappee realtime updates")
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def on_disconnect(self, client, userdata, rc):
+        if rc != 0:
+            self.mqttInterfaceLogger.warning(f"Disconnected from MQTT broker [rc={rc}] - reconnecting ...")
+
+    def on_message(self, client, userdata, message):
+        try:
+            topic = message.topic.split("/")  # servicelocation/<uuid>/<realtime | presence>
+            if len(topic) != 3:
+                return
+
+            service_location_id = self.get_service_location_id(topic[1])
+            if service_location_id is None:
+                self.mqttInterfaceLogger.debug(f"MQTT message for unknown Smappee monitor ignored: {message.topic}")
+                return
+
+            payload = json.loads(message.payload)
+
+            if topic[2] == "realtime":
+                realtime = self.decode_realtime(payload)
+                if realtime is not None:
+                    self.globals[QUEUES][PROCESS].put([COMMAND_MQTT_REALTIME, service_location_id, realtime])
+            elif topic[2] == "presence":
+                self.globals[QUEUES][PROCESS].put([COMMAND_MQTT_PRESENCE, service_location_id, {"online": bool(payload.get("online", False))}])
+
+        except ValueError:
+            self.mqttInterfaceLogger.debug(f"Undecodable MQTT message on '{message.topic}' ignored")
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def get_service_location_id(self, smappeeUuid):
+        # Monitor UUIDs are mapped to service locations from the Smappee cloud's service location list;
+        # with a single service location, messages for the configured monitor are assumed to be for it
+        if smappeeUuid in self.globals[SERVICE_LOCATION_UUIDS]:
+            return self.globals[SERVICE_LOCATION_UUIDS][smappeeUuid]
+        if smappeeUuid == self.globals[CONFIG][SMAPPEE_UUID] and len(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]) == 1:
+            return str(list(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID].keys())[0])
+        return None
+
+    def decode_realtime(self, payload):
+        # Returns consumption (and solar, if reported) power in Watts - None if the message has no power reading
+        consumptionPower = payload.get("totalPower", payload.get("consumptionPower"))
+        if consumptionPower is None:
+            return None
+        realtime = dict()
+        realtime["consumptionPower"] = float(consumptionPower)
+        realtime["solarPower"] = float(payload["solarPower"]) if "solarPower" in payload else None
+        return realtime
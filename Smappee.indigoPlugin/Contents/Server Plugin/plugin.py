@@ -18,6 +18,7 @@ import sys
 import threading
 import time
 import traceback
+import types
 
 # ============================== Custom Imports ===============================
 try:
@@ -26,9 +27,20 @@ except ImportError:
     pass
 
 # ============================== Plugin Imports ===============================
+from applianceEvents import SmappeeApplianceEventEngine
+from backfill import ThreadBackfill
+from commandQueue import SmappeeCommandQueue
+from consumptionChannels import SMAPPEE_CONSUMPTION_CHANNELS, SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE
 from constants import *
+from historyStore import SmappeeHistoryStore
+from mqttInterface import SmappeeMqttInterface
 from polling import ThreadPolling
+from rateLimiter import SmappeeRateLimiter
+from responseProcessor import SmappeeResponseProcessor
 from smappeeInterface import ThreadSmappeeInterface
+from stateUpdates import SmappeeStateShadow, SmappeeStateUpdates
+from tokenManager import ThreadTokenManager
+from tracer import SmappeeTracer, TraceTimestamp
 
 
 # noinspection PyPep8Naming,PyUnresolvedReferences,SpellCheckingInspection
@@ -47,6 +59,7 @@ class Plugin(indigo.PluginBase):
         self.globals[PLUGIN_INFO][PLUGIN_DISPLAY_NAME] = plugin_display_name
         self.globals[PLUGIN_INFO][PLUGIN_VERSION] = plugin_version
         self.globals[PLUGIN_INFO][PATH] = indigo.server.getInstallFolderPath()
+        self.globals[PLUGIN_INFO][PLUGIN_PREFS_FOLDER] = f"{self.globals[PLUGIN_INFO][PATH]}/Preferences/Plugins/{plugin_id}"
         self.globals[PLUGIN_INFO][API_VERSION] = indigo.server.apiVersion
         self.globals[PLUGIN_INFO][INDIGO_SERVER_ADDRESS] = indigo.server.address
 
@@ -57,6 +70,10 @@ class Plugin(indigo.PluginBase):
 
         self.logger = logging.getLogger("Plugin.SMAPPEE")
 
+        # Debug (trace) messages are only formatted if the Event Log or Plugin Log is at the debugging level (see closedPrefsConfigUi)
+        self.globals[TRACER] = SmappeeTracer()
+        self.tracer = self.globals[TRACER]
+
         # Initialise id of folder to hold devices
         self.globals[DEVICES_FOLDER_ID] = 0
 
@@ -143,6 +160,18 @@ class Plugin(indigo.PluginBase):
         self.globals[CONFIG][TOKEN_EXPIRES_IN] = 0
         self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC] = 0
 
+        self.globals[CONFIG][MAX_CONCURRENT_REQUESTS] = 4  # Maximum number of Smappee API requests in flight during a poll
+        self.globals[CONFIG][API_RATE_LIMIT_PER_MINUTE] = 60  # Sustained rate of Smappee API requests
+        self.globals[CONFIG][API_RATE_LIMIT_BURST] = 10  # Number of Smappee API requests that can be sent back-to-back
+
+        self.globals[CONFIG][MQTT_ENABLED] = False  # Receive realtime power from the Smappee monitor via a local MQTT broker
+        self.globals[CONFIG][MQTT_HOST] = "127.0.0.1"
+        self.globals[CONFIG][MQTT_PORT] = 1883
+        self.globals[CONFIG][MQTT_CLIENT_ID] = ""
+        self.globals[CONFIG][SMAPPEE_UUID] = ""
+
+        self.globals[CONFIG][HISTORY_ENABLED] = False  # Keep the consumption readings in a history database (and backfill gaps in it)
+
         self.globals[CONFIG][SUPPORTS_ELECTRICITY] = False
         self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET] = False
         self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED] = False
@@ -155,14 +184,27 @@ class Plugin(indigo.PluginBase):
         self.globals[PLUGIN_INITIALIZED] = False
         self.globals[CONSUMPTION_DATA_RECEIVED] = False  # Used to signify it is now OK to get Events
         self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID] = dict()  # Used to derive Smappee Device Ids from Smappee Service Location Ids
+        self.globals[DEVICE_ADDRESS_INDEX] = dict()  # (Service Location Id, address) -> Sensor / Appliance / Actuator device id and resolved units
         self.globals[SMAPPEES] = dict()
         self.globals[SMAPPEE_APPLIANCES] = dict()
         self.globals[SMAPPEE_PLUGS] = dict()
+        self.globals[APPLIANCE_EVENT_ENGINE] = SmappeeApplianceEventEngine(self.globals)  # Updates the Smappee Appliance devices from Smappee events
+        self.globals[STATE_SHADOW] = SmappeeStateShadow()  # Device states last written by SmappeeStateUpdates
+        self.globals[CONSUMPTION_RECORDS] = dict()  # Per service location counts of consumption records fetched vs new
+        self.globals[SERVICE_LOCATION_UUIDS] = dict()  # Smappee monitor UUID -> Service Location Id (used to route MQTT messages)
+        self.globals[REALTIME_POWER] = dict()  # Per service location, per channel (ELECTRICITY_ID / SOLAR_ID) time the last MQTT realtime reading was received
 
         self.globals[POLLING] = dict()
         self.globals[POLLING][THREAD_ACTIVE] = False        
         self.globals[POLLING][STATUS] = False
         self.globals[POLLING][SECONDS] = float(300.0)  # 5 minutes
+        self.globals[POLLING][SETTLE_SECONDS] = float(30.0)  # Poll 30 seconds after each interval boundary
+        self.globals[POLLING][SCHEDULE] = dict()  # Polling interval (seconds) for each polled command - 0 = Don't poll
+        self.globals[POLLING][SCHEDULE][COMMAND_GET_CONSUMPTION] = float(300.0)
+        self.globals[POLLING][SCHEDULE][COMMAND_GET_EVENTS] = float(300.0)
+        self.globals[POLLING][SCHEDULE][COMMAND_GET_SENSOR_CONSUMPTION] = float(300.0)
+        self.globals[POLLING][ADAPTIVE] = False
+        self.globals[POLLING][IDLE_POLLS] = dict()  # Per service location count of consecutive consumption polls that returned no new readings
         self.globals[POLLING][THREAD_END] = False
 
         # Set Plugin Config Values
@@ -195,6 +237,72 @@ class Plugin(indigo.PluginBase):
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
+    def display_api_statistics(self):
+        try:
+            def api_statistics_message():
+                statistics_message_ui = "Smappee API Statistics:\n"
+                statistics_message_ui += f"{'':={'^'}80}\n"
+                if API_RATE_LIMIT in self.globals:
+                    statistics_message_ui += f"{'Rate Limit:':<30} {self.globals[CONFIG][API_RATE_LIMIT_PER_MINUTE]} per minute (burst {self.globals[CONFIG][API_RATE_LIMIT_BURST]})\n"
+                    statistics_message_ui += f"{'Throttled Requests:':<30} {self.globals[API_RATE_LIMIT][THROTTLED_REQUESTS]}\n"
+                    statistics_message_ui += f"{'Throttled Time:':<30} {self.globals[API_RATE_LIMIT][THROTTLED_SECONDS]:.1f} seconds\n"
+                    statistics_message_ui += f"{'Rate Limited Responses:':<30} {self.globals[API_RATE_LIMIT][RATE_LIMITED_RESPONSES]}\n"
+                if QUEUES in self.globals and SEND_TO_SMAPPEE in self.globals[QUEUES]:
+                    statistics_message_ui += f"{'Coalesced Commands:':<30} {self.globals[QUEUES][SEND_TO_SMAPPEE].coalescedCount}\n"
+                    for priority, priorityName in ((PRIORITY_INTERACTIVE, "Interactive"), (PRIORITY_BACKGROUND, "Background")):
+                        commandsDequeued, totalWaitSeconds, maximumWaitSeconds = self.globals[QUEUES][SEND_TO_SMAPPEE].queueWaitStatistics[priority]
+                        averageWaitSeconds = totalWaitSeconds / commandsDequeued if commandsDequeued > 0 else 0.0
+                        statistics_message_ui += f"{f'{priorityName} Queue Wait:':<30} {commandsDequeued} commands, average {averageWaitSeconds:.3f} seconds, maximum {maximumWaitSeconds:.3f} seconds\n"
+                if THREADS in self.globals and TOKEN_MANAGER in self.globals[THREADS]:
+                    statistics_message_ui += f"{'Token Refreshes:':<30} {self.globals[THREADS][TOKEN_MANAGER][THREAD].refreshCount}\n"
+                    statistics_message_ui += f"{'Unauthorised Retries:':<30} {self.globals[THREADS][TOKEN_MANAGER][THREAD].unauthorisedRetryCount}\n"
+                if THREADS in self.globals and BACKFILL in self.globals[THREADS]:
+                    statistics_message_ui += f"{'Backfill:':<30} {self.globals[THREADS][BACKFILL][THREAD].requestsSent} requests, {self.globals[THREADS][BACKFILL][THREAD].readingsBackfilled} readings\n"
+                    for serviceLocationId in self.globals[THREADS][BACKFILL][THREAD].coverage:
+                        statistics_message_ui += f"{f'Location {serviceLocationId} History:':<30} {self.globals[THREADS][BACKFILL][THREAD].coverage_percent(serviceLocationId):.1f}% of 5 minute readings stored\n"
+                if RESPONSE_PROCESSOR in self.globals:
+                    for command, responsesHandled, averageSeconds, maximumSeconds in self.globals[RESPONSE_PROCESSOR].handler_statistics():
+                        statistics_message_ui += f"{f'{COMMAND_TRANSLATION.get(command, command)} Handling:':<30} {responsesHandled} responses, average {averageSeconds:.3f} seconds, maximum {maximumSeconds:.3f} seconds\n"
+                if APPLIANCE_EVENT_ENGINE in self.globals:
+                    statistics_message_ui += f"{'Appliance Event States:':<30} {self.globals[APPLIANCE_EVENT_ENGINE].statesWritten} written, {self.globals[APPLIANCE_EVENT_ENGINE].writesAvoided} writes avoided\n"
+                    statistics_message_ui += f"{'Duplicate Appliance Events:':<30} {self.globals[APPLIANCE_EVENT_ENGINE].duplicateEvents}\n"
+                if STATE_SHADOW in self.globals:
+                    statistics_message_ui += f"{'Device States:':<30} {self.globals[STATE_SHADOW].statesWritten} written, {self.globals[STATE_SHADOW].statesSkipped} unchanged skipped\n"
+                for serviceLocationId, consumptionRecords in self.globals[CONSUMPTION_RECORDS].items():
+                    statistics_message_ui += f"{f'Location {serviceLocationId} Records:':<30} {consumptionRecords[RECORDS_FETCHED]} fetched, {consumptionRecords[RECORDS_NEW]} new\n"
+                statistics_message_ui += f"{'':={'^'}80}\n"
+                return statistics_message_ui
+
+            self.logger.info(api_statistics_message())
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def load_saved_token(self):
+        try:
+            # Tokens are only reused if they were issued for the currently configured Smappee account
+            if self.pluginPrefs.get("tokenAccount", "") != f"{self.globals[CONFIG][CLIENT_ID]}|{self.globals[CONFIG][USER_NAME]}":
+                return
+
+            self.globals[CONFIG][ACCESS_TOKEN] = self.pluginPrefs.get("accessToken", "")
+            self.globals[CONFIG][REFRESH_TOKEN] = self.pluginPrefs.get("refreshToken", "")
+            self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC] = float(self.pluginPrefs.get("tokenExpiresDateTimeUtc", 0))
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def save_token(self):
+        # Called whenever the access token changes (initialise / refresh) so that it can be reused when the plugin restarts
+        try:
+            self.pluginPrefs["accessToken"] = self.globals[CONFIG][ACCESS_TOKEN]
+            self.pluginPrefs["refreshToken"] = self.globals[CONFIG][REFRESH_TOKEN]
+            self.pluginPrefs["tokenExpiresDateTimeUtc"] = str(self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC])
+            self.pluginPrefs["tokenAccount"] = f"{self.globals[CONFIG][CLIENT_ID]}|{self.globals[CONFIG][USER_NAME]}"
+            self.savePluginPrefs()
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
     def exception_handler(self, exception_error_message, log_failing_statement):
         filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
         module = filename.split('/')
@@ -211,17 +319,43 @@ class Plugin(indigo.PluginBase):
 
         # Create queues
         self.globals[QUEUES] = dict()
-        self.globals[QUEUES][SEND_TO_SMAPPEE] = queue.Queue()  # Used to queue smappee commands
+        self.globals[QUEUES][SEND_TO_SMAPPEE] = SmappeeCommandQueue()  # Used to queue smappee commands (duplicate pending commands are coalesced)
         self.globals[QUEUES][PROCESS] = queue.Queue()  # Used to queue output from smappee
         self.globals[QUEUES][INITIALISED] = True
 
+        # Create the pool of workers that handle the output from smappee (taken from the PROCESS queue by runConcurrentThread)
+        self.globals[RESPONSE_PROCESSOR] = SmappeeResponseProcessor(self.globals, self.handleSmappeeResponse)
+        self.globals[RESPONSE_PROCESSOR].start()
+
+        # Create the rate limiter through which all Smappee API calls are made
+        self.globals[API_RATE_LIMITER] = SmappeeRateLimiter(self.globals)
+
         self.globals[THREADS] = dict()
+        self.globals[THREADS][BACKFILL] = dict()
         self.globals[THREADS][POLLING] = dict()
         self.globals[THREADS][SMAPPEE_INTERFACE] = dict()
+        self.globals[THREADS][TOKEN_MANAGER] = dict()
 
         self.globals[THREADS][SMAPPEE_INTERFACE][EVENT] = threading.Event()
         self.globals[THREADS][SMAPPEE_INTERFACE][THREAD] = ThreadSmappeeInterface(self.globals, self.globals[THREADS][SMAPPEE_INTERFACE][EVENT])
+
+        # The token manager refreshes the access token in the background (using the Smappee interface to send the refresh request)
+        self.globals[THREADS][TOKEN_MANAGER][EVENT] = threading.Event()
+        self.globals[THREADS][TOKEN_MANAGER][THREAD] = ThreadTokenManager(self.globals, self.globals[THREADS][TOKEN_MANAGER][EVENT], self.globals[THREADS][SMAPPEE_INTERFACE][THREAD].request_token_refresh, self.save_token)
+
         self.globals[THREADS][SMAPPEE_INTERFACE][THREAD].start()
+        self.globals[THREADS][TOKEN_MANAGER][THREAD].start()
+
+        # Open the consumption history (if required) and start the thread that backfills gaps in it
+        self.globals[HISTORY_STORE] = SmappeeHistoryStore(self.globals)
+        if self.globals[CONFIG][HISTORY_ENABLED]:
+            self.globals[HISTORY_STORE].open()
+        self.globals[THREADS][BACKFILL][EVENT] = threading.Event()
+        self.globals[THREADS][BACKFILL][THREAD] = ThreadBackfill(self.globals, self.globals[THREADS][BACKFILL][EVENT])
+        self.globals[THREADS][BACKFILL][THREAD].start()
+
+        # Reuse the access token saved when the plugin last ran (the INITIALISE command will then only authenticate if it can't be reused or refreshed)
+        self.load_saved_token()
 
         # Now send an INITIALISE command (via queue) to Smappee to initialise the plugin
         self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_INITIALISE])
@@ -232,12 +366,21 @@ class Plugin(indigo.PluginBase):
             self.globals[THREADS][POLLING][THREAD] = ThreadPolling(self.globals, self.globals[THREADS][POLLING][EVENT])
             self.globals[THREADS][POLLING][THREAD].start()
 
+        # Start receiving realtime updates from the Smappee monitor (if required)
+        self.globals[MQTT_INTERFACE] = SmappeeMqttInterface(self.globals)
+        if self.globals[CONFIG][MQTT_ENABLED]:
+            self.globals[MQTT_INTERFACE].start()
+
         self.logger.info("Initialisation in progress ...")
 
     def shutdown(self):
         self.logger.info("Plugin shutdown requested")
 
         self.globals[QUEUES][SEND_TO_SMAPPEE] .put([END_THREAD])
+        self.globals[THREADS][TOKEN_MANAGER][EVENT].set()  # Stop the Token Manager Thread
+        self.globals[THREADS][BACKFILL][EVENT].set()  # Stop the Backfill Thread
+        self.globals[MQTT_INTERFACE].stop()
+        self.globals[HISTORY_STORE].close()
 
         if hasattr(self, "pollingThread"):  # TODO - CHECK THIS IS CORRECT ?????
             if self.globals[POLLING][STATUS]:
@@ -252,15 +395,30 @@ class Plugin(indigo.PluginBase):
         prefsConfigUiValues = self.plugin_prefs
         if "smappeeDeviceFolder" not in prefsConfigUiValues:
             prefsConfigUiValues["smappeeDeviceFolder"] = 'SMAPPEE'
+        if not str(prefsConfigUiValues.get("mqttPort", "1883")).isdigit():
+            prefsConfigUiValues["mqttPort"] = "1883"  # Prefs saved by earlier versions hold "127.0.0.1" (the field is only editable when MQTT is enabled)
 
         return prefsConfigUiValues
 
     def validatePrefsConfigUi(self, valuesDict):
+        try:
+            if "mqttPort" in valuesDict:  # Checked even when MQTT isn't enabled, as prefs saved by earlier versions may hold an invalid port
+                try:
+                    mqttPort = int(valuesDict["mqttPort"])
+                    if mqttPort < 1 or mqttPort > 65535:
+                        raise ValueError
+                except (TypeError, ValueError):
+                    errorDict = indigo.Dict()
+                    errorDict["mqttPort"] = "MQTT Port must be a number between 1 and 65535"
+                    return False, valuesDict, errorDict
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
         return True
 
     def closedPrefsConfigUi(self, valuesDict, userCancelled):
-        self.logger.debug(f"'closePrefsConfigUi' called with userCancelled = {userCancelled}")
+        self.tracer.debug(self.logger, "'closePrefsConfigUi' called with userCancelled = {}", userCancelled)
 
         try:
             if userCancelled:
@@ -281,6 +439,7 @@ class Plugin(indigo.PluginBase):
             # Now set required logging levels
             self.indigo_log_handler.setLevel(event_log_level)
             self.plugin_file_handler.setLevel(plugin_log_level)
+            self.globals[TRACER].set_level(event_log_level, plugin_log_level)
 
             if "smappeeAddress" in valuesDict:
                 self.globals[CONFIG][ADDRESS] = valuesDict["smappeeAddress"]
@@ -307,6 +466,29 @@ class Plugin(indigo.PluginBase):
             else:
                 self.globals[CONFIG][PASSWORD] = ""
 
+            # ### MQTT ###
+            previousMqttConfig = [self.globals[CONFIG][MQTT_ENABLED], self.globals[CONFIG][MQTT_HOST], self.globals[CONFIG][MQTT_PORT], self.globals[CONFIG][MQTT_CLIENT_ID], self.globals[CONFIG][SMAPPEE_UUID]]
+            self.globals[CONFIG][MQTT_ENABLED] = bool(valuesDict.get("mqttEnabled", False))
+            self.globals[CONFIG][MQTT_HOST] = valuesDict.get("mqttHost", "127.0.0.1")
+            try:
+                self.globals[CONFIG][MQTT_PORT] = int(valuesDict.get("mqttPort", 1883))
+            except (TypeError, ValueError):
+                self.globals[CONFIG][MQTT_PORT] = 1883  # e.g. prefs saved by earlier versions, in which the field defaulted to "127.0.0.1"
+            self.globals[CONFIG][MQTT_CLIENT_ID] = valuesDict.get("mqttClientId", "")
+            self.globals[CONFIG][SMAPPEE_UUID] = valuesDict.get("smappeeUuid", "")
+            if MQTT_INTERFACE in self.globals and previousMqttConfig != [self.globals[CONFIG][MQTT_ENABLED], self.globals[CONFIG][MQTT_HOST], self.globals[CONFIG][MQTT_PORT], self.globals[CONFIG][MQTT_CLIENT_ID], self.globals[CONFIG][SMAPPEE_UUID]]:
+                self.globals[MQTT_INTERFACE].stop()
+                if self.globals[CONFIG][MQTT_ENABLED]:
+                    self.globals[MQTT_INTERFACE].start()
+
+            # ### HISTORY ###
+            self.globals[CONFIG][HISTORY_ENABLED] = bool(valuesDict.get("historyEnabled", False))
+            if HISTORY_STORE in self.globals:
+                if self.globals[CONFIG][HISTORY_ENABLED]:
+                    self.globals[HISTORY_STORE].open()
+                else:
+                    self.globals[HISTORY_STORE].close()
+
             # ### FOLDER ###
             if "smappeeDeviceFolder" in valuesDict:
                 self.globals[CONFIG][SMAPPEE_DEVICE_FOLDER] = valuesDict["smappeeDeviceFolder"]
@@ -325,6 +507,16 @@ class Plugin(indigo.PluginBase):
             # ### POLLING ###
             self.globals[POLLING][STATUS] = bool(valuesDict.get("statusPolling", False))
             self.globals[POLLING][SECONDS] = float(valuesDict.get("pollingSeconds", float(300.0)))  # Default to 5 minutes
+            self.globals[POLLING][SETTLE_SECONDS] = float(valuesDict.get("pollingSettleSeconds", float(30.0)))  # Default to 30 seconds
+            pollingSchedule = dict()  # Replaced as a whole as the polling thread may be reading it
+            pollingSchedule[COMMAND_GET_CONSUMPTION] = self.globals[POLLING][SECONDS]
+            pollingSchedule[COMMAND_GET_EVENTS] = float(valuesDict.get("pollingEventsSeconds", float(300.0)))  # Default to 5 minutes
+            pollingSchedule[COMMAND_GET_SENSOR_CONSUMPTION] = float(valuesDict.get("pollingSensorSeconds", float(300.0)))  # Default to 5 minutes
+            self.globals[POLLING][SCHEDULE] = pollingSchedule
+            self.globals[POLLING][ADAPTIVE] = bool(valuesDict.get("adaptivePolling", False))
+            self.globals[CONFIG][MAX_CONCURRENT_REQUESTS] = int(valuesDict.get("maxConcurrentRequests", 4))
+            self.globals[CONFIG][API_RATE_LIMIT_PER_MINUTE] = int(valuesDict.get("apiRateLimitPerMinute", 60))
+            self.globals[CONFIG][API_RATE_LIMIT_BURST] = int(valuesDict.get("apiRateLimitBurst", 10))
 
             if not self.globals[POLLING][STATUS]:
                 if self.globals[POLLING][THREAD_ACTIVE]:
@@ -370,7 +562,7 @@ class Plugin(indigo.PluginBase):
                 try:
                     self.process = self.globals[QUEUES][PROCESS].get(True, 5)  # Retrieve response from Smappee
                     try:
-                        self.handleSmappeeResponse(self.process[0], self.process[1], self.process[2])  # Handle response from Smappee
+                        self.globals[RESPONSE_PROCESSOR].submit(self.process)  # Handle response from Smappee (on the service location's worker)
                     except Exception as exception_error:
                         self.exception_handler(exception_error, True)  # Log error and display failing statement
                 except queue.Empty:
@@ -378,7 +570,8 @@ class Plugin(indigo.PluginBase):
                         raise self.StopThread  # Plugin shutdown request.
         except self.StopThread:
             # Optionally catch the StopThread exception and do any needed cleanup.
-            self.logger.debug("runConcurrentThread being stopped")
+            self.globals[RESPONSE_PROCESSOR].stop()
+            self.tracer.debug(self.logger, "runConcurrentThread being stopped")
 
     def getDeviceFactoryUiValues(self, devIdList):
         try:
@@ -453,8 +646,7 @@ class Plugin(indigo.PluginBase):
             valuesDict = self._prepareGetDefinedSmappeeActuatorList(valuesDict)
             valuesDict = self._prepareGetPotentialSmappeeActuatorList(valuesDict)
     
-            self.logger.debug(f"getDeviceFactoryUiValues [END]: EL-Detect=[{self.deviceDetectedSmappeeElectricity}], SO-Detect=[{self.deviceDetectedSmappeeSolar}],"
-                              f"  GW-Detect=[{self.deviceDetectedSmappeeSensor}], AP-Detect=[{self.deviceDetectedSmappeeAppliance}], AC-Detect=[{self.deviceDetectedSmappeeActuator}]")
+            self.tracer.debug(self.logger, "getDeviceFactoryUiValues [END]: EL-Detect=[{}], SO-Detect=[{}],  GW-Detect=[{}], AP-Detect=[{}], AC-Detect=[{}]", self.deviceDetectedSmappeeElectricity, self.deviceDetectedSmappeeSolar, self.deviceDetectedSmappeeSensor, self.deviceDetectedSmappeeAppliance, self.deviceDetectedSmappeeActuator)
     
             return valuesDict, errorMsgDict
         
@@ -665,14 +857,14 @@ class Plugin(indigo.PluginBase):
             solarDevId = 0
             solarUsedDevId = 0
             solarExportedDevId = 0
-            self.logger.debug("SMAPPEE [F-0]: _prepareSmappeeList")
+            self.tracer.debug(self.logger, "SMAPPEE [F-0]: _prepareSmappeeList")
     
             for dev in indigo.devices.iter("self"):
-                self.logger.debug(f"SMAPPEE [F-1]: {dev.name} [devTypeId = {dev.deviceTypeId}]")
+                self.tracer.debug(self.logger, "SMAPPEE [F-1]: {} [devTypeId = {}]", dev.name, dev.deviceTypeId)
                 if dev.deviceTypeId == ("smappeeElectricity" or dev.deviceTypeId == "smappeeElectricityNet" or dev.deviceTypeId == "smappeeElectricitySaved" or 
                                         dev.deviceTypeId == "smappeeSolar" or dev.deviceTypeId == "smappeeSolarUsed" or dev.deviceTypeId == "smappeeSolarExported"):
     
-                    self.logger.debug(f"SMAPPEE [F-2]: {dev.name} [devTypeId = {dev.deviceTypeId}]")
+                    self.tracer.debug(self.logger, "SMAPPEE [F-2]: {} [devTypeId = {}]", dev.name, dev.deviceTypeId)
     
                     if dev.pluginProps["serviceLocationId"] == self.smappeeServiceLocationId:
                         smappeeMainDeviceDetected = True
@@ -705,7 +897,7 @@ class Plugin(indigo.PluginBase):
                         else:
                             self.logger.error(f"SMAPPEE [F-E]: {dev.name} [devTypeId = {dev.deviceTypeId}] UNKNOWN")
     
-                        self.logger.debug(f"SMAPPEE [F-3]: {dev.name} [devTypeId = {dev.deviceTypeId}]")
+                        self.tracer.debug(self.logger, "SMAPPEE [F-3]: {} [devTypeId = {}]", dev.name, dev.deviceTypeId)
     
             if not smappeeMainDeviceDetected:
                 if len(devIdList) != 0:
@@ -818,15 +1010,15 @@ class Plugin(indigo.PluginBase):
     
                         if dev.id in self.globals[SMAPPEES]:
                             self.globals[SMAPPEES].pop(dev.id, None)
-                            self.logger.debug("_removeSmappeeElectricityDevice = POPPED")
+                            self.tracer.debug(self.logger, "_removeSmappeeElectricityDevice = POPPED")
     
                         indigo.device.delete(dev)
     
                         self.globals[CONFIG][SUPPORTS_ELECTRICITY] = False
     
-                        self.logger.debug("_removeSmappeeElectricityDevice = DELETED")
+                        self.tracer.debug(self.logger, "_removeSmappeeElectricityDevice = DELETED")
                 except Exception as exception_error:
-                    self.logger.debug("_removeSmappeeElectricityDevice = EXCEPTION")
+                    self.tracer.debug(self.logger, "_removeSmappeeElectricityDevice = EXCEPTION")
                     pass  # delete doesn't allow (throws) on root elem
     
             valuesDict["addSmappeeElectricityDeviceEnabled"] = 'true'
@@ -894,15 +1086,15 @@ class Plugin(indigo.PluginBase):
     
                         if dev.id in self.globals[SMAPPEES]:
                             self.globals[SMAPPEES].pop(dev.id, None)
-                            self.logger.debug("_removeSmappeeElectricityNetDevice = POPPED")
+                            self.tracer.debug(self.logger, "_removeSmappeeElectricityNetDevice = POPPED")
     
                         indigo.device.delete(dev)
     
                         self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET] = False
     
-                        self.logger.debug("_removeSmappeeElectricityNetDevice = DELETED")
+                        self.tracer.debug(self.logger, "_removeSmappeeElectricityNetDevice = DELETED")
                 except Exception as exception_error:
-                    self.logger.debug("_removeSmappeeElectricityNetDevice = EXCEPTION")
+                    self.tracer.debug(self.logger, "_removeSmappeeElectricityNetDevice = EXCEPTION")
                     pass  # delete doesn't allow (throws) on root elem
     
             valuesDict["addSmappeeElectricityNetDeviceEnabled"] = 'true'
@@ -969,15 +1161,15 @@ class Plugin(indigo.PluginBase):
     
                         if dev.id in self.globals[SMAPPEES]:
                             self.globals[SMAPPEES].pop(dev.id, None)
-                            self.logger.debug("_removeSmappeeElectricitySavedDevice = POPPED")
+                            self.tracer.debug(self.logger, "_removeSmappeeElectricitySavedDevice = POPPED")
     
                         indigo.device.delete(dev)
     
                         self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED] = False
     
-                        self.logger.debug("_removeSmappeeElectricitySavedDevice = DELETED")
+                        self.tracer.debug(self.logger, "_removeSmappeeElectricitySavedDevice = DELETED")
                 except Exception as exception_error:
-                    self.logger.debug("_removeSmappeeElectricitySavedDevice = EXCEPTION")
+                    self.tracer.debug(self.logger, "_removeSmappeeElectricitySavedDevice = EXCEPTION")
                     pass  # delete doesn't allow (throws) on root elem
     
             valuesDict["addSmappeeElectricitySavedDeviceEnabled"] = 'true'
@@ -1048,15 +1240,15 @@ class Plugin(indigo.PluginBase):
     
                         if dev.id in self.globals[SMAPPEES]:
                             self.globals[SMAPPEES].pop(dev.id, None)
-                            self.logger.debug("_removeSmappeeSolarDevice = POPPED")
+                            self.tracer.debug(self.logger, "_removeSmappeeSolarDevice = POPPED")
     
                         indigo.device.delete(dev)
     
                         self.globals[CONFIG][SUPPORTS_SOLAR] = False
     
-                        self.logger.debug("_removeSmappeeSolarDevice = DELETED")
+                        self.tracer.debug(self.logger, "_removeSmappeeSolarDevice = DELETED")
                 except Exception as exception_error:
-                    self.logger.debug("_removeSmappeeSolarDevice = EXCEPTION")
+                    self.tracer.debug(self.logger, "_removeSmappeeSolarDevice = EXCEPTION")
                     pass  # delete doesn't allow (throws) on root elem
     
             valuesDict["addSmappeeSolarDeviceEnabled"] = 'true'
@@ -1123,15 +1315,15 @@ class Plugin(indigo.PluginBase):
     
                         if dev.id in self.globals[SMAPPEES]:
                             self.globals[SMAPPEES].pop(dev.id, None)
-                            self.logger.debug("_removeSmappeeSolarUsedDevice = POPPED")
+                            self.tracer.debug(self.logger, "_removeSmappeeSolarUsedDevice = POPPED")
     
                         indigo.device.delete(dev)
     
                         self.globals[CONFIG][SUPPORTS_SOLAR_USED] = False
     
-                        self.logger.debug("_removeSmappeeSolarUsedDevice = DELETED")
+                        self.tracer.debug(self.logger, "_removeSmappeeSolarUsedDevice = DELETED")
                 except Exception as exception_error:
-                    self.logger.debug("_removeSmappeeSolarUsedDevice = EXCEPTION")
+                    self.tracer.debug(self.logger, "_removeSmappeeSolarUsedDevice = EXCEPTION")
                     pass  # delete doesn't allow (throws) on root elem
     
             valuesDict["addSmappeeSolarUsedDeviceEnabled"] = 'true'
@@ -1198,15 +1390,15 @@ class Plugin(indigo.PluginBase):
     
                         if dev.id in self.globals[SMAPPEES]:
                             self.globals[SMAPPEES].pop(dev.id, None)
-                            self.logger.debug("_removeSmappeeSolarExportedDevice = POPPED")
+                            self.tracer.debug(self.logger, "_removeSmappeeSolarExportedDevice = POPPED")
     
                         indigo.device.delete(dev)
     
                         self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED] = False
     
-                        self.logger.debug("_removeSmappeeSolarExportedDevice = DELETED")
+                        self.tracer.debug(self.logger, "_removeSmappeeSolarExportedDevice = DELETED")
                 except Exception as exception_error:
-                    self.logger.debug("_removeSmappeeSolarExportedDevice = EXCEPTION")
+                    self.tracer.debug(self.logger, "_removeSmappeeSolarExportedDevice = EXCEPTION")
                     pass  # delete doesn't allow (throws) on root elem
     
             valuesDict["addSmappeeSolarExportedDeviceEnabled"] = 'true'
@@ -1573,7 +1765,7 @@ class Plugin(indigo.PluginBase):
 
     def processUpdate(self, pluginAction, dev):  # Dev is a Smappee
         try:
-            self.logger.debug(f"'processUpdate' [{dev.pluginProps['serviceLocationId']}]")
+            self.tracer.debug(self.logger, "'processUpdate' [{}]", dev.pluginProps['serviceLocationId'])
             self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION, str(dev.pluginProps["serviceLocationId"])])
 
         except Exception as exception_error:
@@ -1581,12 +1773,12 @@ class Plugin(indigo.PluginBase):
 
     def processReset(self, pluginAction, dev):  # Dev is a Smappee
         try:
-            self.logger.debug(f"'processReset' [{dev.pluginProps['serviceLocationId']}]")
+            self.tracer.debug(self.logger, "'processReset' [{}]", dev.pluginProps['serviceLocationId'])
 
             if "accumEnergyTotal" in dev.states:
                 if float(dev.states.get("accumEnergyTotal", 0)) != 0.0:
                     accum_energy_total = float(dev.states.get("accumEnergyTotal", 0))
-                    self.logger.debug(f"'processReset' accumEnergyTotal=[{accum_energy_total}]")
+                    self.tracer.debug(self.logger, "'processReset' accumEnergyTotal=[{}]", accum_energy_total)
                     self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_RESET_CONSUMPTION, str(dev.pluginProps["serviceLocationId"])])
 
         except Exception as exception_error:
@@ -1594,7 +1786,7 @@ class Plugin(indigo.PluginBase):
 
     def processTurnOnOffToggle(self, pluginAction, dev):  # Dev is a mappee Appliance
         try:
-            self.logger.debug(f"'processTurnOnOffToggle' [{self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS]}]")
+            self.tracer.debug(self.logger, "'processTurnOnOffToggle' [{}]", self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS])
 
             if dev.onState:
                 self.processTurnOff(pluginAction, dev)
@@ -1606,7 +1798,7 @@ class Plugin(indigo.PluginBase):
 
     def processTurnOn(self, pluginAction, dev):  # Dev is a Smappee Actuator
         try:
-            self.logger.debug(f"'processTurnOn' [{self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS]}]")
+            self.tracer.debug(self.logger, "'processTurnOn' [{}]", self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS])
 
             #  Convert Address from "P012" to "12" i.e. remove leading P and leading 0's
             actuatorAddress = self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS][1:].lstrip("0")
@@ -1618,7 +1810,7 @@ class Plugin(indigo.PluginBase):
 
     def processTurnOff(self, pluginAction, dev):  # Dev is a Smappee Appliance
         try:
-            self.logger.debug(f"'processTurnOff' [{self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS]}]")
+            self.tracer.debug(self.logger, "'processTurnOff' [{}]", self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS])
 
             #  Convert Address from "P012" to "12" i.e. remove leading P and leading 0's
             actuatorAddress = self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS][1:].lstrip("0")
@@ -1757,62 +1949,16 @@ class Plugin(indigo.PluginBase):
 
     def handleGetEvents(self, responseLocationId, smappeeResponse):
         try:
-            for smappeeApplianceDev in indigo.devices.iter("self"):
-                if smappeeApplianceDev.deviceTypeId == "smappeeAppliance":
-                    smappeeApplianceDev.updateStateOnServer("smappeeApplianceEventStatus", "NONE", uiValue="No Events")
-                    smappeeApplianceDev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
-
-            for decoding in sorted(smappeeResponse, key=lambda k: k['timestamp']):
-                decoding = self.convertUnicode(decoding)
-                eventTimestamp = float(decoding['timestamp'])
-                activePower = decoding['activePower']
-                if activePower > 0.0:
-                    applianceStatus = 'ON'
-                else:
-                    applianceStatus = 'OFF'
-                applianceId = decoding['applianceId']
-                smappeeType = 'A'
-                applianceIdPart = applianceId[-3:]
-                applianceId = f"{smappeeType}00{applianceIdPart}"
-
-                if applianceId in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][APPLIANCE_IDS]:
-                    if self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][APPLIANCE_IDS][applianceId][DEV_ID] != 0:
-                        smappeeApplianceDevId = \
-                            self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][APPLIANCE_IDS][
-                                applianceId][DEV_ID]
-                        showCurrentPower = smappeeApplianceDev.pluginProps["SupportsEnergyMeterCurPower"]
-                        if showCurrentPower:
-                            smappeeApplianceDev.updateStateOnServer("curEnergyLevel", 0.0, uiValue="0 kWh")
-
-                        smappeeApplianceDev = indigo.devices[smappeeApplianceDevId]
-
-                        # Check if timestamp to be processed and if not bale out!
-                        if eventTimestamp > float(
-                                smappeeApplianceDev.states['smappeeApplianceEventLastRecordedTimestamp']):
-                            eventTimestampStr = datetime.datetime.fromtimestamp(int(eventTimestamp / 1000)).strftime('%Y-%b-%d %H:%M:%s')
-                            smappeeApplianceDev.updateStateOnServer("smappeeApplianceEventLastRecordedTimestamp",
-                                                                    float(eventTimestamp), uiValue=eventTimestampStr)
-                            showCurrentPower = smappeeApplianceDev.pluginProps["SupportsEnergyMeterCurPower"]
-                            showOnOffState = smappeeApplianceDev.pluginProps["showApplianceEventStatus"]
-                            hideEvents = smappeeApplianceDev.pluginProps["hideApplianceSmappeeEvents"]
-
-                            activePowerStr = f"{int(activePoweri)} W"
-
-                            if showCurrentPower:
-                                smappeeApplianceDev.updateStateOnServer("curEnergyLevel", activePower, uiValue=activePowerStr)
-
-                            if showOnOffState:
-                                if applianceStatus == 'ON':
-                                    smappeeApplianceDev.updateStateOnServer("smappeeApplianceEventStatus", "UP", uiValue=activePowerStr)
-                                else:
-                                    smappeeApplianceDev.updateStateOnServer("smappeeApplianceEventStatus", "DOWN", uiValue=activePowerStr)
+            if self.globals[APPLIANCE_EVENT_ENGINE].process_events(responseLocationId, smappeeResponse):
+                self.updatePollingActivity(responseLocationId, True)
 
-                            if not hideEvents:
-                                eventTimestampStr = datetime.datetime.fromtimestamp(
-                                    int(eventTimestamp / 1000)).strftime('%H:%M:%S')
-                                self.logger.info(f"recorded Smappee Appliance '{smappeeApplianceDev.name}' event at [{eventTimestampStr}], reading: {activePowerStr}")
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                            smappeeApplianceDev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
+    def handleOnOff(self, commandSentToSmappee, responseLocationId, smappeeResponse):
+        try:
+            onOffUi = 'on' if commandSentToSmappee == COMMAND_ON else 'off'
+            self.tracer.debug(self.logger, "Smappee confirmed actuator [{}] at location [{}] switched '{}': {}", smappeeResponse['actuatorId'], responseLocationId, onOffUi, smappeeResponse['response'])
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
@@ -1830,16 +1976,19 @@ class Plugin(indigo.PluginBase):
                 elif key == 'expires_in':
                     self.globals[CONFIG][TOKEN_EXPIRES_IN] = int(value)
                     preAdjustedTokenExpiresDateTimeUtc = time.mktime((indigo.server.getTime() + datetime.timedelta(seconds=self.globals[CONFIG][TOKEN_EXPIRES_IN])).timetuple())
-                    # Adjust token expiry time taking account of polling time + 5 minute safety margin
-                    self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC] = preAdjustedTokenExpiresDateTimeUtc - float(self.globals[POLLING][SECONDS] + 300)
-                    self.logger.debug(f"tokenExpiresDateTimeUtc [T] : Was [{preAdjustedTokenExpiresDateTimeUtc}], is now [{self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC]}]")
+                    # Adjust token expiry time so that the token manager refreshes the token before it expires
+                    self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC] = preAdjustedTokenExpiresDateTimeUtc - float(SMAPPEE_TOKEN_REFRESH_MARGIN_SECONDS)
+                    self.tracer.debug(self.logger, "tokenExpiresDateTimeUtc [T] : Was [{}], is now [{}]", preAdjustedTokenExpiresDateTimeUtc, self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC])
                 elif key == 'refresh_token':
                     self.globals[CONFIG][REFRESH_TOKEN] = value
                 elif key == 'error':
                     self.logger.error(f"SMAPPEE ERROR DETECTED [{commandSentToSmappee}]: {value}")
                 else:
                     pass  # Unknown key/value pair
-                    self.logger.debug(f"Unhandled key/value pair : K=[{key}], V=[{value}]")
+                    self.tracer.debug(self.logger, "Unhandled key/value pair : K=[{}], V=[{}]", key, value)
+
+            if 'access_token' in smappeeResponse:
+                self.save_token()
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
@@ -1853,30 +2002,26 @@ class Plugin(indigo.PluginBase):
                     for self.serviceLocationItem in value:
                         self.serviceLocationId = ""
                         self.serviceLocationName = ""
+                        serviceLocationUuid = ""
                         for key2, value2 in self.serviceLocationItem.items():
-                            self.logger.debug(f"handleSmappeeResponse [H][SERVICELOCATION] -  [{key2} : {value2}]")
+                            self.tracer.debug(self.logger, "handleSmappeeResponse [H][SERVICELOCATION] -  [{} : {}]", key2, value2)
                             if key2 == 'serviceLocationId':
                                 self.serviceLocationId = str(value2)
                             elif key2 == 'name':
                                 self.serviceLocationName = str(value2)
+                            elif key2 == 'serviceLocationUuid':
+                                serviceLocationUuid = str(value2)
                             else:
                                 pass  # Unknown key/value pair
+                        if self.serviceLocationId != "" and serviceLocationUuid != "":
+                            self.globals[SERVICE_LOCATION_UUIDS][serviceLocationUuid] = self.serviceLocationId
                         if self.serviceLocationId != "":
                             if self.serviceLocationId in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]:
                                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][
                                     NAME] = self.serviceLocationName
-                                if 'electricityId' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
-                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID] = int(0)
-                                if 'electricityNetId' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
-                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_NET_ID] = int(0)
-                                if 'electricitySavedId' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
-                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_SAVED_ID] = int(0)
-                                if 'solarId' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
-                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_ID] = int(0)
-                                if 'solarUsedId' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
-                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_USED_ID] = int(0)
-                                if 'solarExportedId' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
-                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_EXPORTED_ID] = int(0)
+                                for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                                    if channel.devIdKey not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
+                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][channel.devIdKey] = int(0)
                                 if 'sensorIds' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
                                     self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS] = dict()
                                 if 'applianceIds' not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]:
@@ -1886,91 +2031,29 @@ class Plugin(indigo.PluginBase):
                             else:
                                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId] = dict()
                                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][NAME] = self.serviceLocationName
-                                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID] = int(0)
-                                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_NET_ID] = int(0)
-                                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_SAVED_ID] = int(0)
-                                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_ID] = int(0)
-                                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_USED_ID] = int(0)
-                                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_EXPORTED_ID] = int(0)
+                                for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][channel.devIdKey] = int(0)
                                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS] = dict()
                                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][APPLIANCE_IDS] = dict()
                                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ACTUATOR_IDS] = dict()
 
-                            self.logger.debug(f"handleSmappeeResponse [HH][SERVICELOCATION]: {self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId]}")
+                            self.tracer.debug(self.logger, "handleSmappeeResponse [HH][SERVICELOCATION]: {}", self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId])
 
                     for self.serviceLocationId, self.serviceLocationDetails in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID].items():
                         for smappeeDev in indigo.devices.iter("self"):
-                            if smappeeDev.deviceTypeId == "smappeeElectricity":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Electricity Device with Address [{smappeeDev.address}]")
-                                if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
-                                    if self.serviceLocationDetails[ELECTRICITY_ID] == 0:
-                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID] = smappeeDev.id
-                                    else:
-                                        if self.serviceLocationDetails[ELECTRICITY_ID] != smappeeDev.id:
-                                            self.logger.error(f"DUPLICATE SMAPPEE ELECTRICITY DEVICE / LOCATION. L=[{self.serviceLocationId}],"
-                                                              f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID]}], D2=[{smappeeDev.id}]")
-
-                            elif smappeeDev.deviceTypeId == "smappeeElectricityNet":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Electricity Net Device with Address [{smappeeDev.address}]")
-                                if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
-                                    if self.serviceLocationDetails[ELECTRICITY_NET_ID] == 0:
-                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_NET_ID] = smappeeDev.id
-                                    else:
-                                        if self.serviceLocationDetails[ELECTRICITY_NET_ID] != smappeeDev.id:
-                                            self.logger.error(f"DUPLICATE SMAPPEE ELECTRICITY NET DEVICE / LOCATION. L=[{self.serviceLocationId}],"
-                                                              f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_NET_ID]}], D2=[{smappeeDev.id}]")
-
-                            elif smappeeDev.deviceTypeId == "smappeeElectricitySaved":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Electricity Saved Device with Address [{smappeeDev.address}]")
-                                if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
-                                    if self.serviceLocationDetails[ELECTRICITY_SAVED_ID] == 0:
-                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][
-                                            ELECTRICITY_SAVED_ID] = smappeeDev.id
-                                    else:
-                                        if self.serviceLocationDetails[ELECTRICITY_SAVED_ID] != smappeeDev.id:
-                                            self.logger.error(f"DUPLICATE SMAPPEE ELECTRICITY SAVED DEVICE / LOCATION. L=[{self.serviceLocationId}],"
-                                                              f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_SAVED_ID]}], D2=[{smappeeDev.id}]")
-
-                            elif smappeeDev.deviceTypeId == "smappeeSolar":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Solar Device with Address [{smappeeDev.address}]")
-                                if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
-                                    if self.serviceLocationDetails[SOLAR_ID] == 0:
-                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_ID] = smappeeDev.id
-                                    else:
-                                        if self.serviceLocationDetails[SOLAR_ID] != smappeeDev.id:
-                                            self.logger.error(f"DUPLICATE SMAPPEE SOLAR DEVICE / LOCATION. L=[{self.serviceLocationId}],"
-                                                              f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_ID]}], D2=[{smappeeDev.id}]")
-
-                            elif smappeeDev.deviceTypeId == "smappeeSolarUsed":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Solar Used Device with Address [{smappeeDev.address}]")
+                            if smappeeDev.deviceTypeId in SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE:
+                                channel = SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE[smappeeDev.deviceTypeId]
+                                self.tracer.debug(self.logger, "handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{}] against known Smappee {} Device with Address [{}]", self.serviceLocationId, channel.name, smappeeDev.address)
                                 if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
-                                    if self.serviceLocationDetails[SOLAR_USED_ID] == 0:
-                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_USED_ID] = smappeeDev.id
+                                    if self.serviceLocationDetails[channel.devIdKey] == 0:
+                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][channel.devIdKey] = smappeeDev.id
                                     else:
-                                        if self.serviceLocationDetails[SOLAR_USED_ID] != smappeeDev.id:
-                                            self.logger.error(
-                                                f"DUPLICATE SMAPPEE SOLAR USED DEVICE / LOCATION. L=[{self.serviceLocationId}],"
-                                                f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_USED_ID]}], D2=[{smappeeDev.id}]")
-
-                            elif smappeeDev.deviceTypeId == "smappeeSolarExported":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Solar Exported Device with Address [{smappeeDev.address}]")
-                                if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
-                                    if self.serviceLocationDetails[SOLAR_EXPORTED_ID] == 0:
-                                        self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_EXPORTED_ID] = smappeeDev.id
-                                    else:
-                                        if self.serviceLocationDetails[SOLAR_EXPORTED_ID] != smappeeDev.id:
-                                            self.logger.error(f"DUPLICATE SMAPPEE SOLAR EXPORTED DEVICE / LOCATION. L=[{self.serviceLocationId}],"
-                                                              f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_EXPORTED_ID]}], D2=[{smappeeDev.id}]")
+                                        if self.serviceLocationDetails[channel.devIdKey] != smappeeDev.id:
+                                            self.logger.error(f"DUPLICATE SMAPPEE {channel.name.upper()} DEVICE / LOCATION. L=[{self.serviceLocationId}],"
+                                                              f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][channel.devIdKey]}], D2=[{smappeeDev.id}]")
 
                             elif smappeeDev.deviceTypeId == "smappeeSensor":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Sensor Device with Address [{smappeeDev.address}]")
+                                self.tracer.debug(self.logger, "handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{}] against known Smappee Sensor Device with Address [{}]", self.serviceLocationId, smappeeDev.address)
                                 if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
                                     if smappeeDev.address in self.serviceLocationDetails[SENSOR_IDS]:
                                         if self.serviceLocationDetails[SENSOR_IDS][smappeeDev.address] == 0:
@@ -1981,8 +2064,7 @@ class Plugin(indigo.PluginBase):
                                     #                                 f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID]}], D2=[{smappeeDev.id}]")
                                 
                             elif smappeeDev.deviceTypeId == "smappeeAppliance":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Appliance Device with Address [{smappeeDev.address}]")
+                                self.tracer.debug(self.logger, "handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{}] against known Smappee Appliance Device with Address [{}]", self.serviceLocationId, smappeeDev.address)
                                 if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
                                     if self.serviceLocationDetails[APPLIANCE_IDS][smappeeDev.address] == 0:
                                         self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][APPLIANCE_IDS][smappeeDev.address] = {'name': smappeeDev.name, 'devId': smappeeDev.id}
@@ -1992,8 +2074,7 @@ class Plugin(indigo.PluginBase):
                                     #                                 f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID]}], D2=[{smappeeDev.id}]")
 
                             elif smappeeDev.deviceTypeId == "smappeeActuator":
-                                self.logger.debug(f"handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{self.serviceLocationId}]"
-                                                  f" against known Smappee Actuator Device with Address [{smappeeDev.address}]")
+                                self.tracer.debug(self.logger, "handleSmappeeResponse [J] Checking new Smappee Service Location Id: [{}] against known Smappee Actuator Device with Address [{}]", self.serviceLocationId, smappeeDev.address)
                                 if smappeeDev.pluginProps["serviceLocationId"] == self.serviceLocationId:
                                     if self.serviceLocationDetails[ACTUATOR_IDS][smappeeDev.address] == 0:
                                         self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ACTUATOR_IDS][smappeeDev.address] = {'name': smappeeDev.name, 'devId': smappeeDev.id}
@@ -2002,12 +2083,12 @@ class Plugin(indigo.PluginBase):
                                     #         self.logger.error(f"DUPLICATE SMAPPEE ACTUATOR DEVICE / LOCATION. L=[{self.serviceLocationId}],"
                                     #                                  f" D1=[{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID]}], D2=[{smappeeDev.id}]")
 
-                        self.logger.debug(f"handleSmappeeResponse [HH][SERVICELOCATION DETAILS]: {self.serviceLocationId} = {self.serviceLocationDetails}")
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [HH][SERVICELOCATION DETAILS]: {} = {}", self.serviceLocationId, self.serviceLocationDetails)
 
                         self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_SERVICE_LOCATION_INFO, self.serviceLocationId])
 
                     if not self.globals[PLUGIN_INITIALIZED]:
-                        self.logger.debug(f"handleSmappeeResponse [HH][SERVICELOCATION plugin initialised]: {self.globals[PLUGIN_INITIALIZED]}")
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [HH][SERVICELOCATION plugin initialised]: {}", self.globals[PLUGIN_INITIALIZED])
                         self.globals[PLUGIN_INITIALIZED] = True
                         self.logger.info("Initialisation completed.")
 
@@ -2017,15 +2098,15 @@ class Plugin(indigo.PluginBase):
                             self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_SENSOR_CONSUMPTION, str(serviceLocationId)])
 
                     else:
-                        self.logger.debug(f"handleSmappeeResponse [HH][SERVICELOCATION plugin already initialised]: {self.globals[PLUGIN_INITIALIZED]}")
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [HH][SERVICELOCATION plugin already initialised]: {}", self.globals[PLUGIN_INITIALIZED])
 
-                    self.logger.debug(f"handleSmappeeResponse [HH][SERVICELOCATION pluginInitialised: FINAL]: {self.globals[PLUGIN_INITIALIZED]}")
+                    self.tracer.debug(self.logger, "handleSmappeeResponse [HH][SERVICELOCATION pluginInitialised: FINAL]: {}", self.globals[PLUGIN_INITIALIZED])
 
                 elif key == 'error':
                     self.logger.error(f"SMAPPEE ERROR DETECTED [{decodedSmappeeResponse}]: {value}")
                 else:
                     # Unknown key/value pair
-                    self.logger.debug(f"Unhandled key/value pair : K=[{key}], V=[{value}]")
+                    self.tracer.debug(self.logger, "Unhandled key/value pair : K=[{}], V=[{}]", key, value)
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
@@ -2053,7 +2134,7 @@ class Plugin(indigo.PluginBase):
                         self.sensorName = ""
                         self.sensorId = ""
                         for key2, value2 in self.sensorItem.items():
-                            self.logger.debug(f"handleSmappeeResponse [F][SENSOR] -  [{key2} : {value2}]")
+                            self.tracer.debug(self.logger, "handleSmappeeResponse [F][SENSOR] -  [{} : {}]", key2, value2)
                             if key2 == 'id':
                                 smappeeType = 'GW'  # Sensor for Gas Water
                                 value2_2 = f"0{value2}"[-2:]
@@ -2062,7 +2143,7 @@ class Plugin(indigo.PluginBase):
                                 self.sensorName = value2
                             else:
                                 pass  # Unknown key/value pair
-                        self.logger.debug(f"handleSmappeeResponse [FF][SENSOR] - [{self.sensorId}]-[{self.sensorName}]")
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [FF][SENSOR] - [{}]-[{}]", self.sensorId, self.sensorName)
 
                         if self.sensorId != "":
                             # At this point we have detected a Smappee Sensor Device
@@ -2079,13 +2160,13 @@ class Plugin(indigo.PluginBase):
 
                                 sensorId = self.sensorId + '-' + sensorIdModifier
 
-                                self.logger.debug(f"handleSmappeeResponse [FF-A][SENSOR] - [{sensorId}]-[{sensorName}]")
+                                self.tracer.debug(self.logger, "handleSmappeeResponse [FF-A][SENSOR] - [{}]-[{}]", sensorId, sensorName)
 
                                 if sensorId in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][SENSOR_IDS]:
-                                    self.logger.debug(f"handleSmappeeResponse [FF-B][SENSOR] - [{sensorId}]-[{sensorName}]")
+                                    self.tracer.debug(self.logger, "handleSmappeeResponse [FF-B][SENSOR] - [{}]-[{}]", sensorId, sensorName)
                                     if self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId]['sensorIds'][sensorId][DEV_ID] != 0:
                                         try:
-                                            self.logger.debug(f"handleSmappeeResponse [FF-C][SENSOR] - [{sensorId}]-[{sensorName}]")
+                                            self.tracer.debug(self.logger, "handleSmappeeResponse [FF-C][SENSOR] - [{}]-[{}]", sensorId, sensorName)
                                             # Can be either Gas or Water
                                             smappeeSensorDev = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][SENSOR_IDS][sensorId][DEV_ID]]
                                             if not smappeeSensorDev.states['smappeeSensorOnline']:
@@ -2095,7 +2176,7 @@ class Plugin(indigo.PluginBase):
                                 else:
                                     # Can be either Gas or Water
                                     self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeSensor', responseLocationId, 0, sensorId, sensorName)
-                                    self.logger.debug(f"handleSmappeeResponse [FF-D][SENSOR] - [{sensorId}]-[{sensorName}]")
+                                    self.tracer.debug(self.logger, "handleSmappeeResponse [FF-D][SENSOR] - [{}]-[{}]", sensorId, sensorName)
 
                             # Now add the devices
                             createSensor('A')
@@ -2106,7 +2187,7 @@ class Plugin(indigo.PluginBase):
                         self.applianceName = ""
                         self.applianceId = ""
                         for key2, value2 in self.applianceItem.items():
-                            self.logger.debug(f"handleSmappeeResponse [F][APPLIANCE] -  [{key2} : {value2}]")
+                            self.tracer.debug(self.logger, "handleSmappeeResponse [F][APPLIANCE] -  [{} : {}]", key2, value2)
                             if key2 == 'id':
                                 smappeeType = 'A'  # Appliance
                                 value_2_3 = f"00{value2}"[-3:]
@@ -2117,7 +2198,7 @@ class Plugin(indigo.PluginBase):
                                 self.applianceType = value2
                             else:
                                 pass  # Unknown key/value pair
-                        self.logger.debug(f"handleSmappeeResponse [FF][APPLIANCE] - [{self.applianceId}]-[{self.applianceName}]-[{self.applianceType}]")
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [FF][APPLIANCE] - [{}]-[{}]-[{}]", self.applianceId, self.applianceName, self.applianceType)
 
                         if self.applianceId != "":
                             if self.applianceName == "":
@@ -2144,7 +2225,7 @@ class Plugin(indigo.PluginBase):
                         self.actuatorName = ""
                         self.actuatorId = ""
                         for key2, value2 in self.actuatorItem.items():
-                            self.logger.debug(f"handleSmappeeResponse [F2][ACTUATOR] -  [{key2} : {value2}]")
+                            self.tracer.debug(self.logger, "handleSmappeeResponse [F2][ACTUATOR] -  [{} : {}]", key2, value2)
                             if key2 == 'id':
                                 smappeeType = 'P'  # Plug
                                 value_2_3 = ("00" + value2)[-3:]
@@ -2153,7 +2234,7 @@ class Plugin(indigo.PluginBase):
                                 self.actuatorName = str(value2)
                             else:
                                 pass  # Unknown key/value pair
-                        self.logger.debug(f"handleSmappeeResponse [F2F][ACTUATOR] - [{self.actuatorId}]-[{self.actuatorName}]")
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [F2F][ACTUATOR] - [{}]-[{}]", self.actuatorId, self.actuatorName)
 
                         if self.actuatorId != "":
                             if self.actuatorName == "":
@@ -2181,12 +2262,13 @@ class Plugin(indigo.PluginBase):
                     self.logger.error(f"SMAPPEE ERROR DETECTED [{decodedSmappeeResponse}]: {value}")
                 else:
                     pass  # Unknown key/value pair
-                    self.logger.debug(f"Unhandled key/value pair : K=[{key}], V=[{value}]")
+                    self.tracer.debug(self.logger, "Unhandled key/value pair : K=[{}], V=[{}]", key, value)
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
     def handleGetConsumption(self, commandSentToSmappee, responseLocationId, smappeeResponse):
+        stateUpdates = SmappeeStateUpdates(self.globals)  # Each device's states are written once, when the response has been handled
         try:
             for key, value in smappeeResponse.items():
 
@@ -2194,1117 +2276,530 @@ class Plugin(indigo.PluginBase):
                     pass
                 elif key == 'consumptions':
 
-                    if self.globals[CONFIG][SUPPORTS_ELECTRICITY]:
-                        devElectricity = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][ELECTRICITY_ID]]
-                        self.lastReadingElectricityUtc = self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC]
-                        utc_ui = datetime.datetime.fromtimestamp(int(int(self.lastReadingElectricityUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                        self.logger.debug(f"handleSmappeeResponse [LRU-ELECTRICITY]: {utc_ui}")
-
-                        if not devElectricity.states['smappeeElectricityOnline']:
-                            devElectricity.updateStateOnServer("smappeeElectricityOnline", True, uiValue='online')
-
-                    if self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET]:
-                        devElectricityNet = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][ELECTRICITY_NET_ID]]
-                        self.lastReadingElectricityNetUtc = self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC]
-                        utc_ui = datetime.datetime.fromtimestamp(int(int(self.lastReadingElectricityNetUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                        self.logger.debug(f"handleSmappeeResponse [LRU-NET-ELECTRICITY]: {utc_ui}")
-
-                        if not devElectricityNet.states['smappeeElectricityNetOnline']:
-                            devElectricityNet.updateStateOnServer("smappeeElectricityNetOnline", True, uiValue='online')
-
-                    if self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED]:
-                        devElectricitySaved = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][ELECTRICITY_SAVED_ID]]
-                        self.lastReadingElectricitySavedUtc = self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC]
-                        utc_ui = datetime.datetime.fromtimestamp(int(int(self.lastReadingElectricitySavedUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                        self.logger.debug(f"handleSmappeeResponse [LRU-SAVED-ELECTRICITY]: {utc_ui}")
-
-                        if not devElectricitySaved.states['smappeeElectricitySavedOnline']:
-                            devElectricitySaved.updateStateOnServer("smappeeElectricitySavedOnline", True, uiValue='online')
-
-                    if self.globals[CONFIG][SUPPORTS_SOLAR]:
-                        devSolar = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][SOLAR_ID]]
-                        self.lastReadingSolarUtc = self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC]
-                        utc_ui = datetime.datetime.fromtimestamp(int(int(self.lastReadingSolarUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                        self.logger.debug(f"handleSmappeeResponse [LRU-SOLAR]: {utc_ui}")
-
-                        if not devSolar.states['smappeeSolarOnline']:
-                            devSolar.updateStateOnServer("smappeeSolarOnline", True, uiValue='online')
-
-                    if self.globals[CONFIG][SUPPORTS_SOLAR_USED]:
-                        devSolarUsed = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][SOLAR_USED_ID]]
-                        self.lastReadingSolarUsedUtc = self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC]
-                        utc_ui = datetime.datetime.fromtimestamp(int(int(self.lastReadingSolarUsedUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                        self.logger.debug(f"handleSmappeeResponse [LRU-SOLAR-USED]: {utc_ui}")
-
-                        if not devSolarUsed.states['smappeeSolarUsedOnline']:
-                            devSolarUsed.updateStateOnServer("smappeeSolarUsedOnline", True, uiValue='online')
-
-                    if self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED]:
-                        devSolarExported = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][SOLAR_EXPORTED_ID]]
-                        self.lastReadingSolarExportedUtc = self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC]
-                        utc_ui = datetime.datetime.fromtimestamp(int(int(self.lastReadingSolarExportedUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                        self.logger.debug(f"handleSmappeeResponse [LRU-SOLAR-EXPORTED]: {utc_ui}")
-
-                        if not devSolarExported.states['smappeeSolarExportedOnline']:
-                            devSolarExported.updateStateOnServer("smappeeSolarExportedOnline", True, uiValue='online')
-
-                    self.timestampUtcLast = 0  # Common to both all
-
-                    self.electricityTotal = 0.0
-                    self.electricityMeanAverage = 0.0
-                    self.electricityNumberOfValues = 0
-                    self.electricityMinimum = 99999999.0
-                    self.electricityMaximum = 0.0
-                    self.electricityPrevious = 0.0
-
-                    self.electricityNetTotal = 0.0
-                    self.electricityNetMeanAverage = 0.0
-                    self.electricityNetNumberOfValues = 0
-                    self.electricityNetMinimum = 99999999.0
-                    self.electricityNetMaximum = 0.0
-                    self.electricityNetPrevious = 0.0
-
-                    self.electricitySavedTotal = 0.0
-                    self.electricitySavedMeanAverage = 0.0
-                    self.electricitySavedNumberOfValues = 0
-                    self.electricitySavedMinimum = 99999999.0
-                    self.electricitySavedMaximum = 0.0
-                    self.electricitySavedPrevious = 0.0
-
-                    self.solarTotal = 0.0
-                    self.solarMeanAverage = 0.0
-                    self.solarNumberOfValues = 0
-                    self.solarMinimum = 99999999.0
-                    self.solarMaximum = 0.0
-                    self.solarPrevious = 0.0
-
-                    self.solarUsedTotal = 0.0
-                    self.solarUsedMeanAverage = 0.0
-                    self.solarUsedNumberOfValues = 0
-                    self.solarUsedMinimum = 99999999.0
-                    self.solarUsedMaximum = 0.0
-                    self.solarUsedPrevious = 0.0
-
-                    self.solarExportedTotal = 0.0
-                    self.solarExportedMeanAverage = 0.0
-                    self.solarExportedNumberOfValues = 0
-                    self.solarExportedMinimum = 99999999.0
-                    self.solarExportedMaximum = 0.0
-                    self.solarExportedPrevious = 0.0
+                    consumption = types.SimpleNamespace()  # Statistics etc. of this response - responses for different locations are processed concurrently
+                    channelCursorsUtc = list()  # Cursor (newest processed bucket) of each supported channel
+                    channelDevices = dict()  # Channel name -> Indigo device of each supported channel
 
-                    if self.globals[SQL][ENABLED]:
-                        try:
-                            self.globals[SQL][SQL_CONNECTION] = sql3.connect(self.globals[SQL]['db'])
-                            self.globals[SQL][SQL_CURSOR] = self.globals[SQL][SQL_CONNECTION].cursor()
-                        except sql3.Error as e:
-                            if self.globals[SQL][SQL_CONNECTION]:
-                                self.globals[SQL][SQL_CONNECTION].rollback()
-                            e_args_zero = e.args[0]
-                            self.logger.error(f"SMAPPEE ERROR DETECTED WITH SQL CONNECTION: {e_args_zero}")
+                    consumption.timestampUtcLast = 0  # Common to both all
 
-                            self.globals[SQL][ENABLED] = False  # Disable SQL processing
+                    for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                        self.setConsumptionChannelStatistics(consumption, channel, [0, 0.0, 99999999.0, 0.0, 0.0, 0.0])
 
-                    for self.readingItem in value:
-                        # process each reading entry
-
-                        self.timestampDetected = False
-
-                        self.electricityDetected = False
-                        self.electricityNetDetected = False
-                        self.electricitySavedDetected = False
-                        self.solarDetected = False
-                        self.solarUsedDetected = False
-                        self.solarExportedDetected = False
-
-                        self.alwaysOnDetected = False
-
-                        self.timestampUtc = 0
-
-                        self.electricity = 0.0
-                        self.electricityNet = 0.0
-                        self.electricitySaved = 0.0
-                        self.solar = 0.0
-                        self.solarUsed = 0.0
-                        self.solarExported = 0.0
-
-                        self.alwaysOn = 0.0
-
-                        self.electricityLast = 0.0
-                        self.electricityNetLast = 0.0
-                        self.electricitySavedLast = 0.0
-                        self.solarLast = 0.0
-                        self.solarUsedLast = 0.0
-                        self.solarExportedLast = 0.0
-
-                        for key2, value2 in self.readingItem.items():
-                            if key2 == "timestamp":
-                                self.timestampDetected = True
-                                self.timestampUtc = value2
-                                self.timestampUtcLast = value2
-                            elif key2 == "consumption":
-                                self.electricityDetected = True
-                                self.electricity = value2
-                            elif key2 == "solar":
-                                self.solarDetected = True
-                                self.solar = value2
-                            elif key2 == "alwaysOn":
-                                self.alwaysOnDetected = True
-                                self.alwaysOn = value2
-                            else:
-                                pass  # Unknown key/value pair
+                        if not self.globals[CONFIG][channel.supportsKey]:
+                            continue
 
-                        if self.electricityDetected and self.solarDetected:
-                            self.electricityNetDetected = True
-                            self.electricitySavedDetected = True
-                            self.solarUsedDetected = True
-                            self.solarExportedDetected = True
-
-                            # Calculate:
-                            #   Net Electricity used
-                            #   Saved Electricity (i.e. because solar being used)
-                            #   Solar Used
-                            #   Solar Exported
-
-                            if self.electricity > self.solar:
-                                self.electricityNet = self.electricity - self.solar
-                                self.electricitySaved = self.solar
-                            else:
-                                self.electricityNet = 0.0
-                                self.electricitySaved = self.electricity
-                            self.solarUsed = self.electricity - self.electricityNet
-                            if self.solar > self.electricity:
-                                self.solarExported = self.solar - self.electricity
-                            else:
-                                self.solarExported = 0.0
+                        dev = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId][channel.devIdKey]]
+                        channelDevices[channel.name] = dev
+                        lastReadingUtc = self.globals[SMAPPEES][dev.id][channel.cursorKey]
+                        setattr(consumption, f"lastReading{channel.attributeSuffix}Utc", lastReadingUtc)
+                        channelCursorsUtc.append(lastReadingUtc)
+                        self.tracer.debug(self.logger, "handleSmappeeResponse [LRU-{}]: {}", channel.name, TraceTimestamp(lastReadingUtc))
 
-                            if self.timestampDetected:
-                                ts = datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                            else:
-                                ts = "NOT DETECTED"
-                            self.logger.debug(f"ELECTRICITY/SOLAR: DateTime={ts}, Electricity={self.electricity},"
-                                              f" Net={self.electricityNet}, Saved={self.electricitySaved},"
-                                              f" Solar={self.solar}, Solar Used={self.solarUsed}, Solar Exported={self.solarExported}")
-
-                        if self.timestampDetected:
-                            if self.globals[CONFIG][SUPPORTS_ELECTRICITY]:
-                                if self.timestampUtc > self.lastReadingElectricityUtc:
-                                    if self.electricityDetected:
-                                        self.electricityNumberOfValues += 1
-                                        self.electricityTotal += self.electricity
-                                        if self.electricity < self.electricityMinimum:
-                                            self.electricityMinimum = self.electricity
-                                        if self.electricity > self.electricityMaximum:
-                                            self.electricityMaximum = self.electricity
-                                        self.electricityLast = self.electricity
-                                elif self.timestampUtc == self.lastReadingElectricityUtc:
-                                    self.electricityPrevious = 0.0
-                                    if self.electricityDetected:
-                                        self.electricityPrevious = self.electricity * 12
-
-                            if self.globals[CONFIG][SUPPORTS_ELECTRICITY] and self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET] and self.globals[CONFIG][SUPPORTS_SOLAR]:
-                                # Net makes no sense if electricity and solar not measured
-                                if self.timestampUtc > self.lastReadingElectricityNetUtc:
-                                    if self.electricityNetDetected:
-                                        self.electricityNetNumberOfValues += 1
-                                        self.electricityNetTotal += self.electricityNet
-                                        if self.electricityNet < self.electricityNetMinimum:
-                                            self.electricityNetMinimum = self.electricityNet
-                                        if self.electricityNet > self.electricityNetMaximum:
-                                            self.electricityNetMaximum = self.electricityNet
-                                        self.electricityNetLast = self.electricityNet
-                                elif self.timestampUtc == self.lastReadingElectricityNetUtc:
-                                    self.electricityNetPrevious = 0.0
-                                    if self.electricityNetDetected:
-                                        self.electricityNetPrevious = self.electricityNet * 12
-
-                                lrutc = datetime.datetime.fromtimestamp(int(int(self.lastReadingElectricityNetUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                tsutc = datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                self.logger.debug(f"'NET'.            LRUTC: {lrutc}, TSUTC: {tsutc}, Net: {self.electricityNet}")
-
-                            if self.globals[CONFIG][SUPPORTS_ELECTRICITY] and self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED] and self.globals[CONFIG][SUPPORTS_SOLAR]:
-                                # Saved makes no sense if electricity and solar not measured
-                                if self.timestampUtc > self.lastReadingElectricitySavedUtc:
-                                    if self.electricitySavedDetected:
-                                        self.electricitySavedNumberOfValues += 1
-                                        self.electricitySavedTotal += self.electricitySaved
-                                        if self.electricitySaved < self.electricitySavedMinimum:
-                                            self.electricitySavedMinimum = self.electricitySaved
-                                        if self.electricitySaved > self.electricitySavedMaximum:
-                                            self.electricitySavedMaximum = self.electricitySaved
-                                        self.electricitySavedLast = self.electricitySaved
-                                elif self.timestampUtc == self.lastReadingElectricitySavedUtc:
-                                    self.electricitySavedPrevious = 0.0
-                                    if self.electricitySavedDetected:
-                                        self.electricitySavedPrevious = self.electricitySaved * 12
-
-                                lrutc = datetime.datetime.fromtimestamp(int(int(self.lastReadingElectricitySavedUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                tsutc = datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                self.logger.debug(f"'SAVED'.          LRUTC: {lrutc}, TSUTC: {tsutc}, Saved: {self.electricitySaved}")
-
-                            if self.globals[CONFIG][SUPPORTS_SOLAR]:
-                                if self.timestampUtc > self.lastReadingSolarUtc:
-                                    if self.solarDetected:
-                                        self.solarNumberOfValues += 1
-                                        self.solarTotal += self.solar
-                                        if self.solar < self.solarMinimum:
-                                            self.solarMinimum = self.solar
-                                        if self.solar > self.solarMaximum:
-                                            self.solarMaximum = self.solar
-                                        self.solarLast = self.solar
-                                elif self.timestampUtc == self.lastReadingSolarUtc:
-                                    self.solarPrevious = 0.0
-                                    if self.solarDetected:
-                                        self.solarPrevious = self.solar * 12
-                                lrutc = datetime.datetime.fromtimestamp(int(int(self.lastReadingSolarUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                tsutc = datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                self.logger.debug(f"'SOLAR'.          LRUTC: {lrutc}, TSUTC: {tsutc}, Solar: {self.solar}")
-
-                            if self.globals[CONFIG][SUPPORTS_ELECTRICITY] and self.globals[CONFIG][SUPPORTS_SOLAR_USED]:
-                                # Used (Solar) makes no sense if electricity and solar not measured
-                                if self.timestampUtc > self.lastReadingSolarUsedUtc:
-                                    if self.solarUsedDetected:
-                                        self.solarUsedNumberOfValues += 1
-                                        self.solarUsedTotal += self.solarUsed
-                                        self.solarUsedLast = self.solarUsed
-                                elif self.timestampUtc == self.lastReadingSolarUsedUtc:
-                                    self.solarUsedPrevious = 0.0
-                                    if self.solarUsedDetected:
-                                        self.solarUsedPrevious = self.solarUsed * 12
-
-                                lrutc = datetime.datetime.fromtimestamp(int(int(self.lastReadingSolarUsedUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                tsutc = datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                self.logger.debug(f"'SOLAR USED'.     LRUTC: {lrutc}, TSUTC: {tsutc}, Solar Used: {self.solarUsed}")
-
-                            if self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED]:
-                                if self.timestampUtc > self.lastReadingSolarExportedUtc:
-                                    if self.solarExportedDetected:
-                                        self.solarExportedNumberOfValues += 1
-                                        self.solarExportedTotal += self.solarExported
-                                        self.solarExportedLast = self.solarExported
-                                elif self.timestampUtc == self.lastReadingSolarExportedUtc:
-                                    self.solarExportedPrevious = 0.0
-                                    if self.solarExportedDetected:
-                                        self.solarExportedPrevious = self.solarExported * 12
-
-                                lrutc = datetime.datetime.fromtimestamp(int(int(self.lastReadingSolarExportedUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                tsutc = datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime("%Y-%m-%d %H:%M:%S")
-                                self.logger.debug(f"'SOLAR EXPORTED'. LRUTC: {lrutc}, TSUTC: {tsutc}, Solar Exported: {self.solarExported}")
-
-                            if self.globals[SQL][ENABLED]:
-                                insertSql = 'NO SQL SET-UP YET'
-                                try:
-                                    readingTime = str(int(self.timestampUtc / 1000))  # Remove micro seconds
-                                    readingYYYYMMDDHHMMSS = datetime.datetime.fromtimestamp(int(readingTime)).strftime("%Y-%m-%d %H:%M:%S")
-                                    readingYYYYMMDD = readingYYYYMMDDHHMMSS[0:10]
-                                    readingHHMMSS = readingYYYYMMDDHHMMSS[-8:]
-                                    elec = str(int(self.electricity * 10))
-                                    elecNet = str(int(self.electricityNet * 10))
-                                    elecSaved = str(int(self.electricitySaved * 10))
-                                    alwaysOn = str(int(self.alwaysOn * 10))
-                                    solar = str(int(self.solar * 10))
-                                    solarUsed = str(int(self.solarUsed * 10))
-                                    solarExported = str(int(self.solarExported * 10))
-                                    insertSql = f"""
-                                    INSERT OR IGNORE INTO readings (reading_time, reading_YYYYMMDD, reading_HHMMSS, elec, elec_net, elec_saved, always_on, solar, solar_used, solar_exported)
-                                                 VALUES ({readingTime}, '{readingYYYYMMDD}', '{readingHHMMSS}', {elec}, {elecNet}, {elecSaved}, {alwaysOn}, {solar}, {solarUsed}, {solarExported});
-                                    """  # noqa
-                                    self.globals[SQL][SQL_CURSOR].executescript(insertSql)
-                                except sql3.Error as e:
-                                    if self.globals[SQL][SQL_CONNECTION]:
-                                        self.globals[SQL][SQL_CONNECTION].rollback()
-                                    e_args_zero = e.args[0]
-                                    self.logger.error(f"SMAPPEE ERROR DETECTED WITH SQL INSERT: {e_args_zero}, SQL=[{insertSql}]")
-                                    if self.globals[SQL][SQL_CONNECTION]:
-                                        self.globals[SQL][SQL_CONNECTION].close()
-
-                                    self.globals[SQL][ENABLED] = False  # Disable SQL processing
+                        if not dev.states[channel.onlineState]:
+                            stateUpdates.update(dev, channel.onlineState, True, uiValue='online')
+
+                        # The bucket at the channel's cursor is no longer re-fetched, so seed its previous reading from the value stored with the cursor
+                        setattr(consumption, f"{channel.name}Previous", self.globals[SMAPPEES][dev.id][channel.lastReadingKey] * 12)
+
+                    # Records at or before the oldest channel cursor have already been processed
+                    consumption.consumptionCursorUtc = min(channelCursorsUtc) if len(channelCursorsUtc) > 0 else 0
+
+                    # Decode the readings once into columns - the derived channels and each channel's statistics are then calculated a column at a time
+                    columns = self.decodeConsumptionReadings(value)
+                    timestamps = columns["timestamp"]
+
+                    consumption.consumptionRecordsFetched = len(timestamps)
+                    consumption.consumptionRecordsNew = sum(1 for timestampUtc in timestamps if timestampUtc > consumption.consumptionCursorUtc)
+                    consumption.timestampUtcLast = timestamps[-1] if len(timestamps) > 0 else 0
+
+                    consumption.solar = 0.0
+                    consumption.solarUsed = 0.0
+                    consumption.solarExported = 0.0
+                    consumption.alwaysOn = 0.0
+                    if len(timestamps) > 0:
+                        # Readings of the newest bucket (used for the current percentages / always on)
+                        consumption.solar = columns["solar"][-1] or 0.0
+                        consumption.solarUsed = columns["solarUsed"][-1] or 0.0
+                        consumption.solarExported = columns["solarExported"][-1] or 0.0
+                        consumption.alwaysOn = columns["alwaysOn"][-1] or 0.0
+
+                    for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                        # e.g. net, saved and used (solar) make no sense if electricity and solar are not both measured
+                        if all(self.globals[CONFIG][supportsKey] for supportsKey in channel.statisticsKeys):
+                            self.setConsumptionChannelStatistics(consumption, channel, self.consumptionChannelStatistics(timestamps, columns[channel.column],
+                                                                                                            getattr(consumption, f"lastReading{channel.attributeSuffix}Utc"),
+                                                                                                            getattr(consumption, f"{channel.name}Previous")))
 
                     if self.globals[SQL][ENABLED]:
+                        insertSql = 'NO SQL SET-UP YET'
                         try:
+                            self.globals[SQL][SQL_CONNECTION] = sql3.connect(self.globals[SQL]['db'])
+                            self.globals[SQL][SQL_CURSOR] = self.globals[SQL][SQL_CONNECTION].cursor()
+                            for timestampUtc, electricity, electricityNet, electricitySaved, alwaysOn, solar, solarUsed, solarExported in zip(
+                                    timestamps, columns["consumption"], columns["electricityNet"], columns["electricitySaved"], columns["alwaysOn"],
+                                    columns["solar"], columns["solarUsed"], columns["solarExported"]):
+                                readingTime = str(int(timestampUtc / 1000))  # Remove micro seconds
+                                readingYYYYMMDDHHMMSS = datetime.datetime.fromtimestamp(int(readingTime)).strftime("%Y-%m-%d %H:%M:%S")
+                                readingYYYYMMDD = readingYYYYMMDDHHMMSS[0:10]
+                                readingHHMMSS = readingYYYYMMDDHHMMSS[-8:]
+                                elec = str(int((electricity or 0.0) * 10))
+                                elecNet = str(int((electricityNet or 0.0) * 10))
+                                elecSaved = str(int((electricitySaved or 0.0) * 10))
+                                alwaysOn = str(int((alwaysOn or 0.0) * 10))
+                                solar = str(int((solar or 0.0) * 10))
+                                solarUsed = str(int((solarUsed or 0.0) * 10))
+                                solarExported = str(int((solarExported or 0.0) * 10))
+                                insertSql = f"""
+                                INSERT OR IGNORE INTO readings (reading_time, reading_YYYYMMDD, reading_HHMMSS, elec, elec_net, elec_saved, always_on, solar, solar_used, solar_exported)
+                                             VALUES ({readingTime}, '{readingYYYYMMDD}', '{readingHHMMSS}', {elec}, {elecNet}, {elecSaved}, {alwaysOn}, {solar}, {solarUsed}, {solarExported});
+                                """  # noqa
+                                self.globals[SQL][SQL_CURSOR].executescript(insertSql)
                             self.globals[SQL][SQL_CONNECTION].commit()
                         except sql3.Error as e:
                             if self.globals[SQL][SQL_CONNECTION]:
                                 self.globals[SQL][SQL_CONNECTION].rollback()
                             e_args_zero = e.args[0]
-                            self.logger.error(f"SMAPPEE ERROR DETECTED WITH SQL COMMIT: {e_args_zero}")
+                            self.logger.error(f"SMAPPEE ERROR DETECTED WITH SQL INSERT: {e_args_zero}, SQL=[{insertSql}]")
                             self.globals[SQL][ENABLED] = False  # Disable SQL processing
                         finally:
                             if self.globals[SQL][SQL_CONNECTION]:
                                 self.globals[SQL][SQL_CONNECTION].close()
 
-                                # reading entries processing complete
-
-                    if self.electricityNumberOfValues > 0:
-                        self.electricityMeanAverage = self.electricityTotal / self.electricityNumberOfValues
-
-                    if self.electricityNetNumberOfValues > 0:
-                        self.electricityNetMeanAverage = self.electricityNetTotal / self.electricityNetNumberOfValues
-
-                    if self.electricitySavedNumberOfValues > 0:
-                        self.electricitySavedMeanAverage = self.electricitySavedTotal / self.electricitySavedNumberOfValues
-
-                    if self.solarNumberOfValues > 0:
-                        self.solarMeanAverage = self.solarTotal / self.solarNumberOfValues
-
-                    if self.solarUsedNumberOfValues > 0:
-                        self.solarUsedMeanAverage = self.solarUsedTotal / self.solarUsedNumberOfValues
-
-                    if self.solarExportedNumberOfValues > 0:
-                        self.solarExportedMeanAverage = self.solarExportedTotal / self.solarExportedNumberOfValues
-
-                    self.logger.debug(f"READINGS - ELECTRICITY:       Num=[{self.electricityNumberOfValues}], Total=[{self.electricityTotal}],"
-                                      f" MEAN=[{self.electricityMeanAverage}], MIN=[{self.electricityMinimum}], MAX=[{self.electricityMaximum}],"
-                                      f" Last=[{self.electricityLast}]")
-                    self.logger.debug(f"READINGS - ELECTRICITY NET:   Num=[{self.electricityNetNumberOfValues}], Total=[{self.electricityNetTotal}],"
-                                      f" MEAN=[{self.electricityNetMeanAverage}], MIN=[{self.electricityNetMinimum}], MAX=[{self.electricityNetMaximum}],"
-                                      f" Last=[{self.electricityNetLast}]")
-                    self.logger.debug(f"READINGS - ELECTRICITY SAVED: Num=[{self.electricitySavedNumberOfValues}], Total=[{self.electricitySavedTotal}],"
-                                      f" MEAN=[{self.electricitySavedMeanAverage}], MIN=[{self.electricitySavedMinimum}], MAX=[{self.electricitySavedMaximum}],"
-                                      f" Last=[{self.electricitySavedLast}]")
-                    self.logger.debug(f"READINGS - SOLAR:             Num=[{self.solarNumberOfValues}], Total=[{self.solarTotal}],"
-                                      f" MEAN=[{self.solarMeanAverage}], MIN=[{self.solarMinimum}], MAX=[{self.solarMaximum}],"
-                                      f" Lastt=[{self.solarLast}]")
-                    self.logger.debug(f"READINGS - SOLAR USED:        Num=[{self.solarUsedNumberOfValues}], Total=[{self.solarUsedTotal}],"
-                                      f" MEAN=[{self.solarUsedMeanAverage}], MIN=[{ self.solarUsedMinimum}], MAX=[{self.solarUsedMaximum}],"
-                                      f" Last=[{self.solarUsedLast}]")
-                    self.logger.debug(f"READINGS - SOLAR EXPORTED:    Num=[{self.solarExportedNumberOfValues}], Total=[{self.solarExportedTotal}],"
-                                      f" MEAN=[{self.solarExportedMeanAverage}], MIN=[{self.solarExportedMinimum}], MAX=[{self.solarExportedMaximum}],"
-                                      f" Last=[{self.solarExportedLast}]")
-
-                    savedElectricityCalculated = False  # Used to determine whether Solar PV FIT + Elec savings can be calculated
-                    #   Gets set to True if Elec saving calculated so that it can be added to Solar Total Income
-                    #   to derive and update state: dailyTotalPlusSavedElecIncome
-
-                    if self.globals[CONFIG][SUPPORTS_ELECTRICITY]:
-                        if "curEnergyLevel" in devElectricity.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-
-                                self.globals[SMAPPEES][devElectricity.id][CURRENT_ENERGY_LEVEL] = 0.0
-                                self.globals[SMAPPEES][devElectricity.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattStr = f"{self.globals[SMAPPEES][devElectricity.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                                devElectricity.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][devElectricity.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-                                devElectricity.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
-
-                            self.options = devElectricity.pluginProps["optionsEnergyMeterCurPower"]  # mean, minimum, maximum, last
-
-                            if self.options == 'mean':  # mean, minimum, maximum, last
-                                if self.electricityNumberOfValues > 0:
-                                    watts = (self.electricityMeanAverage * 60) / 5
-                                else:
-                                    lastReadingElectricityUtc_minus_600000 = self.lastReadingElectricityUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY: CL=[{self.electricityLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityUtc}], LRUTC600=[{lastReadingElectricityUtc_minus_600000}]")
-                                    if self.electricityLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                            self.lastReadingElectricityUtc - 600000):
-                                        watts = self.electricityLast * 12
-                                    else:
-                                        watts = 0.0
-                            elif self.options == 'minimum':
-                                if self.electricityNumberOfValues > 0:
-                                    watts = self.electricityMinimum * 12
-                                else:
-                                    lastReadingElectricityUtc_minus_600000 = self.lastReadingElectricityUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY: CL=[{self.electricityLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityUtc}], LRUTC600=[{lastReadingElectricityUtc_minus_600000}]")
-                                    if self.electricityLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityUtc - 600000):
-                                        watts = self.electricityLast * 12
-                                    else:
-                                        watts = 0.0
-                            elif self.options == 'maximum':
-                                if self.electricityNumberOfValues > 0:
-                                    watts = self.electricityMaximum * 12
-                                else:
-                                    lastReadingElectricityUtc_minus_600000 = self.lastReadingElectricityUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY: CL=[{self.electricityLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityUtc}], LRUTC600=[{lastReadingElectricityUtc_minus_600000}]")
-                                    if self.electricityLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityUtc - 600000):
-                                        watts = self.electricityLast * 12
-                                    else:
-                                        watts = 0.0
-                            else:  # Assume last
-                                lastReadingElectricityUtc_minus_600000 = self.lastReadingElectricityUtc - 600000
-                                self.logger.debug(f"ELECTRICITY: CL=[{self.electricityLast}], UTCL=[{self.timestampUtcLast}],"
-                                                  f" LRUTC=[{self.lastReadingElectricityUtc}], LRUTC600=[{lastReadingElectricityUtc_minus_600000}]")
-                                if self.electricityLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityUtc - 600000):
-                                    watts = self.electricityLast * 12
-                                else:
-                                    watts = 0.0
-
-                            if watts == 0.0:
-                                watts = self.electricityPrevious
-
-                            wattsStr = f"{int(watts)} Watts"
-                            if not self.globals[SMAPPEES][devElectricity.id][HIDE_ENERGY_METER_CURRENT_POWER]:
-                                self.logger.info(f"received '{devElectricity.name}' power load reading: {wattsStr}")
-
-                            devElectricity.updateStateOnServer("curEnergyLevel", watts, uiValue=wattsStr)
-                            devElectricity.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
-
-                        if "accumEnergyTotal" in devElectricity.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devElectricity.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattStr = f"{self.globals[SMAPPEES][devElectricity.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} Watts"
-                                devElectricity.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][devElectricity.id][ACCUMULATED_ENERGY_TOTAL], uiValue=wattStr)
-
-                            kwh = float(devElectricity.states.get("accumEnergyTotal", 0))
-                            kwh += float(self.electricityTotal / 1000.0)
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            kwhUnitCost = self.globals[SMAPPEES][devElectricity.id][KWH_UNIT_COST]
-                            dailyStandingCharge = self.globals[SMAPPEES][devElectricity.id][DAILY_STANDING_CHARGE]
-
-                            amountGross = 0.00
-                            amountGrossStr = "0.00"
-                            if kwhUnitCost > 0.00:
-                                amountGross = (dailyStandingCharge + (kwh * kwhUnitCost))
-                                amountGrossReformatted = float(str(f"{amountGross:0.2f}"))
-                                amountGrossStr = f"{amountGross:0.2f} {self.globals[SMAPPEES][devElectricity.id][CURRENCY_CODE]}"
-                                devElectricity.updateStateOnServer("dailyTotalCost", amountGrossReformatted, uiValue=amountGrossStr)
-
-                            if not self.globals[SMAPPEES][devElectricity.id][HIDE_ENERGY_METER_ACCUMULATED_POWER]:
-                                if kwhUnitCost == 0.00 or self.globals[SMAPPEES][devElectricity.id][HIDE_ENERGY_METER_ACCUMULATED_POWER_COST]:
-                                    self.logger.info(f"received '{devElectricity.name}' energy total: { kwhStr}")
-                                else:
-                                    self.logger.info(f"received '{devElectricity.name}' energy total: {kwhStr} (Gross {amountGrossStr})")
-
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devElectricity.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                        if "alwaysOn" in devElectricity.states:
-                            wattsAlwaysOn = self.alwaysOn
-                            wattsAlwaysOnStr = f"{int(wattsAlwaysOn)} Watts"
-                            if not self.globals[SMAPPEES][devElectricity.id][HIDE_ALWAYS_ON_POWER]:
-                                self.logger.info(f"received '{devElectricity.name}' always-on reading: {wattsAlwaysOnStr}")
-                            devElectricity.updateStateOnServer("alwaysOn", wattsAlwaysOn, uiValue=wattsAlwaysOnStr)
-
-                        self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC] = self.timestampUtc
-
-                    if self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET]:
-                        if "curEnergyLevel" in devElectricityNet.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devElectricityNet.id][CURRENT_ENERGY_LEVEL] = 0.0
-                                self.globals[SMAPPEES][devElectricityNet.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattStr = f"{self.globals[SMAPPEES][devElectricityNet.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                                devElectricityNet.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][devElectricityNet.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-                                devElectricityNet.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
-
-                            self.options = devElectricityNet.pluginProps["optionsEnergyMeterCurPower"]
-
-                            if self.options == 'mean':  # mean, minimum, maximum, last
-                                if self.electricityNetNumberOfValues > 0:
-                                    wattsNet = (self.electricityNetMeanAverage * 60) / 5
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.electricityNetLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.electricityNetLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                            self.lastReadingElectricityNetUtc - 600000):
-                                        wattsNet = self.electricityNetLast * 12
-                                    else:
-                                        wattsNet = 0.0
-                            elif self.options == 'minimum':
-                                if self.electricityNetNumberOfValues > 0:
-                                    wattsNet = self.electricityNetMinimum * 12
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.electricityNetLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.electricityNetLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                            self.lastReadingElectricityNetUtc - 600000):
-                                        wattsNet = self.electricityNetLast * 12
-                                    else:
-                                        wattsNet = 0.0
-                            elif self.options == 'maximum':
-                                if self.electricityNetNumberOfValues > 0:
-                                    wattsNet = self.electricityNetMaximum * 12
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.electricityNetLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.electricityNetLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityNetUtc - 600000):
-                                        wattsNet = self.electricityNetLast * 12
-                                    else:
-                                        wattsNet = 0.0
-                            else:  # Assume last
-                                lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                self.logger.debug(f"ELECTRICITY NET: CL=[{self.electricityNetLast}], UTCL=[{self.timestampUtcLast}],"
-                                                  f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                if self.electricityNetLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityNetUtc - 600000):
-                                    wattsNet = self.electricityNetLast * 12
-                                else:
-                                    wattsNet = 0.0
-
-                            if wattsNet == 0.0:
-                                wattsNet = self.electricityNetPrevious
+                    if self.globals[HISTORY_STORE].enabled:
+                        self.globals[HISTORY_STORE].store_consumption(responseLocationId, value, SMAPPEE_AGGREGATION_5_MINUTES)
+
+                    self.updateConsumptionRecordCounts(responseLocationId, consumption.consumptionRecordsFetched, consumption.consumptionRecordsNew)
+
+                    for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                        numberOfValues = getattr(consumption, f"{channel.name}NumberOfValues")
+                        if numberOfValues > 0:
+                            setattr(consumption, f"{channel.name}MeanAverage", getattr(consumption, f"{channel.name}Total") / numberOfValues)
+                        self.tracer.debug(self.logger, "READINGS - {}: Num=[{}], Total=[{}], MEAN=[{}], MIN=[{}], MAX=[{}], Last=[{}]", channel.name, numberOfValues,
+                                          getattr(consumption, f"{channel.name}Total"), getattr(consumption, f"{channel.name}MeanAverage"), getattr(consumption, f"{channel.name}Minimum"),
+                                          getattr(consumption, f"{channel.name}Maximum"), getattr(consumption, f"{channel.name}Last"))
+
+                    # The current power (Watts) and accumulated total (kWh) of every channel are calculated before any device is updated,
+                    # as a channel's percentage and cost / income states are relative to other channels (e.g. net to electricity)
+                    channelWatts = dict()
+                    channelKwh = dict()
+                    for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                        dev = channelDevices.get(channel.name)
+                        if dev is None:
+                            continue
+                        if "curEnergyLevel" in dev.states:
+                            channelWatts[channel.name] = self.consumptionChannelWatts(consumption, channel, dev)
+                        if "accumEnergyTotal" in dev.states:
+                            channelKwh[channel.name] = float(dev.states.get("accumEnergyTotal", 0)) + float(getattr(consumption, f"{channel.name}Total") / 1000.0)
+                    channelAmounts = self.consumptionChannelAmounts(channelDevices, channelKwh)
+
+                    for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                        dev = channelDevices.get(channel.name)
+                        if dev is not None:
+                            self.updateConsumptionChannel(commandSentToSmappee, responseLocationId, consumption, channel, dev, channelWatts, channelKwh,
+                                                          channelAmounts.get(channel.name, list()), stateUpdates)
 
-                            wattsNetStr = f"{int(wattsNet)} Watts"
-                            if not self.globals[SMAPPEES][devElectricityNet.id][HIDE_ENERGY_METER_CURRENT_NET_POWER]:
-                                if wattsNet == 0.0 and self.globals[SMAPPEES][devElectricityNet.id][HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER]:
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devElectricityNet.name}' electricity net reading: {wattsNetStr}")
-                            devElectricityNet.updateStateOnServer("curEnergyLevel", wattsNet, uiValue=wattsNetStr)
-                            devElectricityNet.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
-
-                            if watts > 0.00:
-                                netPercentage = int(round((wattsNet / watts) * 100))
-                            else:
-                                netPercentage = int(0)
-                            netPercentageStr = f"{int(netPercentage)}%"
-                            devElectricityNet.updateStateOnServer("kwhCurrentNetPercentage", netPercentage, uiValue=netPercentageStr)
-
-                        if "accumEnergyTotal" in devElectricityNet.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devElectricityNet.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattNetStr = f"{self.globals[SMAPPEES][devElectricityNet.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} Watts"
-                                devElectricityNet.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][devElectricityNet.id][ACCUMULATED_ENERGY_TOTAL], uiValue=wattNetStr)
-
-                            if "accumEnergyTotal" in devElectricity.states:
-                                # Need to check this as the kwh, gross amount, unit cost and currency code is retrieved from the Electricity Device
-
-                                kwhNet = float(devElectricityNet.states.get("accumEnergyTotal", 0))
-                                kwhNet += float(self.electricityNetTotal / 1000.0)
-                                kwhNetStr = f"{kwhNet:0.3f} kWh"
-                                kwhUnitCost = self.globals[SMAPPEES][devElectricity.id][KWH_UNIT_COST]
-                                dailyStandingCharge = self.globals[SMAPPEES][devElectricity.id][DAILY_STANDING_CHARGE]
-
-                                kwhNetReformatted = float(f"{kwhNet:0.3f}")
-                                devElectricityNet.updateStateOnServer("accumEnergyTotal", kwhNetReformatted, uiValue=kwhNetStr)
-
-                                amountNet = 0.00
-                                if kwhUnitCost > 0.00:
-                                    amountNet = dailyStandingCharge + (kwhNet * kwhUnitCost)
-                                    amountNetReformatted = float(str(f"{amountNet:0.2f}"))
-                                    amountNetStr = f"{amountNet:0.2f} {self.globals[SMAPPEES][devElectricity.id][CURRENCY_CODE]}"
-                                    devElectricityNet.updateStateOnServer("dailyNetTotalCost", amountNetReformatted, uiValue=amountNetStr)
-
-                                if not self.globals[SMAPPEES][devElectricityNet.id][HIDE_ENERGY_METER_ACCUMULATED_NET_POWER]:
-                                    if kwhUnitCost == 0.00 or self.globals[SMAPPEES][devElectricityNet.id][HIDE_ENERGY_METER_ACCUMULATED_NET_POWER_COST]:
-                                        self.logger.info(f"received '{devElectricityNet.name}' net energy total: {kwhNetStr}")
-                                    else:
-                                        self.logger.info(f"received '{devElectricityNet.name}' net energy total: {kwhNetStr} (Net {amountNetStr})")
-
-                                if kwhNet > 0.00:
-                                    netDailyPercentage = int(round((kwhNet / kwh) * 100))
-                                else:
-                                    netDailyPercentage = int(0)
-                                netDailyPercentageStr = f"{int(netDailyPercentage)}%"
-                                devElectricityNet.updateStateOnServer("kwhDailyTotalNetPercentage", netDailyPercentage, uiValue=netDailyPercentageStr)
-
-                        self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC] = self.timestampUtc
-
-                    if self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED]:
+                elif key == 'error':
+                    self.logger.error(f"SMAPPEE ERROR DETECTED [{commandSentToSmappee}]: {value}")
+                else:
+                    pass  # Unknown key/value pair
+                    self.tracer.debug(self.logger, "Unhandled key/value pair : K=[{}], V=[{}]", key, value)
 
-                        if "curEnergyLevel" in devElectricitySaved.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devElectricitySaved.id][CURRENT_ENERGY_LEVEL] = 0.0
-                                self.globals[SMAPPEES][devElectricitySaved.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattStr = f"{self.globals[SMAPPEES][devElectricitySaved.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                                devElectricitySaved.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][devElectricitySaved.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-                                devElectricitySaved.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                            self.options = devElectricitySaved.pluginProps["optionsEnergyMeterCurPower"]
+        finally:
+            stateUpdates.flush()
 
-                            if self.options == 'mean':  # mean, minimum, maximum, last
-                                if self.electricitySavedNumberOfValues > 0:
-                                    wattsSaved = (self.electricitySavedMeanAverage * 60) / 5
-                                else:
-                                    lastReadingElectricitySavedUtc_minus_600000 = self.lastReadingElectricitySavedUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY SAVED: CL=[{self.electricitySavedLas}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricitySavedUtc}], LRUTC600=[{lastReadingElectricitySavedUtc_minus_600000}]")
-                                    if self.electricitySavedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricitySavedUtc - 600000):
-                                        wattsSaved = self.electricitySavedLast * 12
-                                    else:
-                                        wattsSaved = 0.0
-                            elif self.options == 'minimum':
-                                if self.electricitySavedNumberOfValues > 0:
-                                    wattsSaved = self.electricitySavedMinimum * 12
-                                else:
-                                    lastReadingElectricitySavedUtc_minus_600000 = self.lastReadingElectricitySavedUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY SAVED: CL=[{self.electricitySavedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricitySavedUtc}], LRUTC600=[{lastReadingElectricitySavedUtc_minus_600000}]")
-                                    if self.electricitySavedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricitySavedUtc - 600000):
-                                        wattsSaved = self.electricitySavedLast * 12
-                                    else:
-                                        wattsSaved = 0.0
-                            elif self.options == 'maximum':
-                                if self.electricitySavedNumberOfValues > 0:
-                                    wattsSaved = self.electricitySavedMaximum * 12
-                                else:
-                                    lastReadingElectricitySavedUtc_minus_600000 = self.lastReadingElectricitySavedUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY SAVED: CL=[{self.electricitySavedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricitySavedUtc}], LRUTC600=[{lastReadingElectricitySavedUtc_minus_600000}]")
-                                    if self.electricitySavedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                            self.lastReadingElectricitySavedUtc - 600000):
-                                        wattsSaved = self.electricitySavedLast * 12
-                                    else:
-                                        wattsSaved = 0.0
-                            else:  # Assume last
-                                lastReadingElectricitySavedUtc_minus_600000 = self.lastReadingElectricitySavedUtc - 600000
-                                self.logger.debug(f"ELECTRICITY SAVED: CL=[{self.electricitySavedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                  f" LRUTC=[{self.lastReadingElectricitySavedUtc}], LRUTC600=[{lastReadingElectricitySavedUtc_minus_600000}]")
-                                if self.electricitySavedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricitySavedUtc - 600000):
-                                    wattsSaved = self.electricitySavedLast * 12
-                                else:
-                                    wattsSaved = 0.0
+    def updateConsumptionRecordCounts(self, responseLocationId, recordsFetched, recordsNew):
+        try:
+            if responseLocationId not in self.globals[CONSUMPTION_RECORDS]:
+                self.globals[CONSUMPTION_RECORDS][responseLocationId] = dict()
+                self.globals[CONSUMPTION_RECORDS][responseLocationId][RECORDS_FETCHED] = 0
+                self.globals[CONSUMPTION_RECORDS][responseLocationId][RECORDS_NEW] = 0
+            self.globals[CONSUMPTION_RECORDS][responseLocationId][RECORDS_FETCHED] += recordsFetched
+            self.globals[CONSUMPTION_RECORDS][responseLocationId][RECORDS_NEW] += recordsNew
 
-                            if wattsSaved == 0.0:
-                                wattsSaved = self.electricitySavedPrevious
+            self.tracer.debug(self.logger, "Consumption for location [{}]: {} records fetched, {} new [Totals: {} fetched, {} new]", responseLocationId, recordsFetched, recordsNew, self.globals[CONSUMPTION_RECORDS][responseLocationId][RECORDS_FETCHED], self.globals[CONSUMPTION_RECORDS][responseLocationId][RECORDS_NEW])
 
-                            wattsSavedStr = f"{int(wattsSaved)} Watts"
-                            if not self.globals[SMAPPEES][devElectricitySaved.id][HIDE_ENERGY_METER_CURRENT_SAVED_POWER]:
-                                if wattsSaved == 0.0 and self.globals[SMAPPEES][devElectricitySaved.id][HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER]:
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devElectricitySaved.name}' electricity saved reading: {wattsSavedStr}")
-                            devElectricitySaved.updateStateOnServer("curEnergyLevel", wattsSaved, uiValue=wattsSavedStr)
-                            devElectricitySaved.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
+            self.updatePollingActivity(responseLocationId, recordsNew > 0)
 
-                            if watts > 0.00:
-                                savedPercentage = int(round((wattsSaved / watts) * 100))
-                            else:
-                                savedPercentage = int(0)
-                            savedPercentageStr = f"{savedPercentage}%"
-                            devElectricitySaved.updateStateOnServer("kwhCurrentSavedPercentage", savedPercentage, uiValue=savedPercentageStr)
-
-                        if "accumEnergyTotal" in devElectricitySaved.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devElectricitySaved.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattSavedStr = f"{self.globals[SMAPPEES][devElectricitySaved.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} Watts"
-                                devElectricitySaved.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][devElectricitySaved.id][ACCUMULATED_ENERGY_TOTAL], uiValue=wattSavedStr)
-
-                            if "accumEnergyTotal" in devElectricity.states:
-                                # Need to check this as the gross amount, unit cost and currency code is retrieved from the Electricity Device
-
-                                kwhSaved = float(devElectricitySaved.states.get("accumEnergyTotal", 0))
-                                kwhSaved += float(self.electricitySavedTotal / 1000.0)
-                                kwhSavedStr = f"{kwhSaved:0.3f} kWh"
-                                kwhUnitCost = self.globals[SMAPPEES][devElectricity.id][KWH_UNIT_COST]
-
-                                amountSaved = 0.00
-                                if kwhUnitCost > 0.00:
-                                    amountSaved = (kwhSaved * kwhUnitCost)
-                                    amountSavedReformatted = float(f"{amountSaved:0.2f}")
-                                    amountSavedStr = f"{amountSaved:0.2f} {self.globals[SMAPPEES][devElectricity.id][CURRENCY_CODE]}"
-                                    devElectricitySaved.updateStateOnServer("dailyTotalCostSaving", amountSavedReformatted, uiValue=amountSavedStr)
-
-                                    savedElectricityCalculated = True  # Enables calculation and storing of: dailyTotalPlusSavedElecIncome
-
-                                if not self.globals[SMAPPEES][devElectricitySaved.id][HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER]:
-                                    if kwhUnitCost == 0.00 or self.globals[SMAPPEES][devElectricitySaved.id][HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER_COST]:
-                                        self.logger.info(f"received '{devElectricitySaved.name}' saved energy total: {kwhSavedStr}")
-                                    else:
-                                        self.logger.info(f"received '{devElectricitySaved.name}' saved energy total: {kwhSavedStr} (Saved {amountSavedStr})")
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                                kwhSavedReformatted = float(f"{kwhSaved:0.3f}")
-                                devElectricitySaved.updateStateOnServer("accumEnergyTotal", kwhSavedReformatted, uiValue=kwhSavedStr)
+    def decodeConsumptionReadings(self, readings):
+        # Decodes the Smappee consumption readings (ignoring any without a timestamp) into columns: one list per value, indexed alike.
+        # A value not reported in a reading is None; the derived columns are only calculated where both electricity and solar were reported
+        readings = [reading for reading in readings if "timestamp" in reading]
+        columns = dict()
+        columns["timestamp"] = [reading["timestamp"] for reading in readings]
+        columns["consumption"] = [reading.get("consumption") for reading in readings]
+        columns["solar"] = [reading.get("solar") for reading in readings]
+        columns["alwaysOn"] = [reading.get("alwaysOn") for reading in readings]
+
+        # Electricity saved (because solar is being used) and solar used are both the lesser of electricity and solar
+        columns["electricitySaved"] = [min(electricity, solar) if electricity is not None and solar is not None else None
+                                       for electricity, solar in zip(columns["consumption"], columns["solar"])]
+        columns["solarUsed"] = columns["electricitySaved"]
+        columns["electricityNet"] = [electricity - saved if saved is not None else None for electricity, saved in zip(columns["consumption"], columns["electricitySaved"])]
+        columns["solarExported"] = [solar - used if used is not None else None for solar, used in zip(columns["solar"], columns["solarUsed"])]
+        return columns
+
+    def consumptionChannelStatistics(self, timestamps, values, lastReadingUtc, previous):
+        # Returns [numberOfValues, total, minimum, maximum, last, previous] of a channel's column for the buckets after its cursor (lastReadingUtc).
+        # last is the newest bucket's value (0.0 if not reported / already processed); previous (Watts) is replaced if the bucket at the cursor was re-fetched
+        newValues = [value for timestampUtc, value in zip(timestamps, values) if timestampUtc > lastReadingUtc and value is not None]
+        cursorValues = [value for timestampUtc, value in zip(timestamps, values) if timestampUtc == lastReadingUtc]
+        if len(cursorValues) > 0:
+            previous = cursorValues[-1] * 12 if cursorValues[-1] is not None else 0.0
+        last = 0.0
+        if len(timestamps) > 0 and timestamps[-1] > lastReadingUtc and values[-1] is not None:
+            last = values[-1]
+        return [len(newValues), float(sum(newValues)), min(newValues, default=99999999.0), max(newValues + [0.0]), last, previous]
+
+    def setConsumptionChannelStatistics(self, consumption, channel, statistics):
+        # Sets the channel's statistics attributes (e.g. consumption.electricityNetTotal) used to update its device from
+        # [numberOfValues, total, minimum, maximum, last, previous] - the mean average is calculated once all the statistics have been set
+        (numberOfValues, total, minimum, maximum, last, previous) = statistics
+        setattr(consumption, f"{channel.name}NumberOfValues", numberOfValues)
+        setattr(consumption, f"{channel.name}Total", total)
+        setattr(consumption, f"{channel.name}MeanAverage", 0.0)
+        setattr(consumption, f"{channel.name}Minimum", minimum)
+        setattr(consumption, f"{channel.name}Maximum", maximum)
+        setattr(consumption, f"{channel.name}Last", last)
+        setattr(consumption, f"{channel.name}Previous", previous)
+
+    def consumptionChannelWatts(self, consumption, channel, dev):
+        # Returns the channel's current power (Watts) from its statistics, as selected by the device's optionsEnergyMeterCurPower (mean, minimum, maximum, last)
+        numberOfValues = getattr(consumption, f"{channel.name}NumberOfValues")
+        options = dev.pluginProps["optionsEnergyMeterCurPower"]
+        if numberOfValues > 0 and options == 'mean':
+            watts = (getattr(consumption, f"{channel.name}MeanAverage") * 60) / 5
+        elif numberOfValues > 0 and options == 'minimum':
+            watts = getattr(consumption, f"{channel.name}Minimum") * 12
+        elif numberOfValues > 0 and options == 'maximum':
+            watts = getattr(consumption, f"{channel.name}Maximum") * 12
+        else:  # Assume last
+            last = getattr(consumption, f"{channel.name}Last")
+            lastReadingUtc = getattr(consumption, f"lastReading{channel.attributeSuffix}Utc")
+            self.tracer.debug(self.logger, "{}: CL=[{}], UTCL=[{}], LRUTC=[{}], LRUTC600=[{}]", channel.name, last, consumption.timestampUtcLast, lastReadingUtc, lastReadingUtc - 600000)
+            if last > 0.0 and consumption.timestampUtcLast != 0 and consumption.timestampUtcLast > (lastReadingUtc - 600000):
+                watts = last * 12
+            else:
+                watts = 0.0
 
-                                if kwhSaved > 0.00:
-                                    savedDailyPercentage = int(round((kwhSaved / kwh) * 100))
-                                else:
-                                    savedDailyPercentage = int(0)
-                                savedDailyPercentageStr = f"{int(savedDailyPercentage)} %"
-                                devElectricitySaved.updateStateOnServer("kwhDailyTotalSavedPercentage", savedDailyPercentage, uiValue=savedDailyPercentageStr)
+        if watts == 0.0:
+            watts = getattr(consumption, f"{channel.name}Previous")
+        return watts
 
-                        self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC] = self.timestampUtc
+    def consumptionChannelAmounts(self, channelDevices, channelKwh):
+        # Returns per channel name, the channel device's cost / income states as [(state key, amount, currency code, log label)] - a log label of None isn't logged.
+        # The tariffs are held on the electricity and solar devices, so unlike the rest of a channel's device updates the amounts are calculated per channel
+        amounts = dict()
+        try:
+            if "electricity" in channelKwh:
+                devElectricity = channelDevices["electricity"]
+                kwhUnitCost = self.globals[SMAPPEES][devElectricity.id][KWH_UNIT_COST]
+                dailyStandingCharge = self.globals[SMAPPEES][devElectricity.id][DAILY_STANDING_CHARGE]
+                currencyCode = self.globals[SMAPPEES][devElectricity.id][CURRENCY_CODE]
+                if kwhUnitCost > 0.00:
+                    amounts["electricity"] = [("dailyTotalCost", dailyStandingCharge + (channelKwh["electricity"] * kwhUnitCost), currencyCode, "Gross")]
+                    if "electricityNet" in channelKwh:
+                        amounts["electricityNet"] = [("dailyNetTotalCost", dailyStandingCharge + (channelKwh["electricityNet"] * kwhUnitCost), currencyCode, "Net")]
+                    if "electricitySaved" in channelKwh:
+                        amounts["electricitySaved"] = [("dailyTotalCostSaving", channelKwh["electricitySaved"] * kwhUnitCost, currencyCode, "Saved")]
+
+            # To calculate the solar income, all three device types solar, solarUsed and solarExported must be present
+            if "solar" in channelKwh and "solarUsed" in channelKwh and "solarExported" in channelKwh:
+                devSolar = channelDevices["solar"]
+                kwhSolar = channelKwh["solar"]
+                generationRate = self.globals[SMAPPEES][devSolar.id][GENERATION_RATE]
+                exportRate = self.globals[SMAPPEES][devSolar.id][EXPORT_RATE]
+                currencyCode = self.globals[SMAPPEES][devSolar.id][CURRENCY_CODE]
+
+                amountGenerated = 0.00
+                amountExported = 0.00  # Needed for calculation of total FIT payment
+                if generationRate > 0.00:
+                    amountGenerated = (kwhSolar * generationRate)
+                if exportRate > 0.00:
+                    exportType = self.globals[SMAPPEES][devSolar.id][EXPORT_TYPE]
+                    if exportType == 'percentage':
+                        exportPercentage = self.globals[SMAPPEES][devSolar.id][EXPORT_PERCENTAGE]
+                    elif exportType == 'actual' and kwhSolar > 0.00:
+                        exportPercentage = (channelKwh["solarExported"] / kwhSolar) * 100
+                    else:
+                        exportPercentage = 0.00
+                    amountExported = (kwhSolar * exportRate * exportPercentage) / 100
+                amountSolar = amountGenerated + amountExported
 
-                    if self.globals[CONFIG][SUPPORTS_SOLAR]:
+                amounts["solar"] = [("dailyTotalGenOnlyIncome", amountGenerated, currencyCode, None), ("dailyTotalIncome", amountSolar, currencyCode, "")]
+                if "electricitySaved" in amounts:
+                    amounts["solar"].append(("dailyTotalPlusSavedElecIncome", amountSolar + amounts["electricitySaved"][0][1], currencyCode, None))
+                amounts["solarExported"] = [("dailyTotalExportOnlyIncome", amountExported, currencyCode, None)]
 
-                        if "curEnergyLevel" in devSolar.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                                self.globals[SMAPPEES][devSolar.id][CURRENT_ENERGY_LEVEL] = 0.0
-                                self.globals[SMAPPEES][devSolar.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattSolarStr = f"{self.globals[SMAPPEES][devSolar.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                                devSolar.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][devSolar.id][CURRENT_ENERGY_LEVEL], uiValue=wattSolarStr)
-                                devSolar.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
+        return amounts
 
-                            self.optionsEnergyMeterCurPower = devSolar.pluginProps[
-                                'optionsEnergyMeterCurPower']  # mean, minimum, maximum, last
-                            if self.optionsEnergyMeterCurPower == 'mean':
-                                if self.solarNumberOfValues > 0:
-                                    wattsSolar = self.solarTotal * (60.0 / float(float(self.solarNumberOfValues) * 5))
-                                    self.logger.debug(f"watts > 0 =[{watts}]")
-                                else:
-                                    lastReadingSolarUtc_minus_600000 = self.lastReadingSolarUtc - 600000
-                                    self.logger.debug(f"SOLAR: CL=[{self.solarLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingSolarUtc}], LRUTC600=[{lastReadingSolarUtc_minus_600000}]")
-                                    if self.solarLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingSolarUtc - 600000):
-                                        wattsSolar = self.solarLast * 12
-                                    else:
-                                        wattsSolar = 0.0
-                            elif self.optionsEnergyMeterCurPower == 'minimum':
-                                if self.solarNumberOfValues > 0:
-                                    wattsSolar = self.solarMinimum * 12
-                                else:
-                                    lastReadingSolarUtc_minus_600000 = self.lastReadingSolarUtc - 600000
-                                    self.logger.debug(f"SOLAR: CL=[{self.solarLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingSolarUtc}], LRUTC600=[{lastReadingSolarUtc_minus_600000}]")
-                                    if self.solarLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingSolarUtc - 600000):
-                                        wattsSolar = self.solarLast * 12
-                                    else:
-                                        wattsSolar = 0.0
-                            elif self.optionsEnergyMeterCurPower == 'maximum':
-                                if self.solarNumberOfValues > 0:
-                                    wattsSolar = self.solarMaximum * 12
-                                else:
-                                    lastReadingSolarUtc_minus_600000 = self.lastReadingSolarUtc - 600000
-                                    self.logger.debug(f"SOLAR: CL=[{self.solarLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingSolarUtc}], LRUTC600=[{lastReadingSolarUtc_minus_600000}]")
-                                    if self.solarLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingSolarUtc - 600000):
-                                        wattsSolar = self.solarLast * 12
-                                    else:
-                                        wattsSolar = 0.0
-                            else:  # Assume last
-                                lastReadingSolarUtc_minus_600000 = self.lastReadingSolarUtc - 600000
-                                self.logger.debug(f"SOLAR: CL=[{self.solarLast}], UTCL=[{self.timestampUtcLast}],"
-                                                  f" LRUTC=[{self.lastReadingSolarUtc}], LRUTC600=[{lastReadingSolarUtc_minus_600000}]")
-                                if self.solarLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingSolarUtc - 600000):
-                                    wattsSolar = self.solarLast * 12
-                                else:
-                                    wattsSolar = 0.0
+    def updateConsumptionChannel(self, commandSentToSmappee, responseLocationId, consumption, channel, dev, channelWatts, channelKwh, amounts, stateUpdates):
+        # Updates a consumption channel's device (see handleGetConsumption) as described by the channel's descriptor (see SMAPPEE_CONSUMPTION_CHANNELS)
+        try:
+            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
+                # The accumulated total has already been reset (and the cursor restarted) when the reset was requested - see reset_consumption_channel
+                self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
+                self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
+                if "curEnergyLevel" in dev.states:
+                    stateUpdates.update(dev, "curEnergyLevel", 0.0, uiValue="0 Watts")
+                    dev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
 
-                            if wattsSolar == 0.0:
-                                wattsSolar = self.solarPrevious
+            if channel.name in channelWatts:
+                watts = channelWatts[channel.name]
+                wattsStr = f"{int(watts)} Watts"
+                if channel.realtimePower and self.realtimePowerActive(responseLocationId, channel.devIdKey):
+                    pass  # Current power is being updated from the Smappee monitor via MQTT
+                else:
+                    if not self.consumptionLoggingHidden(dev, channel.currentHideKey):
+                        if watts == 0.0 and self.consumptionLoggingHidden(dev, channel.currentZeroHideKey):
+                            pass
+                        else:
+                            self.logger.info(f"received '{dev.name}' {channel.currentDescription}: {wattsStr}")
+                    stateUpdates.update(dev, "curEnergyLevel", watts, uiValue=wattsStr)
+                    dev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
+
+                if channel.currentPercentageState is not None and channel.percentageOf in channelWatts:
+                    percentage = self.consumptionChannelPercentage(watts, channelWatts[channel.percentageOf])
+                    stateUpdates.update(dev, channel.currentPercentageState, percentage, uiValue=f"{percentage}%")
+
+            if channel.name in channelKwh:
+                kwh = channelKwh[channel.name]
+                kwhStr = f"{kwh:0.3f} kWh"
+                kwhReformatted = float(f"{kwh:0.3f}")
+
+                amountLogStr = None
+                for stateKey, amount, currencyCode, logLabel in amounts:
+                    amountStr = f"{amount:0.2f} {currencyCode}"
+                    stateUpdates.update(dev, stateKey, float(f"{amount:0.2f}"), uiValue=amountStr)
+                    if logLabel is not None:
+                        amountLogStr = f"{logLabel} {amountStr}" if logLabel != "" else amountStr
+
+                if not self.consumptionLoggingHidden(dev, channel.accumulatedHideKey):
+                    if (self.consumptionLoggingHidden(dev, channel.noChangeHideKey) and
+                            kwhReformatted == float(dev.states['accumEnergyTotal']) and channelWatts.get(channel.name, 0.0) == 0.0):
+                        pass
+                    elif amountLogStr is None or self.consumptionLoggingHidden(dev, channel.accumulatedCostHideKey):
+                        self.logger.info(f"received '{dev.name}' {channel.accumulatedDescription}: {kwhStr}")
+                    else:
+                        self.logger.info(f"received '{dev.name}' {channel.accumulatedDescription}: {kwhStr} ({amountLogStr})")
 
-                            wattsSolarStr = f"{int(wattsSolar)} Watts"
-                            if not self.globals[SMAPPEES][devSolar.id][HIDE_SOLAR_METER_CURRENT_GENERATION]:
-                                if wattsSolar == 0.0 and self.globals[SMAPPEES][devSolar.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION]:
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devSolar.name}' solar generation reading: {wattsSolarStr}")
-                            devSolar.updateStateOnServer("curEnergyLevel", wattsSolar, uiValue=wattsSolarStr)
-                            devSolar.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
-
-                        if "accumEnergyTotal" in devSolar.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devSolar.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattSolarStr = f"{self.globals[SMAPPEES][devSolar.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} Watts"
-                                devSolar.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][devSolar.id][ACCUMULATED_ENERGY_TOTAL], uiValue=wattSolarStr)
-
-                            # To calculate Amounts (financials) all three device types solar, solaUsed and solarExported must be present
-
-                            self.financialsEnabled = True
-
-                            # Calculate Solar Total (Daily)
-
-                            kwhSolar = float(devSolar.states.get("accumEnergyTotal", 0))
-                            kwhSolar += float(self.solarTotal / 1000.0)
-                            kwhSolarStr = f"{kwhSolar:0.3f} kWh"
-
-                            generationRate = self.globals[SMAPPEES][devSolar.id][GENERATION_RATE]
-                            exportRate = self.globals[SMAPPEES][devSolar.id][EXPORT_RATE]
-
-                            if self.globals[CONFIG][SUPPORTS_SOLAR_USED] and "accumEnergyTotal" in devSolarUsed.states:
-                                # Calculate Solar Used (Daily)
-                                kwhUsed = float(devSolarUsed.states.get("accumEnergyTotal", 0))
-                                kwhUsed += float(self.solarUsedTotal / 1000.0)
-
-                                if self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED] and "accumEnergyTotal" in devSolarExported.states:
-                                    # Calculate Solar Exported (Daily)
-                                    kwhExported = float(devSolarExported.states.get("accumEnergyTotal", 0))
-                                    kwhExported += float(self.solarExportedTotal / 1000.0)
-
-                                    amountSolar = 0.00
-                                    amountExported = 0.00  # Needed for calculation of total FIT payment
-                                    amountGenerated = 0.00
-
-                                    if generationRate > 0.00:
-                                        amountGenerated = (kwhSolar * generationRate)
-                                    if exportRate > 0.00:
-                                        exportType = self.globals[SMAPPEES][devSolar.id][EXPORT_TYPE]
-                                        if exportType == 'percentage':
-                                            exportPercentage = self.globals[SMAPPEES][devSolar.id][EXPORT_PERCENTAGE]
-                                        elif exportType == 'actual':
-                                            exportPercentage = (kwhExported / kwhSolar) * 100
-                                        else:
-                                            exportPercentage = 0.00
-                                        amountExported = (kwhSolar * exportRate * exportPercentage) / 100
+                stateUpdates.update(dev, "accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
 
-                                    amountSolar = amountGenerated + amountExported
+                if channel.dailyPercentageState is not None and channel.percentageOf in channelKwh:
+                    percentage = self.consumptionChannelPercentage(kwh, channelKwh[channel.percentageOf])
+                    stateUpdates.update(dev, channel.dailyPercentageState, percentage, uiValue=f"{percentage}%")
 
-                                    amountGeneratedReformatted = float(f"{amountGenerated:0.2f}")
-                                    amountGeneratedStr = f"{amountGenerated:0.2f} {self.globals[SMAPPEES][devSolar.id][CURRENCY_CODE]}"
-                                    devSolar.updateStateOnServer("dailyTotalGenOnlyIncome", amountGeneratedReformatted, uiValue=amountGeneratedStr)
+            if channel.alwaysOnHideKey is not None and "alwaysOn" in dev.states:
+                wattsAlwaysOn = consumption.alwaysOn
+                wattsAlwaysOnStr = f"{int(wattsAlwaysOn)} Watts"
+                if not self.consumptionLoggingHidden(dev, channel.alwaysOnHideKey):
+                    self.logger.info(f"received '{dev.name}' always-on reading: {wattsAlwaysOnStr}")
+                stateUpdates.update(dev, "alwaysOn", wattsAlwaysOn, uiValue=wattsAlwaysOnStr)
 
-                                    amountSolarReformatted = float(f"{amountSolar:0.2f}")
-                                    amountSolarStr = f"{amountSolarReformatted:0.2f} {self.globals[SMAPPEES][devSolar.id][CURRENCY_CODE]}"
-                                    devSolar.updateStateOnServer("dailyTotalIncome", amountSolarReformatted, uiValue=amountSolarStr)
+            if consumption.timestampUtcLast > getattr(consumption, f"lastReading{channel.attributeSuffix}Utc"):  # Only advance the cursor if newer buckets were received
+                self.globals[SMAPPEES][dev.id][channel.cursorKey] = consumption.timestampUtcLast
+                self.globals[SMAPPEES][dev.id][channel.lastReadingKey] = getattr(consumption, f"{channel.name}Last")
 
-                                    if savedElectricityCalculated:
-                                        amountSolarPlusSaving = amountSolar + amountSaved
-                                        amountSolarPlusSavingReformatted = float(f"{amountSolarPlusSaving:0.2f}")
-                                        amountSolarPlusSavingStr = f"{amountSolarPlusSaving:0.2f} {self.globals[SMAPPEES][devSolar.id][CURRENCY_CODE]}"
-                                        devSolar.updateStateOnServer("dailyTotalPlusSavedElecIncome", amountSolarPlusSavingReformatted, uiValue=amountSolarPlusSavingStr)
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                            if not self.globals[SMAPPEES][devSolar.id][HIDE_SOLAR_METER_ACCUMULATED_GENERATION]:
-                                if self.globals[SMAPPEES][devSolar.id][HIDE_SOLAR_METER_ACCUMULATED_GENERATION_COST]:
-                                    if generationRate == 0.00 and self.globals[SMAPPEES][devSolar.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION]:
-                                        pass  # Don't output zero solar values
-                                    else:
-                                        # if 'no change in solar' and self.globals[SMAPPEES][devSolar.id][HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION]:
-                                        #     pass
-                                        # else:
-                                        # do code below .... (remember to indent it!)
-                                        self.logger.info(f"received '{devSolar.name}' solar generation total: {kwhSolarStr}")
-                                else:
-                                    if generationRate == 0.00 and self.globals[SMAPPEES][devSolar.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION]:
-                                        pass  # Don't output zero solar values
-                                    else:
-                                        # if 'no change in solar' and self.globals[SMAPPEES][devSolar.id][HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION]:
-                                        #     pass
-                                        # else:
-                                        # do code below .... (remember to indent it!)
-                                        self.logger.info(f"received '{devSolar.name}' solar generation total: {kwhSolarStr} ({amountSolarStr})")
+    def consumptionLoggingHidden(self, dev, hideKey):
+        # hideKey is one of the SMAPPEES keys of a consumption channel's logging options (see SMAPPEE_CONSUMPTION_CHANNELS) or None if the device doesn't have the option
+        return hideKey is not None and bool(self.globals[SMAPPEES][dev.id].get(hideKey, False))
 
-                                        # self.globals[SMAPPEES][devSolar.id][HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION] and kwhReformatted == float(devSolar.states['accumEnergyTotal']) and wattsSolar == 0.0:
+    def consumptionChannelPercentage(self, value, relativeToValue):
+        if relativeToValue > 0.00:
+            return int(round((value / relativeToValue) * 100))
+        return int(0)
 
-                            kwhSolarReformatted = float(f"{kwhSolar:0.3f}")
-                            devSolar.updateStateOnServer("accumEnergyTotal", kwhSolarReformatted, uiValue=kwhSolarStr)
+    def startConsumptionChannel(self, channel, dev):
+        # Called from deviceStartComm - initialises internal to plugin smappee states of a consumption channel's device (see SMAPPEE_CONSUMPTION_CHANNELS) to default values
+        try:
+            self.tracer.debug(self.logger, "SMAPPEE DEV [{}] START smappeeServiceLocationIdToDevId = [{}]", channel.name, self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
 
-                        self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC] = self.timestampUtc
+            self.globals[CONFIG][channel.supportsKey] = True
 
-                    if self.globals[CONFIG][SUPPORTS_SOLAR_USED]:
-                        if "curEnergyLevel" in devSolarUsed.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devSolarUsed.id][CURRENT_ENERGY_LEVEL] = 0.0
-                                self.globals[SMAPPEES][devSolarUsed.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattsUsedStr = f"{self.globals[SMAPPEES][devSolarUsed.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                                devSolarUsed.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][devSolarUsed.id][CURRENT_ENERGY_LEVEL], uiValue=wattsUsedStr)
-                                devSolarUsed.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
+            self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
 
-                            self.options = devSolarUsed.pluginProps["optionsEnergyMeterCurPower"]
+            self.tracer.debug(self.logger, "SMAPPEE DEV [{}] START self.serviceLocationId = [{}]", channel.name, self.serviceLocationId)
 
-                            if self.options == 'mean':  # mean, minimum, maximum, last
-                                if self.solarUsedNumberOfValues > 0:
-                                    wattsUsed = (self.solarUsedMeanAverage * 60) / 5
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.solarUsedLas}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.solarUsedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityNetUtc - 600000):
-                                        wattsUsed = self.solarUsedLast * 12
-                                    else:
-                                        wattsUsed = 0.0
-                            elif self.options == 'minimum':
-                                if self.solarUsedNumberOfValues > 0:
-                                    wattsUsed = self.solarUsedMinimum * 12
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.solarUsedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.solarUsedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityNetUtc - 600000):
-                                        wattsUsed = self.solarUsedLast * 12
-                                    else:
-                                        wattsUsed = 0.0
-                            elif self.options == 'maximum':
-                                if self.solarUsedNumberOfValues > 0:
-                                    wattsUsed = self.solarUsedMaximum * 12
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.solarUsedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.solarUsedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityNetUtc - 600000):
-                                        wattsUsed = self.solarUsedLast * 12
-                                    else:
-                                        wattsUsed = 0.0
-                            else:  # Assume last
-                                lastReadingSolarUsedUtc_minus_600000 = self.lastReadingSolarUsedUtc - 600000
-                                self.logger.debug(f"SOLAR USED: CL=[{self.solarUsedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                  f" LRUTC=[{self.lastReadingSolarUsedUtc}], LRUTC600=[{lastReadingSolarUsedUtc_minus_600000}]")
-                                if self.solarUsedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingSolarUsedUtc - 600000):
-                                    wattsUsed = self.solarUsedLast * 12
-                                else:
-                                    wattsUsed = 0.0
+            self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, dev.deviceTypeId, self.serviceLocationId, dev.id, "", "")
 
-                            if wattsUsed == 0.0:
-                                wattsUsed = self.solarUsedPrevious
+            self.tracer.debug(self.logger, "SMAPPEE DEV [{}] START smappeeServiceLocationIdToDevId [2] = [{}]", channel.name, self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
 
-                            wattsUsedStr = f"{int(wattsUsed)} Watts"
-                            if not self.globals[SMAPPEES][devSolarUsed.id][HIDE_SOLAR_USED_METER_CURRENT_GENERATION]:
-                                if wattsUsed == 0.0 and self.globals[SMAPPEES][devSolarUsed.id][HIDE_SOLAR_USED_METER_CURRENT_GENERATION]:
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devSolarUsed.name}' solar power used reading: {wattsUsedStr}")
-                            devSolarUsed.updateStateOnServer("curEnergyLevel", wattsUsed, uiValue=wattsUsedStr)
-                            devSolarUsed.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
+            self.globals[SMAPPEES][dev.id] = dict()
+            self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
+            self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
+            self.globals[SMAPPEES][dev.id][NAME] = dev.name
+            self.globals[SMAPPEES][dev.id][LONGDITUDE] = 0
+            self.globals[SMAPPEES][dev.id][LATITUDE] = 0
+            self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
+            self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
+            self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
+            self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
+            self.globals[SMAPPEES][dev.id][ALWAYS_ON] = 0.0
+            self.globals[SMAPPEES][dev.id][channel.resetKey] = 0
+            self.globals[SMAPPEES][dev.id][channel.cursorKey] = 0
+            self.globals[SMAPPEES][dev.id][channel.lastReadingKey] = 0.0
+            for hideKey, pluginPropsKey in channel.hideFlags:
+                self.globals[SMAPPEES][dev.id][hideKey] = dev.pluginProps.get(pluginPropsKey, False)
+            for costKey, state in channel.costStates:
+                self.globals[SMAPPEES][dev.id][costKey] = 0.0
+            for tariffKey, pluginPropsKey, default in channel.tariffProps:
+                try:
+                    self.globals[SMAPPEES][dev.id][tariffKey] = type(default)(dev.pluginProps[pluginPropsKey])
+                except Exception:
+                    self.globals[SMAPPEES][dev.id][tariffKey] = default
 
-                            if self.solar > 0.00:
-                                usedPercentage = int(round((self.solarUsed / self.solar) * 100))
-                            else:
-                                usedPercentage = int(0)
-                            usedPercentageStr = f"{int(usedPercentage)} %"
-                            devSolarUsed.updateStateOnServer("kwhCurrentUsedPercentage", usedPercentage, uiValue=usedPercentageStr)
+            if "curEnergyLevel" in dev.states:
+                wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
+                dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
 
-                        if "accumEnergyTotal" in devSolarUsed.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devSolarUsed.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattStr = f"{self.globals[SMAPPEES][devSolarUsed.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} Watts"
-                                devSolarUsed.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][devSolarUsed.id][ACCUMULATED_ENERGY_TOTAL], uiValue=wattStr)
+            if "accumEnergyTotal" in dev.states:
+                kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
+                dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
 
-                            # kwhUsed = float(devSolarUsed.states.get("accumEnergyTotal", 0))
-                            # kwhUsed += float(self.solarUsedTotal / 1000.0)
-                            kwhUsedStr = f"{kwhUsed:0.3f} kWh"  # Calculated in solar device
+            if "alwaysOn" in dev.states:
+                wattStr = f"{self.globals[SMAPPEES][dev.id][ALWAYS_ON]:3.0f} Watts"
+                dev.updateStateOnServer("alwaysOn", self.globals[SMAPPEES][dev.id][ALWAYS_ON], uiValue=wattStr)
 
-                            kwhUsedReformatted = float(f"{kwhUsed:0.3f}")
+            for costKey, state in channel.costStates:
+                if state in dev.states:
+                    costStr = f"{self.globals[SMAPPEES][dev.id][costKey]:3.0f}"
+                    dev.updateStateOnServer(state, self.globals[SMAPPEES][dev.id][costKey], uiValue=costStr)
 
-                            # HIDE_NO_CHANGE_IN_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION
+            dev.updateStateOnServer(channel.onlineState, False, uiValue='offline')
 
-                            if not self.globals[SMAPPEES][devSolarUsed.id][HIDE_SOLAR_USED_METER_ACCUMULATED_GENERATION]:
-                                if (self.globals[SMAPPEES][devSolarUsed.id][HIDE_NO_CHANGE_IN_SOLAR_USED_METER_ACCUMULATED_GENERATION] and
-                                        kwhUsedReformatted == float(devSolarUsed.states['accumEnergyTotal']) and wattsUsed == 0.0):
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devSolarUsed.name}' solar energy used total: {kwhUsedStr}")
+            if self.globals[PLUGIN_INITIALIZED] and self.serviceLocationId != "":
+                self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION, str(self.serviceLocationId)])
 
-                            devSolarUsed.updateStateOnServer("accumEnergyTotal", kwhUsedReformatted, uiValue=kwhUsedStr)
+            self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
 
-                            if "accumEnergyTotal" in devSolar.states:
-                                # Needed to caculate total used percentage - uses 'kwhSolar'
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                                if kwhSolar > 0.00:
-                                    usedDailyPercentage = int(round((kwhUsed / kwhSolar) * 100))
-                                else:
-                                    usedDailyPercentage = int(0)
-                                usedDailyPercentageStr = f"{int(usedDailyPercentage)} %"
-                                devSolarUsed.updateStateOnServer("kwhDailyTotalUsedPercentage", usedDailyPercentage, uiValue=usedDailyPercentageStr)
+    def indexDeviceAddress(self, dev):
+        # Adds a Sensor, Appliance or Actuator device to the (Service Location Id, address) index used to resolve the devices of a Smappee response.
+        # Called from deviceStartComm - Indigo stops and restarts a device's comms when its properties (including its address) are edited
+        try:
+            self.unindexDeviceAddress(dev)  # In case the device's address has changed
+
+            indexedDevice = dict()
+            indexedDevice[DEV_ID] = dev.id
+            indexedDevice[DEVICE_TYPE] = dev.deviceTypeId
+
+            if dev.deviceTypeId == "smappeeSensor":
+                unitsKey = self.globals[SMAPPEES][dev.id][UNITS]
+                if unitsKey not in self.globals[UNIT_TABLE]:
+                    unitsKey = DEFAULT
+                indexedDevice[UNITS] = unitsKey
+                indexedDevice[MEASUREMENT_TIME_MULTIPLIER] = self.globals[UNIT_TABLE][unitsKey][MEASUREMENT_TIME_MULTIPLIER]
+                try:
+                    indexedDevice[PULSES_PER_UNIT] = float(self.globals[SMAPPEES][dev.id][PULSES_PER_UNIT])
+                except ValueError:
+                    indexedDevice[PULSES_PER_UNIT] = 1.0
 
-                        self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC] = self.timestampUtc
+            self.globals[DEVICE_ADDRESS_INDEX][(str(dev.pluginProps["serviceLocationId"]), dev.address)] = indexedDevice
 
-                    if self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED]:
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                        if "curEnergyLevel" in devSolarExported.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devSolarExported.id][CURRENT_ENERGY_LEVEL] = 0.0
-                                self.globals[SMAPPEES][devSolarExported.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                wattsExportedStr = f"{self.globals[SMAPPEES][devSolarExported.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                                devSolarExported.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][devSolarExported.id][CURRENT_ENERGY_LEVEL], uiValue=wattsExportedStr)
-                                devSolarExported.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
+    def unindexDeviceAddress(self, dev):
+        # Removes the device by id rather than by (Service Location Id, address) as these may have been edited since the device was indexed
+        try:
+            for indexKey in [indexKey for indexKey, indexedDevice in self.globals[DEVICE_ADDRESS_INDEX].items() if indexedDevice[DEV_ID] == dev.id]:
+                del self.globals[DEVICE_ADDRESS_INDEX][indexKey]
 
-                            self.options = devSolarExported.pluginProps["optionsEnergyMeterCurPower"]
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                            if self.options == 'mean':  # mean, minimum, maximum, last
-                                if self.solarExportedNumberOfValues > 0:
-                                    wattsExported = (self.solarExportedMeanAverage * 60) / 5
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.solarExportedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.solarExportedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                            self.lastReadingElectricityNetUtc - 600000):
-                                        wattsExported = self.solarExportedLast * 12
-                                    else:
-                                        wattsExported = 0.0
-                            elif self.options == 'minimum':
-                                if self.solarExportedNumberOfValues > 0:
-                                    wattsExported = self.solarExportedMinimum * 12
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.solarExportedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{ lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.solarExportedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                            self.lastReadingElectricityNetUtc - 600000):
-                                        wattsExported = self.solarExportedLast * 12
-                                    else:
-                                        wattsExported = 0.0
-                            elif self.options == 'maximum':
-                                if self.solarExportedNumberOfValues > 0:
-                                    wattsExported = self.solarExportedMaximum * 12
-                                else:
-                                    lastReadingElectricityNetUtc_minus_600000 = self.lastReadingElectricityNetUtc - 600000
-                                    self.logger.debug(f"ELECTRICITY NET: CL=[{self.solarExportedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                      f" LRUTC=[{self.lastReadingElectricityNetUtc}], LRUTC600=[{lastReadingElectricityNetUtc_minus_600000}]")
-                                    if self.solarExportedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (self.lastReadingElectricityNetUtc - 600000):
-                                        wattsExported = self.solarExportedLast * 12
-                                    else:
-                                        wattsExported = 0.0
-                            else:  # Assume last
-                                lastReadingSolarExportedUtc_minus_600000 = self.lastReadingSolarExportedUtc - 600000
-                                self.logger.debug(f"USAGESAVING: CL=[{self.solarExportedLast}], UTCL=[{self.timestampUtcLast}],"
-                                                  f" LRUTC=[{self.lastReadingSolarExportedUtc}], LRUTC600=[{lastReadingSolarExportedUtc_minus_600000}]")
-
-                                if self.solarExportedLast > 0.0 and self.timestampUtcLast != 0 and self.timestampUtcLast > (
-                                        self.lastReadingSolarExportedUtc - 600000):
-                                    wattsExported = self.solarExportedLast * 12
-                                else:
-                                    wattsExported = 0.0
+    def realtimePowerActive(self, responseLocationId, devIdKey):
+        # True if the channel's current power is being received from the Smappee monitor via MQTT (cloud polling then only updates its accumulated total)
+        return (time.time() - self.globals[REALTIME_POWER].get(responseLocationId, dict()).get(devIdKey, 0.0)) < SMAPPEE_MQTT_STALE_SECONDS
 
-                            if wattsExported == 0.0:
-                                wattsExported = self.solarExportedPrevious
+    def handleMqttRealtime(self, responseLocationId, realtime):
+        stateUpdates = SmappeeStateUpdates(self.globals)  # So that the state shadow stays in step with the states written by the polling handlers
+        try:
+            if responseLocationId not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]:
+                return
 
-                            wattsExportedStr = f"{int(wattsExported)} Watts"
-                            if not self.globals[SMAPPEES][devSolarExported.id][HIDE_SOLAR_EXPORTED_METER_CURRENT_GENERATION]:
-                                if wattsExported == 0.0 and self.globals[SMAPPEES][devSolarExported.id][HIDE_SOLAR_EXPORTED_METER_CURRENT_GENERATION]:
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devSolarExported.name}' solar energy exported reading: {wattsExportedStr}")
-                            devSolarExported.updateStateOnServer("curEnergyLevel", wattsExported, uiValue=wattsExportedStr)
-                            devSolarExported.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
+            # Solar power is only in the realtime messages of monitors that measure it - otherwise cloud polling carries on updating the solar device
+            for devIdKey, onlineState, power in ((ELECTRICITY_ID, "smappeeElectricityOnline", realtime["consumptionPower"]),
+                                                 (SOLAR_ID, "smappeeSolarOnline", realtime["solarPower"])):
+                devId = self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId].get(devIdKey, 0)
+                if devId == 0 or power is None:
+                    continue
+                realtimeWasActive = self.realtimePowerActive(responseLocationId, devIdKey)
+                self.globals[REALTIME_POWER].setdefault(responseLocationId, dict())[devIdKey] = time.time()
+
+                dev = indigo.devices[devId]
+                if not dev.states[onlineState]:
+                    stateUpdates.update(dev, onlineState, True, uiValue='online')
+                if "curEnergyLevel" in dev.states:
+                    # The state image is only written when realtime updates start or power returns after a reset (not for every message)
+                    if not realtimeWasActive or (dev.states["curEnergyLevel"] == 0.0 and power != 0.0):
+                        dev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
+                    stateUpdates.update(dev, "curEnergyLevel", power, uiValue=f"{int(power)} Watts")
 
-                            if self.solar > 0.00:
-                                exportedPercentage = int(round((self.solarExported / self.solar) * 100))
-                            else:
-                                exportedPercentage = int(0)
-                            exportedPercentageStr = f"{int(exportedPercentage)} %"
-                            devSolarExported.updateStateOnServer("kwhCurrentExportedPercentage", exportedPercentage, uiValue=exportedPercentageStr)
-
-                        if "accumEnergyTotal" in devSolarExported.states:
-                            if commandSentToSmappee == COMMAND_RESET_CONSUMPTION:
-                                self.globals[SMAPPEES][devSolarExported.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                                kwhExportedStr = f"{self.globals[SMAPPEES][devSolarExported.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                                devSolarExported.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][devSolarExported.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhExportedStr)
-
-                            # kwhExported = float(devSolarExported.states.get("accumEnergyTotal", 0))
-                            # kwhExported += float(self.solarExportedTotal / 1000.0)
-                            kwhExportedStr = f"{kwhExported:0.3f} kWh"  # Calculated in solar device - 'kwhExported'
-                            kwhExportedReformatted = float(f"{kwhExported:0.3f}")
-
-                            if not self.globals[SMAPPEES][devSolarExported.id][HIDE_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION]:
-                                if self.globals[SMAPPEES][devSolarExported.id][HIDE_NO_CHANGE_IN_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION] and \
-                                        kwhExportedReformatted == float(devSolarExported.states['accumEnergyTotal']) and wattsExported == 0.0:
-                                    pass
-                                else:
-                                    self.logger.info(f"received '{devSolarExported.name}' solar energy exported total: {kwhExportedStr}")
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                            devSolarExported.updateStateOnServer("accumEnergyTotal", kwhExportedReformatted,
-                                                                 uiValue=kwhExportedStr)
+        finally:
+            stateUpdates.flush()
 
-                            if "accumEnergyTotal" in devSolar.states:
-                                # Needed to caculate total exported percentage - uses 'kwhSolar'
+    def handleMqttPresence(self, responseLocationId, presence):
+        stateUpdates = SmappeeStateUpdates(self.globals)  # So that the state shadow stays in step with the states written by the polling handlers
+        try:
+            if responseLocationId not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]:
+                return
+            onlineUi = 'online' if presence["online"] else 'offline'
+            if not presence["online"]:
+                self.globals[REALTIME_POWER][responseLocationId] = dict()  # Cloud readings update the current power until the monitor is back
 
-                                if kwhSolar > 0.00:
-                                    exportedDailyPercentage = int(round((kwhExported / kwhSolar) * 100))
-                                else:
-                                    exportedDailyPercentage = int(0)
-                                exportedDailyPercentageStr = f"{int(exportedDailyPercentage)} %"
-                                devSolarExported.updateStateOnServer("kwhDailyTotalExportedPercentage", exportedDailyPercentage, uiValue=exportedDailyPercentageStr)
+            for devIdKey, onlineState in ((ELECTRICITY_ID, "smappeeElectricityOnline"), (SOLAR_ID, "smappeeSolarOnline")):
+                devId = self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][responseLocationId].get(devIdKey, 0)
+                if devId != 0 and indigo.devices[devId].states[onlineState] != presence["online"]:
+                    stateUpdates.update(indigo.devices[devId], onlineState, presence["online"], uiValue=onlineUi)
+                    self.logger.info(f"Smappee monitor for '{indigo.devices[devId].name}' is {onlineUi}")
 
-                            amountExportedReformatted = float(f"{amountExported:0.2f}")
-                            amountExportedStr = f"{amountExported:0.2f} {self.globals[SMAPPEES][devSolar.id][CURRENCY_CODE]}"
-                            devSolarExported.updateStateOnServer("dailyTotalExportOnlyIncome", amountExportedReformatted, uiValue=amountExportedStr)
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-                        self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC] = self.timestampUtc
+        finally:
+            stateUpdates.flush()
 
-                elif key == 'error':
-                    self.logger.error(f"SMAPPEE ERROR DETECTED [{commandSentToSmappee}]: {value}")
-                else:
-                    pass  # Unknown key/value pair
-                    self.logger.debug(f"Unhandled key/value pair : K=[{key}], V=[{value}]")
+    def updatePollingActivity(self, responseLocationId, activityDetected):
+        # Used by adaptive polling: the polling thread lengthens the consumption polling interval while a location has no new readings
+        try:
+            if activityDetected:
+                self.globals[POLLING][IDLE_POLLS][responseLocationId] = 0
+            else:
+                self.globals[POLLING][IDLE_POLLS][responseLocationId] = self.globals[POLLING][IDLE_POLLS].get(responseLocationId, 0) + 1
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
     def handleGetSensorConsumption(self, commandSentToSmappee, responseLocationId, decodedSmappeeResponse):
+        stateUpdates = SmappeeStateUpdates(self.globals)  # Each device's states are written once, when the response has been handled
         try:
             for decoding in decodedSmappeeResponse:
                 errorDetected = False
                 for key, value in decoding.items():
                     if key == 'serviceLocationId' or key == 'sensorId' or key == 'records' or key == 'error':
                         if key == 'error':
-                            self.logger.debug(f"SMAPPEE SENSOR handleGetSensorConsumption error detected by Smappee: Error=[{value}]")
+                            self.tracer.debug(self.logger, "SMAPPEE SENSOR handleGetSensorConsumption error detected by Smappee: Error=[{}]", value)
                             errorDetected = True
                         # At this point the response (so far) is OK as we know how to process the key
                     else:
-                        self.logger.debug(f"SMAPPEE SENSOR Unhandled key/value pair : K=[{key}], V=[{value}]")
+                        self.tracer.debug(self.logger, "SMAPPEE SENSOR Unhandled key/value pair : K=[{}], V=[{}]", key, value)
                 if errorDetected:
                     self.logger.error(f"SMAPPEE SENSOR handleGetSensorConsumption error - response abandoned!")
                     break
@@ -3313,7 +2808,7 @@ class Plugin(indigo.PluginBase):
                 for key, value in decoding.items():
                     if key == 'serviceLocationId':
                         sLoc = str(value)  # Service Location
-                        self.logger.debug(f"handleGetSensorConsumption [serviceLocationId] - K = [{key}], V = {value} and sLoc = {sLoc}")
+                        self.tracer.debug(self.logger, "handleGetSensorConsumption [serviceLocationId] - K = [{}], V = {} and sLoc = {}", key, value, sLoc)
                         break
 
                 sensorA_DevId = 0
@@ -3324,7 +2819,7 @@ class Plugin(indigo.PluginBase):
                         smappeeType = 'GW'  # Sensor for Gas Water
                         value_2 = ("00" + value)[-2:]
                         sId = f"{smappeeType}{value_2}"
-                        self.logger.debug(f"handleGetSensorConsumption [sensorId] - sId = [{sId}]")
+                        self.tracer.debug(self.logger, "handleGetSensorConsumption [sensorId] - sId = [{}]", sId)
 
                         def checkIndigoDev(serviceLocation, address):
 
@@ -3334,26 +2829,17 @@ class Plugin(indigo.PluginBase):
                             measurementTimeMultiplier = 1.0
 
                             try:
-                                for dev in indigo.devices.iter("self"):
-                                    # self.logger.debug(f"handleGetSensorConsumption [sensorId-checkIndigoDev] - DN={dev.name}, deviceTypeId=[{type(dev.deviceTypeId)}] {dev.deviceTypeId},"
-                                    #                          f" serviceLocation=[{type(dev.pluginProps["serviceLocationId"])}] {dev.pluginProps["serviceLocationId"]},"
-                                    #                          f" deviceAddress=[{type(dev.address)}] {dev.address}")
-                                    if (dev.deviceTypeId == "smappeeSensor") and (dev.pluginProps["serviceLocationId"] == serviceLocation) and (dev.address == address):
-                                        self.logger.debug(f"handleGetSensorConsumption [sensorId-checkIndigoDev- FOUND] DN = [{dev.name}], TYPEID =  [{dev.deviceTypeId}],"
-                                                          f" SL=[{dev.pluginProps['serviceLocationId']}], A=[{dev.address}]")
-                                        returnedDevId = dev.id
-                                        lastReadingSensorUtc = self.globals[SMAPPEES][dev.id][LAST_READING_SENSOR_UTC]
-                                        pulsesPerUnit = self.globals[SMAPPEES][dev.id][PULSES_PER_UNIT]
-
-                                        unitsKey = self.globals[SMAPPEES][dev.id][UNITS]
-                                        if unitsKey in self.globals[UNIT_TABLE]:
-                                            pass
-                                        else:
-                                            unitsKey = 'default'
-                                        measurementTimeMultiplier = self.globals[UNIT_TABLE][unitsKey][FUNCTION_QUEUE_REMOVE]
-
-                                        if not dev.states['smappeeSensorOnline']:
-                                            dev.updateStateOnServer("smappeeSensorOnline", True, uiValue='online')
+                                indexedDevice = self.globals[DEVICE_ADDRESS_INDEX].get((serviceLocation, address))
+                                if indexedDevice is not None and indexedDevice[DEVICE_TYPE] == "smappeeSensor":
+                                    dev = indigo.devices[indexedDevice[DEV_ID]]
+                                    self.tracer.debug(self.logger, "handleGetSensorConsumption [sensorId-checkIndigoDev- FOUND] DN = [{}], TYPEID =  [{}], SL=[{}], A=[{}]", dev.name, dev.deviceTypeId, serviceLocation, address)
+                                    returnedDevId = dev.id
+                                    lastReadingSensorUtc = self.globals[SMAPPEES][dev.id][LAST_READING_SENSOR_UTC]
+                                    pulsesPerUnit = indexedDevice[PULSES_PER_UNIT]
+                                    measurementTimeMultiplier = indexedDevice[MEASUREMENT_TIME_MULTIPLIER]
+
+                                    if not dev.states['smappeeSensorOnline']:
+                                        stateUpdates.update(dev, "smappeeSensorOnline", True, uiValue='online')
 
                             except Exception as error_message:
                                 self.exception_handler(error_message, True)  # Log error and display failing statement
@@ -3366,7 +2852,7 @@ class Plugin(indigo.PluginBase):
                         sensorAddress = sId + '-B'
                         sensorB_DevId, lastReadingSensorB_Utc, pulsesPerUnitSensorB, measurementTimeMultiplierSensorB = checkIndigoDev(sLoc, sensorAddress)
 
-                        self.logger.debug(f"handleGetSensorConsumption [sensorId-checkIndigoDev] - dev.Id [A] = [{sensorA_DevId}], dev.Id [B] = [{sensorB_DevId}]")
+                        self.tracer.debug(self.logger, "handleGetSensorConsumption [sensorId-checkIndigoDev] - dev.Id [A] = [{}], dev.Id [B] = [{}]", sensorA_DevId, sensorB_DevId)
 
                         break
 
@@ -3413,7 +2899,7 @@ class Plugin(indigo.PluginBase):
 
                                 self.globals[SQL][ENABLED] = False  # Disable SQL processing
 
-                        for self.sensorReading in value:
+                        for sensorReading in value:
                             timestampUtc = 0
                             value1 = 0.0
                             value2 = 0.0
@@ -3427,10 +2913,7 @@ class Plugin(indigo.PluginBase):
                             readingSensorA_Detected = False
                             readingSensorB_Detected = False
 
-                            self.logger.debug("handleGetSensorConsumption [Q][SENSOR] -  [START ...]")
-
-                            for readingKey, readingValue in self.sensorReading.items():
-                                self.logger.debug(f"handleGetSensorConsumption [Q][SENSOR] -  [{readingKey} : {readingValue}]")
+                            for readingKey, readingValue in sensorReading.items():
                                 if readingKey == 'timestamp':
                                     timestampUtc = readingValue
                                     timestampUtcLast = readingValue
@@ -3450,8 +2933,9 @@ class Plugin(indigo.PluginBase):
                                     batteryLevel = readingValue
                                 else:
                                     pass  # Unknown key/value pair
-                            self.logger.debug(f"handleGetSensorConsumption [Q][SENSOR] -  [... END: TS={timestampUtc},"
-                                              f" V1={value1}, V2={value2}, TEMP={temperature}, HUM={humidity}, BAT={batteryLevel}]")
+                            # Trace a sample of the readings rather than every one
+                            self.tracer.debug_sampled(self.logger, "handleGetSensorConsumption", "handleGetSensorConsumption [Q][SENSOR] -  {}: TS={}, V1={}, V2={}, TEMP={}, HUM={}, BAT={}",
+                                                      sensorReading, timestampUtc, value1, value2, temperature, humidity, batteryLevel)
 
                             if timestampUtc != 0:
                                 if sensorA_DevId != 0:
@@ -3493,8 +2977,7 @@ class Plugin(indigo.PluginBase):
                                         if readingSensorB_Detected:
                                             sensorB_Previous = value1 * measurementTimeMultiplierSensorB
 
-                                self.logger.debug(f"handleGetSensorConsumption [Q][SENSOR] -  [... SQL: TS={timestampUtc},"
-                                                  f" V1={value1}, V2={value2}, TEMP={temperature}, HUM={humidity}, BAT={batteryLevel}]")
+                                self.tracer.debug(self.logger, "handleGetSensorConsumption [Q][SENSOR] -  [... SQL: TS={}, V1={}, V2={}, TEMP={}, HUM={}, BAT={}]", timestampUtc, value1, value2, temperature, humidity, batteryLevel)
 
                                 if self.globals[SQL][ENABLED]:
                                     insertSql = 'NO SQL SET-UP YET'
@@ -3509,8 +2992,7 @@ class Plugin(indigo.PluginBase):
                                         temperature = str(int(temperature * 10))
                                         battery = str(int(batteryLevel * 10))
 
-                                        self.logger.debug(f"handleGetSensorConsumption [Q][SENSOR] -  [... INS: RT={readingTime}, YYYYMMDD={readingYYYYMMDDHHMMSS}, HHMMSS={readingHHMMSS},"
-                                                          f" V1={sensor1}, V2={sensor2}, TEMP={temperature}, HUM={humidity}, BAT={battery}]")
+                                        self.tracer.debug(self.logger, "handleGetSensorConsumption [Q][SENSOR] -  [... INS: RT={}, YYYYMMDD={}, HHMMSS={}, V1={}, V2={}, TEMP={}, HUM={}, BAT={}]", readingTime, readingYYYYMMDDHHMMSS, readingHHMMSS, sensor1, sensor2, temperature, humidity, battery)
 
                                         insertSql = f"""
                                             INSERT OR REPLACE INTO sensor_readings (reading_time, reading_YYYYMMDD, reading_HHMMSS, sensor1, sensor2, humidity, temperature, battery)
@@ -3546,14 +3028,12 @@ class Plugin(indigo.PluginBase):
                         if sensorA_NumberOfValues > 0:
                             sensorA_MeanAverage = sensorA_Total / sensorA_NumberOfValues
 
-                        self.logger.debug(f"READINGS - SENSOR [A]: N=[{sensorA_NumberOfValues}], T=[{sensorA_Total}], MEAN=[{sensorA_MeanAverage}],"
-                                          f" MIN=[{sensorA_Minimum}], MAX=[{sensorA_Maximum}], L=[{sensorA_Last}]")
+                        self.tracer.debug(self.logger, "READINGS - SENSOR [A]: N=[{}], T=[{}], MEAN=[{}], MIN=[{}], MAX=[{}], L=[{}]", sensorA_NumberOfValues, sensorA_Total, sensorA_MeanAverage, sensorA_Minimum, sensorA_Maximum, sensorA_Last)
 
                         if sensorB_NumberOfValues > 0:
                             sensorB_MeanAverage = sensorB_Total / sensorB_NumberOfValues
 
-                        self.logger.debug(f"READINGS - SENSOR [B]: N=[{sensorB_NumberOfValues}], T=[{sensorB_Total}], MEAN=[{sensorB_MeanAverage}],"
-                                          f" MIN=[{sensorB_Minimum}], MAX=[{sensorB_Maximum}], L=[{sensorB_Last}]")
+                        self.tracer.debug(self.logger, "READINGS - SENSOR [B]: N=[{}], T=[{}], MEAN=[{}], MIN=[{}], MAX=[{}], L=[{}]", sensorB_NumberOfValues, sensorB_Total, sensorB_MeanAverage, sensorB_Minimum, sensorB_Maximum, sensorB_Last)
 
                         def updateSensor(sensorDev, sensorDesc, sensorValues):
                             try:
@@ -3568,60 +3048,55 @@ class Plugin(indigo.PluginBase):
 
                                 timestampUtcLast, lastReadingUtc, sensorTemperature, sensorHumidity, sensorBatteryLevel, sensorTotal, sensorNumberOfValues, sensorMeanAverage, sensorMinimum, sensorMaximum, sensorPrevious, sensorLast = sensorValues
 
-                                self.logger.debug(f"UpdateSensor [1 of 2] [{sensorDesc}]: Temp={sensorTemperature}, Humidity={sensorHumidity}, Battery={sensorBatteryLevel}")
-                                self.logger.debug(f"UpdateSensor [2 of 2] [{sensorDesc}]: Total={sensorTotal}, NoV={sensorNumberOfValues}, Mean={sensorMeanAverage},"
-                                                  f" Min={sensorMinimum}, Max={sensorMaximum}, Prev={sensorPrevious}, Last={sensorLast}")
+                                self.tracer.debug(self.logger, "UpdateSensor [1 of 2] [{}]: Temp={}, Humidity={}, Battery={}", sensorDesc, sensorTemperature, sensorHumidity, sensorBatteryLevel)
+                                self.tracer.debug(self.logger, "UpdateSensor [2 of 2] [{}]: Total={}, NoV={}, Mean={}, Min={}, Max={}, Prev={}, Last={}", sensorDesc, sensorTotal, sensorNumberOfValues, sensorMeanAverage, sensorMinimum, sensorMaximum, sensorPrevious, sensorLast)
 
                                 if (sensorNumberOfValues == 0) and ("curEnergyLevel" in sensorDev.states) and (sensorDev.states[CURRENT_ENERGY_LEVEL] == 0.0):
-                                    self.logger.debug(f"UpdateSensor [RETURNING, NO UPDATE] [{sensorDesc}]")
+                                    self.tracer.debug(self.logger, "UpdateSensor [RETURNING, NO UPDATE] [{}]", sensorDesc)
 
                                     return  # Don't update energy totals if no values to process i.e nothing received since last timestamp
 
                                 updateTimeString = datetime.datetime.fromtimestamp(int(timestampUtcLast / 1000)).strftime('%Y-%b-%d %H:%M')
 
                                 if "readingsLastUpdated" in sensorDev.states:
-                                    sensorDev.updateStateOnServer("readingsLastUpdated", updateTimeString)
+                                    stateUpdates.update(sensorDev, "readingsLastUpdated", updateTimeString)
 
                                 if sensorTemperature != self.globals[SMAPPEES][sensorDev.id][TEST_TEMPERATURE]:
                                     if "temperature" in sensorDev.states:
                                         self.globals[SMAPPEES][sensorDev.id][TEST_TEMPERATURE] = float(sensorTemperature)
                                         temperatureStr = f"{float(sensorTemperature) / 10:1.0f} deg C"
                                         temperatureReformatted = float(f"{float(sensorTemperature) / 10:0.1f}")
-                                        sensorDev.updateStateOnServer("temperature", temperatureReformatted, uiValue=temperatureStr)
+                                        stateUpdates.update(sensorDev, "temperature", temperatureReformatted, uiValue=temperatureStr)
 
                                         if "temperatureLastUpdated" in sensorDev.states:
-                                            sensorDev.updateStateOnServer("temperatureLastUpdated", updateTimeString)
+                                            stateUpdates.update(sensorDev, "temperatureLastUpdated", updateTimeString)
 
                                 if sensorHumidity != self.globals[SMAPPEES][sensorDev.id][TEST_HUMIDITY]:
                                     if "humidity" in sensorDev.states:
                                         self.globals[SMAPPEES][sensorDev.id][TEST_HUMIDITY] = float(sensorHumidity)
                                         humidityStr = f"{float(sensorHumidity):1.0f}%"
                                         humidityReformatted = float(f"{float(sensorHumidity):0.1f}")
-                                        sensorDev.updateStateOnServer("humidity", humidityReformatted,
+                                        stateUpdates.update(sensorDev, "humidity", humidityReformatted,
                                                                       uiValue=humidityStr)
 
                                         if "humidityLastUpdated" in sensorDev.states:
-                                            sensorDev.updateStateOnServer("humidityLastUpdated", updateTimeString)
+                                            stateUpdates.update(sensorDev, "humidityLastUpdated", updateTimeString)
 
                                 if sensorBatteryLevel != self.globals[SMAPPEES][sensorDev.id][TEST_BATTERY_LEVEL]:
                                     if "batteryLevel" in sensorDev.states:
                                         self.globals[SMAPPEES][sensorDev.id][TEST_BATTERY_LEVEL] = float(sensorBatteryLevel)
                                         batteryLevelStr = f"{float(sensorBatteryLevel):1.0f}%"
                                         batteryLevelReformatted = float(f"{float(sensorBatteryLevel):0.1f}")
-                                        sensorDev.updateStateOnServer("batteryLevel", batteryLevelReformatted, uiValue=batteryLevelStr)
+                                        stateUpdates.update(sensorDev, "batteryLevel", batteryLevelReformatted, uiValue=batteryLevelStr)
 
                                         if "batteryLevelLastUpdated" in sensorDev.states:
-                                            sensorDev.updateStateOnServer("batteryLevelLastUpdated", updateTimeString)
+                                            stateUpdates.update(sensorDev, "batteryLevelLastUpdated", updateTimeString)
 
-                                unitsKey = self.globals[SMAPPEES][sensorDev.id][UNITS]
-                                if unitsKey in self.globals[UNIT_TABLE]:
-                                    pass
-                                else:
-                                    unitsKey = 'default'
+                                unitsKey = self.globals[DEVICE_ADDRESS_INDEX].get((sLoc, sensorDev.address), dict()).get(UNITS, DEFAULT)  # Resolved by indexDeviceAddress
 
                                 unitsCurrentUnits = self.globals[UNIT_TABLE][unitsKey][CURRENT_UNITS]
                                 unitsAccumUnits = self.globals[UNIT_TABLE][unitsKey][ACCUM_UNITS]
-                                unitsmeasurementTimeMultiplier = self.globals[UNIT_TABLE][unitsKey][FUNCTION_QUEUE_REMOVE]
+                                unitsmeasurementTimeMultiplier = self.globals[UNIT_TABLE][unitsKey][MEASUREMENT_TIME_MULTIPLIER]
                                 unitsformatTotaldivisor = self.globals[UNIT_TABLE][unitsKey][FORMAT_TOTAL_DIVISOR]
                                 unitsformatCurrent = self.globals[UNIT_TABLE][unitsKey][FORMAT_CURRENT]
                                 unitsformatCurrentUi = unitsformatCurrent + " " + unitsCurrentUnits
@@ -3632,7 +3107,7 @@ class Plugin(indigo.PluginBase):
                                     if commandSentToSmappee == 'RESET_SENSOR_CONSUMPTION':
                                         self.globals[SMAPPEES][sensorDev.id][CURRENT_ENERGY_LEVEL] = 0.0
                                         dataToUpdateStr = f"{unitsformatCurrent} {self.globals[SMAPPEES][sensorDev.id][CURRENT_ENERGY_LEVEL]} {unitsCurrentUnits}"
-                                        sensorDev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][sensorDev.id][CURRENT_ENERGY_LEVEL], uiValue=dataToUpdateStr)
+                                        stateUpdates.update(sensorDev, "curEnergyLevel", self.globals[SMAPPEES][sensorDev.id][CURRENT_ENERGY_LEVEL], uiValue=dataToUpdateStr)
                                         sensorDev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
 
                                     readingOption = sensorDev.pluginProps["optionsEnergyMeterCurPower"]  # mean, minimum, maximum, last
@@ -3643,9 +3118,7 @@ class Plugin(indigo.PluginBase):
                                             dataToUpdate = (sensorMeanAverage * 60) / 5
                                         else:
                                             lastReadingUtc_minus_600000 = lastReadingUtc - 600000
-                                            self.logger.debug(f"SENSOR {sensorDesc}: [MEAN]"
-                                                              f" CL=[{sensorLast}], UTCL=[{timestampUtcLast}],"
-                                                              f" LRUTC=[{lastReadingUtc}], LRUTC600=[{lastReadingUtc_minus_600000}]")
+                                            self.tracer.debug(self.logger, "SENSOR {}: [MEAN] CL=[{}], UTCL=[{}], LRUTC=[{}], LRUTC600=[{}]", sensorDesc, sensorLast, timestampUtcLast, lastReadingUtc, lastReadingUtc_minus_600000)
                                             if sensorLast > 0.0 and timestampUtcLast != 0 and timestampUtcLast > (lastReadingUtc - 600000):
                                                 dataToUpdate = sensorLast * unitsmeasurementTimeMultiplier
                                     elif readingOption == 'minimum':
@@ -3653,9 +3126,7 @@ class Plugin(indigo.PluginBase):
                                             dataToUpdate = sensorMinimum * unitsmeasurementTimeMultiplier
                                         else:
                                             lastReadingUtc_minus_600000 = lastReadingUtc - 600000
-                                            self.logger.debug(f"SENSOR {sensorDesc}: [MINIMUM]"
-                                                              f" CL=[{sensorLast}], UTCL=[{timestampUtcLast}],"
-                                                              f" LRUTC=[{lastReadingUtc}], LRUTC600=[{lastReadingUtc_minus_600000}]")
+                                            self.tracer.debug(self.logger, "SENSOR {}: [MINIMUM] CL=[{}], UTCL=[{}], LRUTC=[{}], LRUTC600=[{}]", sensorDesc, sensorLast, timestampUtcLast, lastReadingUtc, lastReadingUtc_minus_600000)
                                             if sensorLast > 0.0 and timestampUtcLast != 0 and timestampUtcLast > (lastReadingUtc - 600000):
                                                 dataToUpdate = sensorLast * unitsmeasurementTimeMultiplier
                                     elif readingOption == 'maximum':
@@ -3663,24 +3134,19 @@ class Plugin(indigo.PluginBase):
                                             watts = sensorMaximum * unitsmeasurementTimeMultiplier
                                         else:
                                             lastReadingUtc_minus_600000 = lastReadingUtc - 600000
-                                            self.logger.debug(f"SENSOR {sensorDesc}: [MAXIMUM]"
-                                                              f" CL=[{sensorLast}], UTCL=[{timestampUtcLast}],"
-                                                              f" LRUTC=[{lastReadingUtc}], LRUTC600=[{lastReadingUtc_minus_600000}]")
+                                            self.tracer.debug(self.logger, "SENSOR {}: [MAXIMUM] CL=[{}], UTCL=[{}], LRUTC=[{}], LRUTC600=[{}]", sensorDesc, sensorLast, timestampUtcLast, lastReadingUtc, lastReadingUtc_minus_600000)
                                             if sensorLast > 0.0 and timestampUtcLast != 0 and timestampUtcLast > (lastReadingUtc - 600000):
                                                 dataToUpdate = sensorLast * unitsmeasurementTimeMultiplier
                                     else:  # Assume last
                                         lastReadingUtc_minus_600000 = lastReadingUtc - 600000
-                                        self.logger.debug(f"SENSOR {sensorDesc}:"
-                                                          f" [LAST] CL=[{sensorLast}], UTCL=[{timestampUtcLast}],"
-                                                          f" LRUTC=[{lastReadingUtc}], LRUTC600=[{lastReadingUtc_minus_600000}]")
+                                        self.tracer.debug(self.logger, "SENSOR {}: [LAST] CL=[{}], UTCL=[{}], LRUTC=[{}], LRUTC600=[{}]", sensorDesc, sensorLast, timestampUtcLast, lastReadingUtc, lastReadingUtc_minus_600000)
                                         if sensorLast > 0.0 and timestampUtcLast != 0 and timestampUtcLast > (lastReadingUtc - 600000):
                                             dataToUpdate = sensorLast * unitsmeasurementTimeMultiplier
 
                                     currentTimeUtc = int(time.mktime(indigo.server.getTime().timetuple()))
                                     currentTimeMinus6MinsUtc = int((currentTimeUtc - 360) * 1000)  # Subtract 5 minutes (360 seconds)
 
-                                    self.logger.debug(f"SENSOR {sensorDesc}: [TIME CHECK] currentTimeUtc=[{currentTimeUtc}], currentTimeMinus6MinsUtc=[{currentTimeMinus6MinsUtc}],"
-                                                      f" timestampUtcLast=[{timestampUtcLast}]")
+                                    self.tracer.debug(self.logger, "SENSOR {}: [TIME CHECK] currentTimeUtc=[{}], currentTimeMinus6MinsUtc=[{}], timestampUtcLast=[{}]", sensorDesc, currentTimeUtc, currentTimeMinus6MinsUtc, timestampUtcLast)
                                     if timestampUtcLast < currentTimeMinus6MinsUtc:
                                         dataToUpdate = 0.0
 
@@ -3688,7 +3154,7 @@ class Plugin(indigo.PluginBase):
                                     if not self.globals[SMAPPEES][sensorDev.id][HIDE_ENERGY_METER_CURRENT_POWER]:
                                         self.logger.info(f"received '{sensorDev.name}' power load reading: {dataToUpdateStr}")
 
-                                    sensorDev.updateStateOnServer("curEnergyLevel", dataToUpdate, uiValue=dataToUpdateStr)
+                                    stateUpdates.update(sensorDev, "curEnergyLevel", dataToUpdate, uiValue=dataToUpdateStr)
                                     sensorDev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOn)
 
                                 if sensorNumberOfValues != 0 and "accumEnergyTotal" in sensorDev.states:
@@ -3696,13 +3162,13 @@ class Plugin(indigo.PluginBase):
                                     if commandSentToSmappee == COMMAND_RESET_SENSOR_CONSUMPTION:
                                         self.globals[SMAPPEES][sensorDev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
                                         dataToUpdateStr = str(unitsformatTotalUi % (self.globals[SMAPPEES][sensorDev.id][ACCUMULATED_ENERGY_TOTAL]))
-                                        sensorDev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][sensorDev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=dataToUpdateStr)
+                                        stateUpdates.update(sensorDev, "accumEnergyTotal", self.globals[SMAPPEES][sensorDev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=dataToUpdateStr)
 
                                     dataToUpdate = float(sensorDev.states.get("accumEnergyTotal", 0))
                                     dataToUpdate += float(sensorTotal / unitsformatTotaldivisor)
                                     dataToUpdateStr = str(unitsformatTotalUi % dataToUpdate)
                                     dataToUpdateReformatted = str(unitsformatTotal % dataToUpdate)
-                                    sensorDev.updateStateOnServer("accumEnergyTotal", dataToUpdateReformatted, uiValue=dataToUpdateStr)
+                                    stateUpdates.update(sensorDev, "accumEnergyTotal", dataToUpdateReformatted, uiValue=dataToUpdateStr)
 
                                     dataUnitCost = self.globals[SMAPPEES][sensorDev.id][UNIT_COST]
                                     dailyStandingCharge = self.globals[SMAPPEES][sensorDev.id][DAILY_STANDING_CHARGE]
@@ -3712,7 +3178,7 @@ class Plugin(indigo.PluginBase):
                                         amountGross = (dailyStandingCharge + (dataToUpdate * dataUnitCost))
                                         amountGrossReformatted = float(f"{amountGross:0.2f}")
                                         amountGrossStr = f"{amountGrossReformatted:.2f} {self.globals[SMAPPEES][sensorDev.id][CURRENCY_CODE]}"
-                                        sensorDev.updateStateOnServer("dailyTotalCost", amountGrossReformatted, uiValue=amountGrossStr)
+                                        stateUpdates.update(sensorDev, "dailyTotalCost", amountGrossReformatted, uiValue=amountGrossStr)
 
                                     if not self.globals[SMAPPEES][sensorDev.id][HIDE_ENERGY_METER_ACCUMULATED_POWER]:
                                         if dataUnitCost == 0.00 or self.globals[SMAPPEES][sensorDev.id][HIDE_ENERGY_METER_ACCUMULATED_POWER_COST]:
@@ -3746,6 +3212,9 @@ class Plugin(indigo.PluginBase):
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
+        finally:
+            stateUpdates.flush()
+
     def handleSmappeeResponse(self, commandSentToSmappee, responseLocationId, responseFromSmappee):
 
         # This method handles responses from Smappee to commands sent to Smappee
@@ -3801,6 +3270,20 @@ class Plugin(indigo.PluginBase):
                 self.handleGetSensorConsumption(commandSentToSmappee, responseLocationId, responseFromSmappee)
                 return
 
+            if commandSentToSmappee == COMMAND_ON or commandSentToSmappee == COMMAND_OFF:
+                self.handleOnOff(commandSentToSmappee, responseLocationId, responseFromSmappee)
+                return
+
+            if commandSentToSmappee == COMMAND_MQTT_REALTIME:
+                # Received from the Smappee monitor via MQTT (not the Smappee cloud)
+                self.handleMqttRealtime(responseLocationId, responseFromSmappee)
+                return
+
+            if commandSentToSmappee == COMMAND_MQTT_PRESENCE:
+                # Received from the Smappee monitor via MQTT (not the Smappee cloud)
+                self.handleMqttPresence(responseLocationId, responseFromSmappee)
+                return
+
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
@@ -3814,29 +3297,16 @@ class Plugin(indigo.PluginBase):
                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID] = dict()
                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId] = dict()
                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][NAME] = "HOME-HOME"
-                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_ID] = 0
-                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_ID] = 0
-                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_NET_ID] = 0
-                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_SAVED_ID] = 0
-                self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_EXPORTED_ID] = 0
+                for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][channel.devIdKey] = 0
                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS] = dict()
                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][APPLIANCE_IDS] = dict()
                 self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ACTUATOR_IDS] = dict()
 
             smappeeAddress = str(smappeeAddress)
             if function == FUNCTION_ADD_UPDATE:
-                if smappeeDeviceTypeId == 'smappeeElectricity':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_ID] = devId
-                elif smappeeDeviceTypeId == 'smappeeElectricityNet':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_NET_ID] = devId
-                elif smappeeDeviceTypeId == 'smappeeElectricitySaved':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_SAVED_ID] = devId
-                elif smappeeDeviceTypeId == 'smappeeSolar':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_ID] = devId
-                elif smappeeDeviceTypeId == 'smappeeSolarUsed':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_USED_ID] = devId
-                elif smappeeDeviceTypeId == 'smappeeSolarExported':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_EXPORTED_ID] = devId
+                if smappeeDeviceTypeId in SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE:
+                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE[smappeeDeviceTypeId].devIdKey] = devId
                 elif smappeeDeviceTypeId == 'smappeeSensor':
                     if smappeeAddress not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS]:
                         self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS][
@@ -3853,7 +3323,7 @@ class Plugin(indigo.PluginBase):
                             DEV_ID] = devId
                     self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS][smappeeAddress][
                         NAME] = str(devName)
-                    self.logger.debug(f"setSmappeeServiceLocationIdToDevId [FF-E][SENSOR] - [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS]}]")
+                    self.tracer.debug(self.logger, "setSmappeeServiceLocationIdToDevId [FF-E][SENSOR] - [{}]", self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS])
                 elif smappeeDeviceTypeId == 'smappeeAppliance':
                     if smappeeAddress not in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][APPLIANCE_IDS]:
                         self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][APPLIANCE_IDS][
@@ -3880,18 +3350,8 @@ class Plugin(indigo.PluginBase):
                         NAME] = str(devName)
 
             elif function == FUNCTION_STOP:
-                if smappeeDeviceTypeId == 'smappeeElectricity':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_ID] = 0
-                elif smappeeDeviceTypeId == 'smappeeElectricityNet':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_ID] = 0
-                elif smappeeDeviceTypeId == 'smappeeElectricitySaved':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][ELECTRICITY_SAVED_ID] = 0
-                elif smappeeDeviceTypeId == 'smappeeSolar':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_ID] = 0
-                elif smappeeDeviceTypeId == 'smappeeSolarUsed':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_USED_ID] = 0
-                elif smappeeDeviceTypeId == 'smappeeSolarExported':
-                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SOLAR_EXPORTED_ID] = 0
+                if smappeeDeviceTypeId in SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE:
+                    self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE[smappeeDeviceTypeId].devIdKey] = 0
                 elif smappeeDeviceTypeId == 'smappeeSensor':
                     self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId][SENSOR_IDS][smappeeAddress][
                         QUEUED_ADD] = False
@@ -4223,7 +3683,7 @@ class Plugin(indigo.PluginBase):
 
     def deviceStartComm(self, dev):
         try:
-            if dev.deviceTypeId == "smappeeElectricity" or dev.deviceTypeId == "smappeeElectricityNet" or dev.deviceTypeId == "smappeeElectricitySaved" or dev.deviceTypeId == "smappeeSolar" or dev.deviceTypeId == "smappeeSolarUsed" or dev.deviceTypeId == "smappeeSolarExported" or dev.deviceTypeId == "smappeeSensor" or dev.deviceTypeId == "smappeeAppliance" or dev.deviceTypeId == "smappeeActuator":
+            if dev.deviceTypeId in SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE or dev.deviceTypeId == "smappeeSensor" or dev.deviceTypeId == "smappeeAppliance" or dev.deviceTypeId == "smappeeActuator":
                 pass
             else:
                 self.logger.error(f"Failed to start Smappee Appliance [{dev.name}]: Device type [{dev.deviceTypeId}] not known by plugin.")
@@ -4231,412 +3691,24 @@ class Plugin(indigo.PluginBase):
 
             dev.stateListOrDisplayStateIdChanged()  # Ensure latest devices.xml is being used
 
-            try:
-                # Initialise internal to plugin smappee electricity states to default values
-                if dev.deviceTypeId == "smappeeElectricity":
-
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[CONFIG][SUPPORTS_ELECTRICITY] = True
-
-                    self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
-
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY] START self.serviceLocationId = [{self.serviceLocationId}]")
-
-                    self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeElectricity', self.serviceLocationId, dev.id, "", "")
+            self.globals[STATE_SHADOW].forget_device(dev.id)  # States are (re)initialised directly below
 
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY] START smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[SMAPPEES][dev.id] = dict()
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
-                    self.globals[SMAPPEES][dev.id][NAME] = dev.name
-                    self.globals[SMAPPEES][dev.id][LONGDITUDE] = 0
-                    self.globals[SMAPPEES][dev.id][LATITUDE] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
-                    self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
-                    self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                    self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST] = 0.0
-                    self.globals[SMAPPEES][dev.id][ALWAYS_ON] = 0.0
-                    self.globals[SMAPPEES][dev.id][LAST_RESET_ELECTRICITY_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY] = 0.0
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_POWER] = dev.pluginProps["hideEnergyMeterCurPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_POWER] = dev.pluginProps["hideEnergyMeterAccumPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_POWER_COST] = dev.pluginProps["hideEnergyMeterAccumPowerCost"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_POWER_COST] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ALWAYS_ON_POWER] = dev.pluginProps["hideAlwaysOnPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ALWAYS_ON_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][CURRENCY_CODE] = dev.pluginProps["currencyCode"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][CURRENCY_CODE] = 'UKP'
-                    try:
-                        self.globals[SMAPPEES][dev.id][DAILY_STANDING_CHARGE] = float(dev.pluginProps["dailyStandingCharge"])
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][DAILY_STANDING_CHARGE] = 8.88  # To make it obvious there is an error
-                    try:
-                        self.globals[SMAPPEES][dev.id][KWH_UNIT_COST] = float(dev.pluginProps["kwhUnitCost"])
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][KWH_UNIT_COST] = 9.99  # To make it obvious there is an error
-
-                    if "curEnergyLevel" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                        dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-
-                    if "accumEnergyTotal" in dev.states:
-                        kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                        dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
-
-                    if "alwaysOn" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][ALWAYS_ON]:3.0f} Watts"
-                        dev.updateStateOnServer("alwaysOn", self.globals[SMAPPEES][dev.id][ALWAYS_ON], uiValue=wattStr)
-
-                    if "dailyTotalCost" in dev.states:
-                        costStr = f"{self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST]:3.0f}"
-                        dev.updateStateOnServer("dailyTotalCost", self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST], uiValue=costStr)
-
-                    dev.updateStateOnServer("smappeeElectricityOnline", False, uiValue='offline')
-
-                    if self.globals[PLUGIN_INITIALIZED] and self.serviceLocationId != "":
-                        self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION, str(self.serviceLocationId)])
-
-                    self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
-
-                # Initialise internal to plugin smappee electricity net states to default values
-                elif dev.deviceTypeId == "smappeeElectricityNet":
-
-                    self.logger.debug(
-                        f"SMAPPEE DEV [ELECTRICITY NET] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET] = True
-
-                    self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
-
-                    self.logger.debug(
-                        f"SMAPPEE DEV [ELECTRICITY NET] START self.serviceLocationId = [{self.serviceLocationId}]")
-
-                    self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeElectricityNet', self.serviceLocationId, dev.id, '0', '0')
-
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY NET] START smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[SMAPPEES][dev.id] = dict()
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
-                    self.globals[SMAPPEES][dev.id][NAME] = dev.name
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
-                    self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
-                    self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                    self.globals[SMAPPEES][dev.id][DAILY_NET_TOTAL_COST] = 0.0
-                    self.globals[SMAPPEES][dev.id][LAST_RESET_ELECTRICITY_NET_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_NET_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_NET] = 0.0
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_NET_POWER] = dev.pluginProps["hideEnergyMeterCurNetPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_NET_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER] = dev.pluginProps["hideEnergyMeterCurZeroNetPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_NET_POWER] = dev.pluginProps["hideEnergyMeterAccumNetPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_NET_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_NET_POWER_COST] = dev.pluginProps["hideEnergyMeterAccumNetPowerCost"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_NET_POWER_COST] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id]['hideNoChangeEnergyMeterAccumNetPower'] = dev.pluginProps["hideNoChangeEnergyMeterAccumNetPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id]['hideNoChangeEnergyMeterAccumNetPower'] = False
-
-                    if "curEnergyLevel" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                        dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-
-                    if "accumEnergyTotal" in dev.states:
-                        kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                        dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
-
-                    if "dailyNetTotalCost" in dev.states:
-                        costStr = f"{self.globals[SMAPPEES][dev.id][DAILY_NET_TOTAL_COST]:3.0f}"
-                        dev.updateStateOnServer("dailyNetTotalCost", self.globals[SMAPPEES][dev.id][DAILY_NET_TOTAL_COST], uiValue=costStr)
-
-                    dev.updateStateOnServer("smappeeElectricityNetOnline", False, uiValue='offline')
-
-                    # if self.globals[PLUGIN_INITIALIZED] == True and self.serviceLocationId != "":
-                    #     self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION,str(self.serviceLocationId)])
-
-                    self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
-
-                # Initialise internal to plugin smappee electricity Saved states to default values
-                elif dev.deviceTypeId == "smappeeElectricitySaved":
-
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY SAVED] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED] = True
-
-                    self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
-
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY SAVED] START self.serviceLocationId = [{self.serviceLocationId}]")
-
-                    self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeElectricitySaved', self.serviceLocationId, dev.id, '0', '0')
-
-                    self.logger.debug(f"SMAPPEE DEV [ELECTRICITY SAVED] START smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[SMAPPEES][dev.id] = dict()
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
-                    self.globals[SMAPPEES][dev.id][NAME] = dev.name
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
-                    self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
-                    self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                    self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST_SAVING] = 0.0
-                    self.globals[SMAPPEES][dev.id][LAST_RESET_ELECTRICITY_SAVED_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_SAVED_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_SAVED] = 0.0
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_SAVED_POWER] = dev.pluginProps["hideEnergyMeterCurSavedPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_SAVED_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER] = dev.pluginProps["hideEnergyMeterCurZeroSavedPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_CURRENT_ZERO_NET_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER] = dev.pluginProps["hideEnergyMeterAccumSavedPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER_COST] = dev.pluginProps["hideEnergyMeterAccumSavedPowerCost"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ENERGY_METER_ACCUMULATED_SAVED_POWER_COST] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_NO_CHANGE_ENERGY_METER_ACCUMULATED_SAVED_POWER] = dev.pluginProps["hideNoChangeEnergyMeterAccumSavedPower"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_NO_CHANGE_ENERGY_METER_ACCUMULATED_SAVED_POWER] = False
-
-                    if "curEnergyLevel" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                        dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-
-                    if "accumEnergyTotal" in dev.states:
-                        kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                        dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
-
-                    if "dailyTotalCostSaving" in dev.states:
-                        costStr = f"{self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST_SAVING]:3.0f}"
-                        dev.updateStateOnServer("dailyTotalCostSaving", self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST_SAVING], uiValue=costStr)
-
-                    dev.updateStateOnServer("smappeeElectricitySavedOnline", False, uiValue='offline')
-
-                    # if self.globals[PLUGIN_INITIALIZED] == True and self.serviceLocationId != "":
-                    #     self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION,str(self.serviceLocationId)])
-
-                    self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
-
-                # Initialise internal to plugin smappee solar states to default values
-                elif dev.deviceTypeId == "smappeeSolar":
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[CONFIG][SUPPORTS_SOLAR] = True
-
-                    self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR] START self.serviceLocationId = [{self.serviceLocationId}]")
-
-                    self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeSolar', self.serviceLocationId, dev.id, '0', '0')
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR] START smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[SMAPPEES][dev.id] = dict()
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
-                    self.globals[SMAPPEES][dev.id][NAME] = dev.name
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
-                    self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
-                    self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                    self.globals[SMAPPEES][dev.id][LAST_RESET_SOLAR_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_SOLAR_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_SOLAR] = 0.0
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_SOLAR_METER_CURRENT_GENERATION] = dev.pluginProps["hideSolarMeterCurGeneration"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_SOLAR_METER_CURRENT_GENERATION] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION] = dev.pluginProps["hideZeroSolarMeterCurGeneration"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_SOLAR_METER_ACCUMULATED_GENERATION] = dev.pluginProps["hideSolarMeterAccumGeneration"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_SOLAR_METER_ACCUMULATED_GENERATION] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_SOLAR_METER_ACCUMULATED_GENERATION_COST] = dev.pluginProps["hideSolarMeterAccumGenerationCost"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_SOLAR_METER_ACCUMULATED_GENERATION_COST] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION] = dev.pluginProps["hideNoChangeInSolarMeterAccumGeneration"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][HIDE_NO_CHANGE_IN_SOLAR_METER_ACCUMULATED_GENERATION] = False
-                    try:
-                        self.globals[SMAPPEES][dev.id][CURRENCY_CODE] = dev.pluginProps["currencyCode"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][CURRENCY_CODE] = 'UKP'
-                    try:
-                        self.globals[SMAPPEES][dev.id][GENERATION_RATE] = float(dev.pluginProps["generationRate"])
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][GENERATION_RATE] = 8.88  # To make it obvious there is an error
-
-                    try:
-                        self.globals[SMAPPEES][dev.id][EXPORT_TYPE] = dev.pluginProps["exportType"]
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][EXPORT_TYPE] = 'percentage'
-
-                    try:
-                        self.globals[SMAPPEES][dev.id][EXPORT_PERCENTAGE] = float(dev.pluginProps["exportPercentage"])
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][EXPORT_PERCENTAGE] = 50.0  # To make it obvious there is an error
-
-                    try:
-                        self.globals[SMAPPEES][dev.id][EXPORT_RATE] = float(dev.pluginProps["exportRate"])
-                    except Exception as exception_error:
-                        self.globals[SMAPPEES][dev.id][EXPORT_RATE] = 9.99  # To make it obvious there is an error
-                    if "curEnergyLevel" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                        dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-
-                    if "accumEnergyTotal" in dev.states:
-                        kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                        dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
-
-                    dev.updateStateOnServer("smappeeSolarOnline", False, uiValue='offline')
-
-                    if self.globals[PLUGIN_INITIALIZED] and self.serviceLocationId != "":
-                        self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION, str(self.serviceLocationId)])
-
-                    self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
-
-                # Initialise internal to plugin smappee solar used states to default values
-                elif dev.deviceTypeId == "smappeeSolarUsed":
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR USED] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[CONFIG][SUPPORTS_SOLAR_USED] = True
-
-                    self.serviceLocationId = dev.pluginProps["serviceLocationId"]
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR USED] START self.serviceLocationId = [{self.serviceLocationId}]")
-
-                    self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeSolarUsed', self.serviceLocationId, dev.id, '0', '0')
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR USED] START smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[SMAPPEES][dev.id] = dict()
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
-                    self.globals[SMAPPEES][dev.id][NAME] = dev.name
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
-                    self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
-                    self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                    self.globals[SMAPPEES][dev.id][LAST_RESET_SOLAR_USED_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_SOLAR_USED_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_SOLAR_USED] = 0.0
-                    self.globals[SMAPPEES][dev.id][HIDE_SOLAR_USED_METER_CURRENT_GENERATION] = dev.pluginProps["hideSolarUsedMeterCurGeneration"]  # TODO : CHECK UPPER CASE CPNSTANTS are correct
-                    self.globals[SMAPPEES][dev.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION] = dev.pluginProps["hideZeroSolarUsedMeterCurGeneration"]
-                    self.globals[SMAPPEES][dev.id][HIDE_SOLAR_USED_METER_ACCUMULATED_GENERATION] = dev.pluginProps["hideSolarUsedMeterAccumGeneration"]
-                    self.globals[SMAPPEES][dev.id][HIDE_NO_CHANGE_IN_SOLAR_USED_METER_ACCUMULATED_GENERATION] = dev.pluginProps["hideNoChangeInSolarUsedMeterAccumGeneration"]
-
-                    if "curEnergyLevel" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                        dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-
-                    if "accumEnergyTotal" in dev.states:
-                        kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                        dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
-
-                    dev.updateStateOnServer("smappeeSolarUsedOnline", False, uiValue='offline')
-
-                    # if self.globals[PLUGIN_INITIALIZED] == True and self.serviceLocationId != "":
-                    #     self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION,str(self.serviceLocationId)])
-
-                    self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
-
-                # Initialise internal to plugin smappee solar exported states to default values
-                elif dev.deviceTypeId == "smappeeSolarExported":
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR EXPORTED] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED] = True
-
-                    self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR EXPORTED] START self.serviceLocationId = [{self.serviceLocationId}]")
-
-                    self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeSolarExported', self.serviceLocationId, dev.id, '0', '0')
-
-                    self.logger.debug(f"SMAPPEE DEV [SOLAR EXPORTED] START smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-
-                    self.globals[SMAPPEES][dev.id] = dict()
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
-                    self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_NAME] = dev.pluginProps["serviceLocationName"]
-                    self.globals[SMAPPEES][dev.id][NAME] = dev.name
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_COST] = 0
-                    self.globals[SMAPPEES][dev.id][ELECTRICITY_CURRENCY] = 0
-                    self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL] = 0.0
-                    self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL] = 0.0
-                    self.globals[SMAPPEES][dev.id][LAST_RESET_SOLAR_EXPORTED_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_SOLAR_EXPORTED_UTC] = 0
-                    self.globals[SMAPPEES][dev.id][LAST_READING_SOLAR_EXPORTED] = 0.0
-                    self.globals[SMAPPEES][dev.id][HIDE_SOLAR_EXPORTED_METER_CURRENT_GENERATION] = dev.pluginProps["hideSolarExportedMeterCurGeneration"]
-                    self.globals[SMAPPEES][dev.id][HIDE_ZERO_SOLAR_METER_CURRENT_GENERATION] = dev.pluginProps["hideZeroSolarExportedMeterCurGeneration"]
-                    self.globals[SMAPPEES][dev.id][HIDE_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION] = dev.pluginProps["hideSolarExportedMeterAccumGeneration"]
-                    self.globals[SMAPPEES][dev.id][HIDE_NO_CHANGE_IN_SOLAR_EXPORTED_METER_ACCUMULATED_GENERATION] = dev.pluginProps["hideNoChangeInSolarExportedMeterAccumGeneration"]
-
-                    if "curEnergyLevel" in dev.states:
-                        wattStr = f"{self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL]:3.0f} Watts"
-                        dev.updateStateOnServer("curEnergyLevel", self.globals[SMAPPEES][dev.id][CURRENT_ENERGY_LEVEL], uiValue=wattStr)
-
-                    if "accumEnergyTotal" in dev.states:
-                        kwhStr = f"{self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL]:3.0f} kWh"
-                        dev.updateStateOnServer("accumEnergyTotal", self.globals[SMAPPEES][dev.id][ACCUMULATED_ENERGY_TOTAL], uiValue=kwhStr)
-
-                    dev.updateStateOnServer("smappeeSolarExportedOnline", False, uiValue='offline')
-
-                    # if self.globals[PLUGIN_INITIALIZED] == True and self.serviceLocationId != "":
-                    #     self.globals[QUEUES][SEND_TO_SMAPPEE]COMMAND_CONSUMPTION,str(self.serviceLocationId)])
-
-                    self.logger.info(f"Started '{dev.name}' at address [{dev.address}]")
+            try:
+                if dev.deviceTypeId in SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE:
+                    self.startConsumptionChannel(SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE[dev.deviceTypeId], dev)
 
                 # Initialise internal to plugin smappee sensor states to default values
                 elif dev.deviceTypeId == "smappeeSensor":
 
-                    self.logger.debug(f"SMAPPEE DEV [SENSOR] START-A smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
+                    self.tracer.debug(self.logger, "SMAPPEE DEV [SENSOR] START-A smappeeServiceLocationIdToDevId = [{}]", self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
 
                     self.serviceLocationId = str(dev.pluginProps["serviceLocationId"])
 
-                    self.logger.debug(f"SMAPPEE DEV [SENSOR] START-B self.serviceLocationId = [{self.serviceLocationId}]")
+                    self.tracer.debug(self.logger, "SMAPPEE DEV [SENSOR] START-B self.serviceLocationId = [{}]", self.serviceLocationId)
 
                     self.setSmappeeServiceLocationIdToDevId(FUNCTION_ADD_UPDATE, 'smappeeSensor', self.serviceLocationId, dev.id, dev.address, dev.name)
 
-                    self.logger.debug(f"SMAPPEE DEV [SENSOR] START-C smappeeServiceLocationIdToDevId [2] = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
+                    self.tracer.debug(self.logger, "SMAPPEE DEV [SENSOR] START-C smappeeServiceLocationIdToDevId [2] = [{}]", self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
 
                     self.globals[SMAPPEES][dev.id] = dict()
                     self.globals[SMAPPEES][dev.id][SERVICE_LOCATION_ID] = dev.pluginProps["serviceLocationId"]
@@ -4744,6 +3816,8 @@ class Plugin(indigo.PluginBase):
                         costStr = f"{self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST]:3.0f}"
                         dev.updateStateOnServer("dailyTotalCost", self.globals[SMAPPEES][dev.id][DAILY_TOTAL_COST], uiValue=costStr)
 
+                    self.indexDeviceAddress(dev)
+
                     if self.globals[PLUGIN_INITIALIZED] and self.serviceLocationId != "":
                         self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_SENSOR_CONSUMPTION, str(self.serviceLocationId)])
 
@@ -4777,6 +3851,10 @@ class Plugin(indigo.PluginBase):
 
                     dev.updateStateOnServer("smappeeApplianceEventStatus", "NONE", uiValue="No Events")
                     dev.updateStateImageOnServer(indigo.kStateImageSel.EnergyMeterOff)
+                    self.globals[APPLIANCE_EVENT_ENGINE].state_image_written(dev.id, indigo.kStateImageSel.EnergyMeterOff)
+                    self.globals[APPLIANCE_EVENT_ENGINE].seed_device(dev)
+
+                    self.indexDeviceAddress(dev)
 
                     self.logger.info(f"Started '{dev.name}' at address [{self.globals[SMAPPEE_APPLIANCES][dev.id][ADDRESS]}]")
 
@@ -4794,9 +3872,11 @@ class Plugin(indigo.PluginBase):
 
                     dev.updateStateOnServer("onOffState", False, uiValue='off')
 
+                    self.indexDeviceAddress(dev)
+
                     self.logger.info(f"Started '{dev.name}' at address [{self.globals[SMAPPEE_PLUGS][dev.id][ADDRESS]}]")
 
-                self.logger.debug(f"SMAPPEE DEV [{dev.name}] [{dev.model}] START smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
+                self.tracer.debug(self.logger, "SMAPPEE DEV [{}] [{}] START smappeeServiceLocationIdToDevId = [{}]", dev.name, dev.model, self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
 
             except Exception as exception_error:
                 self.exception_handler(exception_error, True)  # Log error and display failing statement
@@ -4807,40 +3887,25 @@ class Plugin(indigo.PluginBase):
     def deviceStopComm(self, dev):
         try:
             self.globals[SMAPPEES][dev.id] = dict()
+            self.globals[STATE_SHADOW].forget_device(dev.id)
 
-            if dev.deviceTypeId == "smappeeElectricity":
-                dev.updateStateOnServer("smappeeElectricityOnline", False, uiValue='Stopped')
-                self.globals[CONFIG][SUPPORTS_ELECTRICITY] = False
-
-            elif dev.deviceTypeId == "smappeeElectricityNet":
-                dev.updateStateOnServer("smappeeElectricityNetOnline", False, uiValue='Stopped')
-                self.globals[CONFIG][SUPPORTS_ELECTRICITY_NET] = False
-
-            elif dev.deviceTypeId == "smappeeElectricitySaved":
-                dev.updateStateOnServer("smappeeElectricitySavedOnline", False, uiValue='Stopped')
-                self.globals[CONFIG][SUPPORTS_ELECTRICITY_SAVED] = False
-
-            elif dev.deviceTypeId == "smappeeSolar":
-                dev.updateStateOnServer("smappeeSolarOnline", False, uiValue='Stopped')
-                self.globals[CONFIG][SUPPORTS_SOLAR] = False
-
-            elif dev.deviceTypeId == "smappeeSolarUsed":
-                dev.updateStateOnServer("smappeeSolarUsedOnline", False, uiValue='Stopped')
-                self.globals[CONFIG][SUPPORTS_SOLAR_USED] = False
-
-            elif dev.deviceTypeId == "smappeeSolarExported":
-                dev.updateStateOnServer("smappeeSolarExportedOnline", False, uiValue='Stopped')
-                self.globals[CONFIG][SUPPORTS_SOLAR_EXPORTED] = False
+            if dev.deviceTypeId in SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE:
+                channel = SMAPPEE_CONSUMPTION_CHANNEL_BY_DEVICE_TYPE[dev.deviceTypeId]
+                dev.updateStateOnServer(channel.onlineState, False, uiValue='Stopped')
+                self.globals[CONFIG][channel.supportsKey] = False
 
             elif dev.deviceTypeId == "smappeeSensor":
                 dev.updateStateOnServer("smappeeSensorOnline", False, uiValue='Stopped')
 
             elif dev.deviceTypeId == "smappeeAppliance":
                 dev.updateStateOnServer("smappeeApplianceEventStatus", 'Stopped')
+                self.globals[APPLIANCE_EVENT_ENGINE].forget_device(dev.id)
 
             elif dev.deviceTypeId == "smappeeActuator":
                 dev.updateStateOnServer("onOffState", False, uiValue='stopped')
 
+            self.unindexDeviceAddress(dev)
+
             serviceLocationId = dev.pluginProps["serviceLocationId"]
             self.setSmappeeServiceLocationIdToDevId(FUNCTION_STOP, dev.deviceTypeId, serviceLocationId, dev.id, dev.address,
                                                     dev.name)
@@ -6,9 +6,12 @@
 
 # noinspection PyUnresolvedReferences
 # ============================== Native Imports ===============================
+import heapq
 import logging
+import math
 import sys
 import threading
+import time
 import traceback
 
 # ============================== Custom Imports ===============================
@@ -23,6 +26,9 @@ from constants import *
 
 class ThreadPolling(threading.Thread):
 
+    # This class schedules the polling of Smappee. Each (command, service location) pair is held in a heap ordered by when it is next due,
+    # with its own interval and phase (settle offset) so that e.g. events can be polled more often than sensor consumption
+
     def __init__(self, pluginGlobals, event):
 
         threading.Thread.__init__(self)
@@ -36,6 +42,11 @@ class ThreadPolling(threading.Thread):
 
         self.pollingLogger = logging.getLogger("Plugin.polling")
 
+        self.pollHeap = list()  # Entries: [time due, command order, serviceLocationId, command]
+        self.pollSchedule = dict()  # (command, serviceLocationId) -> [interval seconds, phase seconds] of each scheduled pair
+        self.lastPollCheckTime = time.time()  # Polls due after this time have not yet been sent
+        self.reportedPollingIntervals = dict()  # serviceLocationId -> consumption polling interval last shown in the electricity device state
+
         self.pollingLogger.info(f"Initialising to poll at {self.globals[POLLING][SECONDS]} second intervals")
 
     def exception_handler(self, exception_error_message, log_failing_statement):
@@ -48,10 +59,110 @@ class ThreadPolling(threading.Thread):
             log_message = log_message + f" at line {line_number}"
         self.pollingLogger.error(log_message)
 
+    def calculate_next_poll_time(self, pollingSeconds, phaseSeconds, fromTime):
+        # Polls are aligned to the polling interval boundaries (which coincide with Smappee's 5 minute readings) plus the phase (settle) offset.
+        # The time is derived from the clock (rather than the previous poll) so that slow poll cycles don't cause the polls to drift.
+        phaseSeconds = phaseSeconds % pollingSeconds
+        return ((math.floor((fromTime - phaseSeconds) / pollingSeconds) + 1) * pollingSeconds) + phaseSeconds
+
+    def get_poll_schedule(self, smappeeCommand, serviceLocationId):
+        # Returns [interval seconds, phase seconds] for the (command, service location) pair, or None if it isn't to be polled
+        pollingSeconds = self.globals[POLLING][SCHEDULE].get(smappeeCommand, 0.0)
+        if pollingSeconds <= 0.0:
+            return None
+        if smappeeCommand == COMMAND_GET_CONSUMPTION and self.globals[POLLING][ADAPTIVE]:
+            # Adaptive polling: double the interval after each run of idle polls (events are still polled at their normal rate so that activity is seen)
+            backoffSteps = self.globals[POLLING][IDLE_POLLS].get(serviceLocationId, 0) // SMAPPEE_POLL_IDLE_THRESHOLD
+            pollingSeconds = min(pollingSeconds * (2 ** min(backoffSteps, 16)), max(pollingSeconds, SMAPPEE_POLL_BACKOFF_MAXIMUM_SECONDS))
+        return [pollingSeconds, self.globals[POLLING][SETTLE_SECONDS]]
+
+    def adaptive_polling_changed(self):
+        # Returns True if a location's consumption polling interval has changed (e.g. activity seen whilst backed off) so that the schedule must be rebuilt
+        for pollKey, pollSchedule in self.pollSchedule.items():
+            if pollKey[0] == COMMAND_GET_CONSUMPTION:
+                currentPollSchedule = self.get_poll_schedule(pollKey[0], pollKey[1])
+                if currentPollSchedule is not None and currentPollSchedule[0] != pollSchedule[0]:
+                    return True
+        return False
+
+    def update_polling_interval_states(self):
+        # Show the effective consumption polling interval on each location's electricity device
+        try:
+            for pollKey, pollSchedule in self.pollSchedule.items():
+                smappeeCommand, serviceLocationId = pollKey
+                if smappeeCommand != COMMAND_GET_CONSUMPTION or self.reportedPollingIntervals.get(serviceLocationId, 0) == int(pollSchedule[0]):
+                    continue
+                electricityId = self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][serviceLocationId].get(ELECTRICITY_ID, 0)
+                if electricityId == 0:
+                    continue
+                indigo.devices[electricityId].updateStateOnServer("pollingInterval", int(pollSchedule[0]), uiValue=f"{int(pollSchedule[0])} seconds")
+                self.reportedPollingIntervals[serviceLocationId] = int(pollSchedule[0])
+                self.pollingLogger.debug(f"Location [{serviceLocationId}] consumption now polled every {int(pollSchedule[0])} seconds")
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def update_schedule(self, rebuild):
+        # Adds newly discovered service locations to the schedule (and drops removed ones); rebuild is True if the polling settings have changed
+        try:
+            if rebuild:
+                self.pollHeap = list()
+                self.pollSchedule = dict()
+
+            serviceLocationIds = [str(serviceLocationId) for serviceLocationId in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID].keys()]
+
+            for pollKey in list(self.pollSchedule.keys()):
+                if pollKey[1] not in serviceLocationIds:
+                    del self.pollSchedule[pollKey]  # Entry is discarded from the heap when next due
+
+            for serviceLocationId in serviceLocationIds:
+                for commandOrder, smappeeCommand in enumerate(SMAPPEE_POLL_COMMANDS):
+                    pollKey = (smappeeCommand, serviceLocationId)
+                    if pollKey in self.pollSchedule:
+                        continue
+                    pollSchedule = self.get_poll_schedule(smappeeCommand, serviceLocationId)
+                    if pollSchedule is None:
+                        continue
+                    self.pollSchedule[pollKey] = pollSchedule
+                    heapq.heappush(self.pollHeap, [self.calculate_next_poll_time(pollSchedule[0], pollSchedule[1], self.lastPollCheckTime), commandOrder, serviceLocationId, smappeeCommand])
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def poll_due_commands(self):
+        try:
+            # Entries due at the same time are ordered by command (consumption before events) so that the consumption 'from' time is known before events are requested
+            currentTime = time.time()
+            self.lastPollCheckTime = currentTime
+            while len(self.pollHeap) > 0 and self.pollHeap[0][0] <= currentTime:
+                pollEntry = heapq.heappop(self.pollHeap)
+                pollDueTime, commandOrder, serviceLocationId, smappeeCommand = pollEntry
+                pollKey = (smappeeCommand, serviceLocationId)
+                if pollKey not in self.pollSchedule:
+                    continue  # Service location has gone
+
+                self.globals[QUEUES][SEND_TO_SMAPPEE].put([smappeeCommand, serviceLocationId])
+
+                # Schedule the next poll from the clock rather than from the previous poll, skipping any boundaries missed whilst polling
+                pollingSeconds, phaseSeconds = self.pollSchedule[pollKey]
+                pollEntry[0] = self.calculate_next_poll_time(pollingSeconds, phaseSeconds, currentTime)
+                missedPolls = int(round((pollEntry[0] - pollDueTime) / pollingSeconds)) - 1
+                if missedPolls > 0:
+                    self.pollingLogger.debug(f"Polling running late - skipped {missedPolls} '{smappeeCommand}' poll(s) for location [{serviceLocationId}]")
+                heapq.heappush(self.pollHeap, pollEntry)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
     def run(self):
         try:  
+            self.update_schedule(True)
             while True:
-                self.pollStop.wait(self.globals[POLLING][SECONDS])
+                # Wake at least every SMAPPEE_POLL_CHECK_SECONDS to pick up newly discovered service locations
+                waitSeconds = SMAPPEE_POLL_CHECK_SECONDS
+                if len(self.pollHeap) > 0:
+                    waitSeconds = min(max(self.pollHeap[0][0] - time.time(), 0.0), waitSeconds)
+                self.pollStop.wait(waitSeconds)
 
                 if self.pollStop.isSet():
                     if self.globals[POLLING][FORCE_THREAD_END]:
@@ -59,20 +170,19 @@ class ThreadPolling(threading.Thread):
                     else:
                         self.pollStop.clear()
 
-                self.pollingLogger.debug(f"Start of While Loop ...")  # Message not quite at start as debug settings need to be checked first and also whether thread is being stopped.
-
-                # Check if polling seconds interval has changed and if so set accordingly
-                if self.globals[POLLING][SECONDS] != self.previousPollingSeconds:
-                    self.pollingLogger.info(f"Changing to poll at %i second intervals (was %i seconds)" % (self.globals[POLLING][SECONDS], self.previousPollingSeconds))
-                    self.previousPollingSeconds = self.globals[POLLING][SECONDS]
+                        # Check if polling seconds interval has changed and if so set accordingly
+                        if self.globals[POLLING][SECONDS] != self.previousPollingSeconds:
+                            self.pollingLogger.info(f"Changing to poll at %i second intervals (was %i seconds)" % (self.globals[POLLING][SECONDS], self.previousPollingSeconds))
+                            self.previousPollingSeconds = self.globals[POLLING][SECONDS]
 
-                self.pollingLogger.debug(f"Polling at %i second intervals" % (self.globals[POLLING][SECONDS]))
+                        self.update_schedule(True)  # Polling settings may have changed
+                        continue
 
-                for serviceLocationId, serviceLocationDetails in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID].items():
-                    pass
-                    self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_CONSUMPTION, str(serviceLocationId)])
-                    self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_EVENTS, str(serviceLocationId)])
-                    self.globals[QUEUES][SEND_TO_SMAPPEE].put([COMMAND_GET_SENSOR_CONSUMPTION, str(serviceLocationId)])
+                self.update_schedule(False)
+                self.poll_due_commands()
+                if self.adaptive_polling_changed():
+                    self.update_schedule(True)
+                self.update_polling_interval_states()
 
             self.pollingLogger.debug(f"Polling thread ending: pollStop.isSet={self.pollStop.isSet()}, forceThreadEnd={self.globals[POLLING][FORCE_THREAD_END]},"
                                      f" newSeconds={self.globals[POLLING][SECONDS]}, previousSeconds={self.previousPollingSeconds}")
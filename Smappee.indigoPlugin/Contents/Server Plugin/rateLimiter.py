@@ -0,0 +1,133 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Rate Limiter © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import datetime
+import email.utils
+import logging
+import random
+import sys
+import threading
+import time
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeRateLimiter:
+
+    # This class governs the rate of all calls to the Smappee API (token bucket + backoff when Smappee throttles)
+
+    def __init__(self, pluginGlobals):
+
+        self.globals = pluginGlobals
+
+        self.rateLimiterLogger = logging.getLogger("Plugin.rateLimiter")
+
+        self.lock = threading.Lock()
+
+        self.tokens = float(self.globals[CONFIG][API_RATE_LIMIT_BURST])
+        self.lastRefillTime = time.monotonic()
+        self.blockedUntilTime = 0.0  # Set when Smappee has asked us to back off
+        self.consecutiveThrottles = 0
+
+        self.globals[API_RATE_LIMIT] = dict()
+        self.globals[API_RATE_LIMIT][THROTTLED_REQUESTS] = 0  # Requests that had to wait for the token bucket or a backoff
+        self.globals[API_RATE_LIMIT][THROTTLED_SECONDS] = 0.0  # Total time requests have waited
+        self.globals[API_RATE_LIMIT][RATE_LIMITED_RESPONSES] = 0  # HTTP 429 / 503 responses received from Smappee
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.rateLimiterLogger.error(log_message)
+
+    def acquire(self, reserveTokens=0.0):
+        # Blocks until a request to Smappee may be sent
+        # reserveTokens: background requests (e.g. backfill) only proceed whilst this many tokens are left over for live requests
+        try:
+            waitedSeconds = 0.0
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    ratePerSecond = max(float(self.globals[CONFIG][API_RATE_LIMIT_PER_MINUTE]), 1.0) / 60.0
+                    burst = max(float(self.globals[CONFIG][API_RATE_LIMIT_BURST]), 1.0)
+                    requiredTokens = 1.0 + min(reserveTokens, burst - 1.0)
+
+                    self.tokens = min(burst, self.tokens + ((now - self.lastRefillTime) * ratePerSecond))
+                    self.lastRefillTime = now
+
+                    waitSeconds = max(self.blockedUntilTime - now, 0.0)
+                    if waitSeconds == 0.0:
+                        if self.tokens >= requiredTokens:
+                            self.tokens -= 1.0
+                            break
+                        waitSeconds = (requiredTokens - self.tokens) / ratePerSecond
+
+                time.sleep(waitSeconds)
+                waitedSeconds += waitSeconds
+
+            if waitedSeconds > 0.0:
+                with self.lock:
+                    self.globals[API_RATE_LIMIT][THROTTLED_REQUESTS] += 1
+                    self.globals[API_RATE_LIMIT][THROTTLED_SECONDS] += waitedSeconds
+                self.rateLimiterLogger.debug(f"Smappee request throttled for {waitedSeconds:.3f} seconds")
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def throttled(self, retryAfter):
+        # Called when Smappee responds with 429 / 503 - returns the number of seconds all requests will now back off for
+        try:
+            with self.lock:
+                self.consecutiveThrottles += 1
+                self.globals[API_RATE_LIMIT][RATE_LIMITED_RESPONSES] += 1
+
+                backoffSeconds = self.parse_retry_after(retryAfter)
+                if backoffSeconds is None:
+                    # Exponential backoff with jitter
+                    backoffSeconds = min(SMAPPEE_API_BACKOFF_MAXIMUM, SMAPPEE_API_BACKOFF_BASE * (2 ** (self.consecutiveThrottles - 1)))
+                    backoffSeconds = random.uniform(backoffSeconds / 2.0, backoffSeconds)
+
+                self.blockedUntilTime = max(self.blockedUntilTime, time.monotonic() + backoffSeconds)
+                self.tokens = 0.0
+
+            self.rateLimiterLogger.warning(f"Smappee is limiting requests - backing off for {backoffSeconds:.1f} seconds")
+            return backoffSeconds
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return SMAPPEE_API_BACKOFF_BASE
+
+    def succeeded(self):
+        self.consecutiveThrottles = 0
+
+    def parse_retry_after(self, retryAfter):
+        # Retry-After is either a number of seconds or an HTTP date
+        try:
+            if retryAfter is None or retryAfter == "":
+                return None
+            try:
+                return max(float(retryAfter), 0.0)
+            except ValueError:
+                retryAfterDateTime = email.utils.parsedate_to_datetime(retryAfter)
+                return max((retryAfterDateTime - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+        except Exception as exception_error:
+            self.rateLimiterLogger.debug(f"Unable to interpret Retry-After header '{retryAfter}': {exception_error}")
+            return None
@@ -0,0 +1,164 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Response Processor © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import logging
+import queue
+import sys
+import threading
+import time
+import traceback
+import zlib
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeResponseProcessor:
+
+    # This class handles the responses taken from the PROCESS queue on a pool of worker threads.
+    # Responses are sharded by service location: a location's responses are always handled by the same worker, and so in the order received
+    # (its cursors and accumulated totals depend on it), whilst responses for different locations are handled concurrently.
+    # Responses not in SMAPPEE_CONCURRENT_RESPONSES are handled exclusively (no other response is handled meanwhile) as their handlers
+    # update state shared across locations (e.g. SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID) that the concurrent handlers read
+
+    def __init__(self, pluginGlobals, handler):
+
+        self.globals = pluginGlobals
+
+        self.responseProcessorLogger = logging.getLogger("Plugin.responseProcessor")
+
+        self.handler = handler  # Called with (command, serviceLocationId, response)
+
+        self.workerQueues = [queue.Queue() for _ in range(SMAPPEE_RESPONSE_WORKERS)]
+        self.workers = list()
+
+        self.handlingLock = SmappeeHandlingLock()  # Shared whilst handling a concurrent response, exclusive whilst handling any other
+
+        self.handlerTimesLock = threading.Lock()
+        self.handlerTimes = dict()  # Per command [responses handled, total seconds, maximum seconds]
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.responseProcessorLogger.error(log_message)
+
+    def start(self):
+        try:
+            for workerNumber, workerQueue in enumerate(self.workerQueues):
+                worker = threading.Thread(target=self.process_responses, args=(workerQueue,), name=f"Smappee Response Worker {workerNumber + 1}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def stop(self):
+        try:
+            for workerQueue in self.workerQueues:
+                workerQueue.put(None)  # Each worker ends once it has handled the responses already queued to it
+            for worker in self.workers:
+                worker.join(SMAPPEE_RESPONSE_WORKER_STOP_SECONDS)
+            self.workers = list()
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def submit(self, response):
+        # response: [command, serviceLocationId, response] as taken from the PROCESS queue
+        shard = zlib.crc32(str(response[1]).encode("utf-8")) % len(self.workerQueues)  # Stable across restarts, unlike hash()
+        self.workerQueues[shard].put(response)
+
+    def process_responses(self, workerQueue):
+        while True:
+            response = workerQueue.get()
+            if response is None:
+                break
+            self.handle_response(response)
+
+    def handle_response(self, response):
+        try:
+            command = response[0]
+            handlerStartTime = time.perf_counter()
+            if command in SMAPPEE_CONCURRENT_RESPONSES:
+                self.handlingLock.acquire_shared()
+                try:
+                    self.handler(response[0], response[1], response[2])
+                finally:
+                    self.handlingLock.release_shared()
+            else:
+                self.handlingLock.acquire_exclusive()
+                try:
+                    self.handler(response[0], response[1], response[2])
+                finally:
+                    self.handlingLock.release_exclusive()
+            self.record_handler_time(command, time.perf_counter() - handlerStartTime)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def record_handler_time(self, command, handlerSeconds):
+        with self.handlerTimesLock:
+            handlerTimes = self.handlerTimes.setdefault(command, [0, 0.0, 0.0])
+            handlerTimes[0] += 1
+            handlerTimes[1] += handlerSeconds
+            handlerTimes[2] = max(handlerTimes[2], handlerSeconds)
+
+    def handler_statistics(self):
+        # Returns a snapshot of [command, responses handled, average seconds, maximum seconds] for each command handled
+        with self.handlerTimesLock:
+            return [[command, responsesHandled, totalSeconds / responsesHandled, maximumSeconds]
+                    for command, (responsesHandled, totalSeconds, maximumSeconds) in self.handlerTimes.items()]
+
+
+class SmappeeHandlingLock:
+
+    # A readers / writer lock: any number of shared holders or one exclusive holder.
+    # A waiting exclusive holder blocks new shared holders, so a steady stream of concurrent responses can't starve it
+
+    def __init__(self):
+
+        self.condition = threading.Condition(threading.Lock())
+        self.sharedHolders = 0
+        self.exclusiveHeld = False
+        self.exclusiveWaiting = 0
+
+    def acquire_shared(self):
+        with self.condition:
+            while self.exclusiveHeld or self.exclusiveWaiting > 0:
+                self.condition.wait()
+            self.sharedHolders += 1
+
+    def release_shared(self):
+        with self.condition:
+            self.sharedHolders -= 1
+            if self.sharedHolders == 0:
+                self.condition.notify_all()
+
+    def acquire_exclusive(self):
+        with self.condition:
+            self.exclusiveWaiting += 1
+            while self.exclusiveHeld or self.sharedHolders > 0:
+                self.condition.wait()
+            self.exclusiveWaiting -= 1
+            self.exclusiveHeld = True
+
+    def release_exclusive(self):
+        with self.condition:
+            self.exclusiveHeld = False
+            self.condition.notify_all()
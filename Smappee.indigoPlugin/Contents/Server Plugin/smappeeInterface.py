@@ -6,12 +6,13 @@
 
 # noinspection PyUnresolvedReferences
 # ============================== Native Imports ===============================
+import asyncio
+import concurrent.futures
 import datetime
 import json
 import logging
 import queue
 import requests
-import subprocess
 import sys
 import threading
 import time
@@ -25,6 +26,8 @@ except ImportError:
 
 # ============================== Plugin Imports ===============================
 from constants import *
+from consumptionChannels import SMAPPEE_CONSUMPTION_CHANNELS
+from stateUpdates import SmappeeStateUpdates
 
 
 # noinspection PyUnresolvedReferences,PyPep8Naming,SpellCheckingInspection
@@ -39,12 +42,20 @@ class ThreadSmappeeInterface(threading.Thread):
         self.globals = pluginGlobals
 
         self.smappeeInterfaceLogger = logging.getLogger("Plugin.smappeeInterface")
-        self.smappeeInterfaceLogger.debug("Debugging Smappee Interface Thread")
+        self.tracer = self.globals[TRACER]
+        self.tracer.debug(self.smappeeInterfaceLogger, "Debugging Smappee Interface Thread")
 
         self.previous_status_message = ""
 
         self.threadStop = event
 
+        self.fromTimeUtc = dict()  # Consumption 'from' time per service location (also used when getting events)
+
+        # Long-lived HTTP session so that connections to the Smappee cloud are pooled and kept alive between calls
+        self.api_session = self.create_api_session()
+        # (access token, authorisation headers built from it) - always replaced as a whole so that executor threads never see a mismatched pair
+        self.api_auth_cache = (None, dict())
+
     def exception_handler(self, exception_error_message, log_failing_statement):
         filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
         module = filename.split('/')
@@ -73,43 +84,18 @@ class ThreadSmappeeInterface(threading.Thread):
 
                 try:
                     commandToSend = self.globals[QUEUES][SEND_TO_SMAPPEE].get(True, 5)
-                    self.smappeeInterfaceLogger.debug(f"Command to send to Smappee [Type={type(commandToSend)}]: {commandToSend}")
-
-                    smappeeCommand = commandToSend[0]
-                    service_location_id = commandToSend[1] if len(commandToSend) > 1 else None
-                    smappeeParmThree = commandToSend[2] if len(commandToSend) > 2 else None  # TODO Is this only Actuator ID = probably?
-
-                    if smappeeCommand == END_THREAD:
-                        keepThreadActive = False
-                        continue
-
-                    self.currentTimeUtc = time.mktime(indigo.server.getTime().timetuple())
-                    self.currentTimeDay = int(datetime.datetime.fromtimestamp(self.currentTimeUtc).strftime("%j"))
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - self.currentTimeUtc[{type(self.currentTimeUtc)}]=[{self.currentTimeUtc}], DAY=[{self.currentTimeDay}]")
-
-                    current_time_plus_one_hour = int(self.currentTimeUtc + float(3600))  # Add +1 hour to current time
-                    self.toTimeUtc = f"{current_time_plus_one_hour}000"
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - self.toTimeUtc=[{self.toTimeUtc}]")
-
-                    if smappeeCommand == COMMAND_GET_CONSUMPTION or smappeeCommand == COMMAND_RESET_CONSUMPTION:
-                        self.process_get_reset_consumption(smappeeCommand, service_location_id)
-                    elif smappeeCommand == COMMAND_GET_SENSOR_CONSUMPTION or smappeeCommand == COMMAND_RESET_SENSOR_CONSUMPTION:
-                        self.process_get_reset_sensor_consumption(smappeeCommand, service_location_id)
-                    elif smappeeCommand == COMMAND_GET_EVENTS and self.globals[CONSUMPTION_DATA_RECEIVED]:  # Only if consumption data already present
-                        self.process_get_events(smappeeCommand, service_location_id)
-                    elif smappeeCommand == COMMAND_INITIALISE:
-                        self.process_initialise()
-                        continue  # Continue while loop i.e. skip refresh authentication token check at end of this while loop as we have only just authenticated
-                    elif smappeeCommand == COMMAND_GET_SERVICE_LOCATIONS:
-                        self.process_get_service_locations()
-                    elif smappeeCommand == COMMAND_GET_SERVICE_LOCATION_INFO:
-                        self.process_get_service_location_info(smappeeCommand, service_location_id)
-                    elif smappeeCommand == COMMAND_ON or smappeeCommand == COMMAND_OFF:
-                        self.process_on_off(smappeeCommand, service_location_id, smappeeParmThree)
-
-                    # Finally check if authentication token needs refreshing (but only if thread NOT ending)
-                    if keepThreadActive:
-                        self.process_check_token_refresh()
+                    self.tracer.debug(self.smappeeInterfaceLogger, "Command to send to Smappee [Type={}]: {}", type(commandToSend), commandToSend)
+
+                    if self.is_poll_command(commandToSend[0]):
+                        # Poll commands are fetched concurrently as a batch; any other commands drained from the queue are then processed in order
+                        commandsToProcess = self.process_poll_batch(commandToSend)
+                    else:
+                        commandsToProcess = [commandToSend]
+
+                    for commandToProcess in commandsToProcess:
+                        keepThreadActive = self.process_command(commandToProcess)
+                        if not keepThreadActive:
+                            break
 
                 except queue.Empty:
                     pass
@@ -117,212 +103,233 @@ class ThreadSmappeeInterface(threading.Thread):
                     self.exception_handler(exception_error, True)  # Log error and display failing statement
 
             if not keepThreadActive:
-                self.smappeeInterfaceLogger.debug(f"Command Thread ending.")
+                self.tracer.debug(self.smappeeInterfaceLogger, "Command Thread ending.")
+
+            self.api_session.close()
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+        self.tracer.debug(self.smappeeInterfaceLogger, "Smappee Command Thread ended.")
+
+    def is_poll_command(self, smappeeCommand):
+        return smappeeCommand == COMMAND_GET_CONSUMPTION or smappeeCommand == COMMAND_GET_EVENTS or smappeeCommand == COMMAND_GET_SENSOR_CONSUMPTION
+
+    def set_current_times(self, smappeeCommand):
+        try:
+            self.currentTimeUtc = time.mktime(indigo.server.getTime().timetuple())
+            self.currentTimeDay = int(datetime.datetime.fromtimestamp(self.currentTimeUtc).strftime("%j"))
+            self.tracer.debug(self.smappeeInterfaceLogger, "{} - self.currentTimeUtc[{}]=[{}], DAY=[{}]", smappeeCommand, type(self.currentTimeUtc), self.currentTimeUtc, self.currentTimeDay)
+
+            current_time_plus_one_hour = int(self.currentTimeUtc + float(3600))  # Add +1 hour to current time
+            self.toTimeUtc = f"{current_time_plus_one_hour}000"
+            self.tracer.debug(self.smappeeInterfaceLogger, "{} - self.toTimeUtc=[{}]", smappeeCommand, self.toTimeUtc)
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-        self.smappeeInterfaceLogger.debug(f"Smappee Command Thread ended.")
+    def process_command(self, commandToSend):
+        # Returns False if the thread is to end
+        try:
+            smappeeCommand = commandToSend[0]
+            service_location_id = commandToSend[1] if len(commandToSend) > 1 else None
+            smappeeParmThree = commandToSend[2] if len(commandToSend) > 2 else None  # TODO Is this only Actuator ID = probably?
+
+            if smappeeCommand == END_THREAD:
+                return False
+
+            self.set_current_times(smappeeCommand)
+
+            if smappeeCommand == COMMAND_GET_CONSUMPTION or smappeeCommand == COMMAND_RESET_CONSUMPTION:
+                self.process_get_reset_consumption(smappeeCommand, service_location_id)
+            elif smappeeCommand == COMMAND_GET_SENSOR_CONSUMPTION or smappeeCommand == COMMAND_RESET_SENSOR_CONSUMPTION:
+                self.process_get_reset_sensor_consumption(smappeeCommand, service_location_id)
+            elif smappeeCommand == COMMAND_GET_EVENTS and self.globals[CONSUMPTION_DATA_RECEIVED]:  # Only if consumption data already present
+                self.process_get_events(smappeeCommand, service_location_id)
+            elif smappeeCommand == COMMAND_INITIALISE:
+                self.process_initialise()
+            elif smappeeCommand == COMMAND_GET_SERVICE_LOCATIONS:
+                self.process_get_service_locations()
+            elif smappeeCommand == COMMAND_GET_SERVICE_LOCATION_INFO:
+                self.process_get_service_location_info(smappeeCommand, service_location_id)
+            elif smappeeCommand == COMMAND_ON or smappeeCommand == COMMAND_OFF:
+                self.process_on_off(smappeeCommand, service_location_id, smappeeParmThree)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+        return True
+
+    def process_poll_batch(self, firstPollCommand):
+        # Fetches all queued GET_CONSUMPTION, GET_EVENTS and GET_SENSOR_CONSUMPTION commands concurrently and returns any other queued commands for normal processing
+        otherCommands = list()
+        try:
+            pollCommands = [firstPollCommand]
+            while True:
+                try:
+                    queuedCommand = self.globals[QUEUES][SEND_TO_SMAPPEE].get_nowait()
+                except queue.Empty:
+                    break
+                if self.is_poll_command(queuedCommand[0]):
+                    pollCommands.append(queuedCommand)
+                elif queuedCommand[0] in SMAPPEE_INTERACTIVE_COMMANDS:
+                    self.process_command(queuedCommand)  # Interactive commands are sent straight away rather than waiting for the batch
+                else:
+                    otherCommands.append(queuedCommand)
+
+            self.set_current_times(firstPollCommand[0])
+
+            # Work out the API requests in queue order (so that consumption 'from' times are known before events for the same location)
+            api_requests = list()
+            for pollCommand in pollCommands:
+                smappeeCommand = pollCommand[0]
+                service_location_id = pollCommand[1]
+                if smappeeCommand == COMMAND_GET_CONSUMPTION:
+                    api_requests.extend(self.prepare_get_reset_consumption(smappeeCommand, service_location_id))
+                elif smappeeCommand == COMMAND_GET_SENSOR_CONSUMPTION:
+                    api_requests.extend(self.prepare_get_reset_sensor_consumption(smappeeCommand, service_location_id))
+                elif smappeeCommand == COMMAND_GET_EVENTS and self.globals[CONSUMPTION_DATA_RECEIVED]:  # Only if consumption data already present
+                    api_requests.extend(self.prepare_get_events(smappeeCommand, service_location_id))
+
+            batch_start_time = time.time()
+            asyncio.run(self.fetch_api_requests(api_requests))
+            self.tracer.debug(self.smappeeInterfaceLogger, "Poll batch of {} Smappee API requests (from {} commands) completed in {:.3f} seconds", len(api_requests), len(pollCommands), time.time() - batch_start_time)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+        return otherCommands
+
+    async def fetch_api_requests(self, api_requests):
+        # Each api request is: [smappeeCommand, serviceLocationId, url, description] - replies are queued to the PROCESS queue in the same format as the sequential path
+        try:
+            if len(api_requests) == 0:
+                return
+
+            max_concurrent_requests = max(1, int(self.globals[CONFIG][MAX_CONCURRENT_REQUESTS]))
+            semaphore = asyncio.Semaphore(max_concurrent_requests)
+            sensor_semaphore = asyncio.Semaphore(min(max_concurrent_requests, SMAPPEE_SENSOR_WORKERS))  # Sensor requests are further bounded so they can't crowd out consumption and events
+            loop = asyncio.get_running_loop()
+
+            batch_complete = asyncio.Event()
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor, concurrent.futures.ThreadPoolExecutor(max_workers=1) as fast_lane_executor:
+
+                async def fetch_api_request(api_request):
+                    if api_request[0] == COMMAND_GET_SENSOR_CONSUMPTION:
+                        async with sensor_semaphore, semaphore:
+                            await loop.run_in_executor(executor, self.fetch_api_request, api_request)
+                    else:
+                        async with semaphore:
+                            await loop.run_in_executor(executor, self.fetch_api_request, api_request)
+
+                async def process_interactive_commands():
+                    # Fast lane: actuator and authentication commands queued while the batch is in progress are sent without waiting for it to complete
+                    while not batch_complete.is_set():
+                        try:
+                            interactive_command = await loop.run_in_executor(fast_lane_executor, self.globals[QUEUES][SEND_TO_SMAPPEE].get_interactive, True, SMAPPEE_FAST_LANE_POLL_SECONDS)
+                        except queue.Empty:
+                            continue
+                        await loop.run_in_executor(fast_lane_executor, self.process_command, interactive_command)
+
+                fast_lane = asyncio.ensure_future(process_interactive_commands())
+                await asyncio.gather(*[fetch_api_request(api_request) for api_request in api_requests])
+                batch_complete.set()
+                await fast_lane
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def process_api_requests(self, api_requests):
+        try:
+            for api_request in api_requests:
+                self.fetch_api_request(api_request)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def process_sensor_api_requests(self, api_requests):
+        try:
+            if len(api_requests) == 0:
+                return
+
+            # Each sensor is fetched (and its reply queued) independently by a bounded pool of workers
+            sensor_start_time = time.time()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(api_requests), SMAPPEE_SENSOR_WORKERS)) as executor:
+                for future in [executor.submit(self.fetch_api_request, api_request) for api_request in api_requests]:
+                    future.result()
+            self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION - {} sensor requests completed in {:.3f} seconds", len(api_requests), time.time() - sensor_start_time)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def fetch_api_request(self, api_request):
+        try:
+            smappeeCommand, serviceLocationId, url, description = api_request
+
+            api_request_start_time = time.time()
+            result_ok, reply = self.smappee_api_call(SMAPPEE_GET_API_CALL, url)
+            self.tracer.debug(self.smappeeInterfaceLogger, "Location [{}] {} fetched in {:.3f} seconds", serviceLocationId, description, time.time() - api_request_start_time)
+
+            if result_ok:
+                self.globals[QUEUES][PROCESS].put([smappeeCommand, serviceLocationId, reply])
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
 
     def process_get_reset_consumption(self, smappeeCommand, service_location_id):
+        try:
+            self.process_api_requests(self.prepare_get_reset_consumption(smappeeCommand, service_location_id))
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def prepare_get_reset_consumption(self, smappeeCommand, service_location_id):
+        api_requests = list()
         try:
             self.serviceLocationId = service_location_id
-            self.electricityId = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID])
-            self.electricityNetId = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_NET_ID])
-            self.electricitySavedId = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_SAVED_ID])
-            self.solarId = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_ID])
-            self.solarUsedId = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_USED_ID])
-            self.solarExportedId = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SOLAR_EXPORTED_ID])
-
-            if self.electricityId == 0 and self.solarId == 0:
+            channel_dev_ids = dict()
+            for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                channel_dev_ids[channel.name] = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][channel.devIdKey])
+
+            if channel_dev_ids["electricity"] == 0 and channel_dev_ids["solar"] == 0:
                 pass
-                self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - Smappee Base Devices [ELECTRICITY and SOLAR PV] not defined")
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - Smappee Base Devices [ELECTRICITY and SOLAR PV] not defined", smappeeCommand)
             else:
-                self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - GET_CONSUMPTION - smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - GET_CONSUMPTION - smappeeServiceLocationIdToDevId = [{}]", smappeeCommand, self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
 
                 # #TIME# self.currentTimeUtc = time.mktime(indigo.server.getTime().timetuple())
                 # #TIME# self.currentTimeDay = int(datetime.datetime.fromtimestamp(self.currentTimeUtc).strftime("%j"))
-                self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - self.currentTimeUtc[{type(self.currentTimeUtc)}]=[{self.currentTimeUtc}], DAY=[{self.currentTimeDay}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - self.currentTimeUtc[{}]=[{}], DAY=[{}]", smappeeCommand, type(self.currentTimeUtc), self.currentTimeUtc, self.currentTimeDay)
 
-                if self.electricityId != 0:
-                    devElectricity = indigo.devices[self.electricityId]
+                previous_from_time_utc = int(self.get_consumption_from_time_utc(self.serviceLocationId))  # Used to detect the channels being reset to midnight below
 
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand}"
-                                                      f" - lastReadingElectricityUtc[{type(self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC])}]"
-                                                      f" = [{self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC]}]")
-                    self.lastReadingElectricityDay = int(datetime.datetime.fromtimestamp(float(self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC] / 1000)).strftime("%j"))
+                from_time_midnight_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
+                for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                    if channel_dev_ids[channel.name] != 0:
+                        self.reset_consumption_channel(smappeeCommand, channel, indigo.devices[channel_dev_ids[channel.name]], from_time_midnight_utc)
 
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingElectricityDay=[{self.lastReadingElectricityDay}] vs currentTimeDay=[{self.currentTimeDay}]")
+                # Only request the buckets after the newest one already stored - the channel furthest behind governs the request
+                fromTimeUtc = self.get_consumption_from_time_utc(self.serviceLocationId)
+                self.fromTimeUtc[self.serviceLocationId] = fromTimeUtc
 
-                    if (self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC] > 0 and
-                            self.lastReadingElectricityDay == self.currentTimeDay and smappeeCommand != COMMAND_RESET_CONSUMPTION):
-                        self.fromTimeElectricityUtc = str(int(self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC]))
-                    else:
-                        from_time_electricity_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
-                        self.fromTimeElectricityUtc = f"{from_time_electricity_utc}001"
-                        self.globals[SMAPPEES][devElectricity.id][LAST_READING_ELECTRICITY_UTC] = float(
-                            float(self.fromTimeElectricityUtc) - 1.0)
-                        if "accumEnergyTotal" in devElectricity.states:
-                            kwh = 0.0
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            self.smappeeInterfaceLogger.info(f"reset '{devElectricity.name}' electricity total to 0.0")
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devElectricity.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                if self.electricityNetId != 0:
-                    devElectricityNet = indigo.devices[self.electricityNetId]
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand}"
-                                                      f" - lastReadingElectricityNetUtc[{type(self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC])}]"
-                                                      f" = [{ self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC]}]")
-                    self.lastReadingElectricityNetDay = int(datetime.datetime.fromtimestamp(float(
-                        self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC] / 1000)).strftime("%j"))
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingElectricityNetDay=[{self.lastReadingElectricityNetDay}] vs currentTimeDay=[{self.currentTimeDay}]")
-
-                    if (self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC] > 0 and
-                            self.lastReadingElectricityNetDay == self.currentTimeDay and smappeeCommand != COMMAND_RESET_CONSUMPTION):
-                        self.fromTimeElectricityNetUtc = str(int(self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC]))
-                    else:
-                        from_timeE_eectricity_net_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
-                        self.fromTimeElectricityNetUtc = f"{from_timeE_eectricity_net_utc}001"
-                        self.globals[SMAPPEES][devElectricityNet.id][LAST_READING_ELECTRICITY_NET_UTC] = float(float(self.fromTimeElectricityNetUtc) - 1.0)
-                        if "accumEnergyTotal" in devElectricityNet.states:
-                            kwh = 0.0
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            self.smappeeInterfaceLogger.info(f"reset '{devElectricityNet.name}' electricity net total to 0.0")
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devElectricityNet.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                if self.electricitySavedId != 0:
-                    devElectricitySaved = indigo.devices[self.electricitySavedId]
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} -"
-                                                      f" lastReadingElectricitySavedUtc[{type(self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC])}]"
-                                                      f" = [{self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC]}]")
-                    self.lastReadingElectricitySavedDay = int(datetime.datetime.fromtimestamp(float(
-                        self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC] / 1000)).strftime("%j"))
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingElectricitySavedDay=[{self.lastReadingElectricitySavedDay}]"
-                                                      f" vs currentTimeDay=[{self.currentTimeDay}]")
-
-                    if (self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC] > 0 and self.lastReadingElectricitySavedDay == self.currentTimeDay
-                            and smappeeCommand != COMMAND_RESET_CONSUMPTION):
-                        self.fromTimeElectricitySavedUtc = str(int(self.globals[SMAPPEES][devElectricitySaved.id][LAST_READING_ELECTRICITY_SAVED_UTC]))
-                    else:
-                        from_time_electricity_saved_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
-                        self.fromTimeElectricitySavedUtc = f"{from_time_electricity_saved_utc}001"
-                        self.globals[SMAPPEES][devElectricitySaved.id][
-                            LAST_READING_ELECTRICITY_SAVED_UTC] = float(
-                            float(self.fromTimeElectricitySavedUtc) - 1.0)
-                        if "accumEnergyTotal" in devElectricitySaved.states:
-                            kwh = 0.0
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            self.smappeeInterfaceLogger.info(f"reset '{devElectricitySaved.name}' electricity Saved total to 0.0")
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devElectricitySaved.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                if self.solarId != 0:
-                    devSolar = indigo.devices[self.solarId]
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingSolarUtc[{type(self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC])}]"
-                                                      f" = [{self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC]}]")
-                    self.lastReadingSolarDay = int(datetime.datetime.fromtimestamp(float(self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC] / 1000)).strftime("%j"))
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingSolarDay=[{self.lastReadingSolarDay}] vs currentTimeDay=[{self.currentTimeDay}]")
-
-                    if self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC] > 0 and self.lastReadingSolarDay == self.currentTimeDay and smappeeCommand != COMMAND_RESET_CONSUMPTION:
-                        self.fromTimeSolarUtc = str(int(self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC]))
-                    else:
-                        from_time_solar_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
-                        self.fromTimeSolarUtc = f"{from_time_solar_utc}001"
-                        self.globals[SMAPPEES][devSolar.id][LAST_READING_SOLAR_UTC] = float(
-                            float(self.fromTimeSolarUtc) - 1.0)
-                        if "accumEnergyTotal" in devSolar.states:
-                            kwh = 0.0
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            self.smappeeInterfaceLogger.info(f"reset '{devSolar.name}' solar generation total to 0.0")
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devSolar.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                if self.solarUsedId != 0:
-                    devSolarUsed = indigo.devices[self.solarUsedId]
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingSolarUsedUtc[{type(self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC])}]"
-                                                      f" = [{self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC]}]")
-                    self.lastReadingSolarUsedDay = int(datetime.datetime.fromtimestamp(float(
-                        self.globals[SMAPPEES][devSolarUsed.id][
-                            LAST_READING_SOLAR_USED_UTC] / 1000)).strftime("%j"))
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingSolarUsedDay=[{self.lastReadingSolarUsedDay}] vs currentTimeDay=[{self.currentTimeDay}]")
-
-                    if self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC] > 0 and \
-                            self.lastReadingSolarUsedDay == self.currentTimeDay and smappeeCommand != COMMAND_RESET_CONSUMPTION:
-                        self.fromTimeSolarUsedUtc = str(int(self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC]))
-                    else:
-                        from_time_solar_used_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
-                        self.fromTimeSolarUsedUtc = f"{from_time_solar_used_utc}001"
-                        self.globals[SMAPPEES][devSolarUsed.id][LAST_READING_SOLAR_USED_UTC] = float(
-                            float(self.fromTimeSolarUtc) - 1.0)
-                        if "accumEnergyTotal" in devSolarUsed.states:
-                            kwh = 0.0
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            self.smappeeInterfaceLogger.info(f"reset '{devSolarUsed.name}' solar used total to 0.0")
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devSolarUsed.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                if self.solarExportedId != 0:
-                    devSolarExported = indigo.devices[self.solarExportedId]
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - "
-                                                      f"lastReadingSolarExportedUtc[{type(self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC])}]"
-                                                      f" = [{self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC]}]")
-                    self.lastReadingSolarExportedDay = int(datetime.datetime.fromtimestamp(float(
-                        self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC] / 1000)).strftime("%j"))
-
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingSolarExportedDay=[{self.lastReadingSolarExportedDay}] vs currentTimeDay=[{self.currentTimeDay}]")
-
-                    if self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC] > 0 and \
-                            self.lastReadingSolarExportedDay == self.currentTimeDay and smappeeCommand != COMMAND_RESET_CONSUMPTION:
-                        self.fromTimeSolarExportedUtc = str(int(self.globals[SMAPPEES][devSolarExported.id][LAST_READING_SOLAR_EXPORTED_UTC]))
-                    else:
-                        from_time_solar_exported_utc = int(time.mktime(datetime.datetime.combine(datetime.date.today(), datetime.time()).timetuple()))
-                        self.fromTimeSolarExportedUtc = f"{from_time_solar_exported_utc}001"
-                        self.globals[SMAPPEES][devSolarExported.id][
-                            LAST_READING_SOLAR_EXPORTED_UTC] = float(float(self.fromTimeSolarUtc) - 1.0)
-                        if "accumEnergyTotal" in devSolarExported.states:
-                            kwh = 0.0
-                            kwhStr = f"{kwh:0.3f} kWh"
-                            self.smappeeInterfaceLogger.info(f"reset '{devSolarExported.name}' solar exported total to 0.0")
-                            kwhReformatted = float(f"{kwh:0.3f}")
-                            devSolarExported.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
-
-                self.fromTimeUtc = 0
-                if self.electricityId != 0:
-                    self.fromTimeUtc = self.fromTimeElectricityUtc
-                    if self.solarId != 0:
-                        if self.fromTimeSolarUtc < self.fromTimeElectricityUtc:
-                            self.fromTimeUtc = self.fromTimeSolarUtc
-                else:
-                    if self.solarId != 0:
-                        self.fromTimeUtc = self.fromTimeSolarUtc
+                # Readings are restarted from midnight on startup / a new day - fill any history missed before then in the background
+                if int(fromTimeUtc) != previous_from_time_utc and BACKFILL in self.globals[THREADS]:
+                    self.globals[THREADS][BACKFILL][THREAD].request_backfill(self.serviceLocationId, int(fromTimeUtc))
 
                 self.globals[CONSUMPTION_DATA_RECEIVED] = True  # Set to True once the self.fromTimeUtc has been determined so getting event data doesn't fail
 
                 # #TIME# to_time_utc = int(self.currentTimeUtc + float(3600))  # Add +1 hour to current time
                 # #TIME# self.toTimeUtc = f"{to_time_utc}000"
 
-                self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - From=[{self.fromTimeUtc}], To=[{self.toTimeUtc}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - From=[{}], To=[{}]", smappeeCommand, fromTimeUtc, self.toTimeUtc)
 
                 self.aggregationType = "1"  # 1 = 5 min values (only available for the last 14 days), 2 = hourly values, 3 = daily values, 4 = monthly values, 5 = yearly values
 
-                url = f"https://app1pub.smappee.net/dev/v3/servicelocation/{self.serviceLocationId}/consumption?aggregation={self.aggregationType}&from={self.fromTimeUtc}&to={self.toTimeUtc}"
+                url = f"https://app1pub.smappee.net/dev/v3/servicelocation/{self.serviceLocationId}/consumption?aggregation={self.aggregationType}&from={fromTimeUtc}&to={self.toTimeUtc}"
 
                 # Documentation: https://smappee.atlassian.net/wiki/spaces/DEVAPI/pages/526581813/Get+Electricity+Consumption
-                result_ok, reply = self.smappee_api_call(SMAPPEE_GET_API_CALL, url)
-
-                if result_ok:
-                    self.globals[QUEUES][PROCESS].put([COMMAND_GET_CONSUMPTION, self.serviceLocationId, reply])
+                api_requests.append([COMMAND_GET_CONSUMPTION, self.serviceLocationId, url, "consumption"])
 
                 # process = subprocess.Popen(
                 #     ['curl', '-H', 'Authorization: Bearer ' + self.globals[CONFIG][ACCESS_TOKEN],
@@ -342,7 +349,55 @@ class ThreadSmappeeInterface(threading.Thread):
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
+        return api_requests
+
+    def reset_consumption_channel(self, smappeeCommand, channel, dev, from_time_midnight_utc):
+        # Restarts the channel's readings (cursor) from midnight and zeroes its accumulated total - on the first poll of a day or when a reset is requested
+        try:
+            cursor_utc = self.globals[SMAPPEES][dev.id][channel.cursorKey]
+            cursor_day = int(datetime.datetime.fromtimestamp(float(cursor_utc / 1000)).strftime("%j"))
+
+            self.tracer.debug(self.smappeeInterfaceLogger, "{} - '{}' cursor=[{}], day=[{}] vs currentTimeDay=[{}]", smappeeCommand, dev.name, cursor_utc, cursor_day, self.currentTimeDay)
+
+            if cursor_utc > 0 and cursor_day == self.currentTimeDay and smappeeCommand != COMMAND_RESET_CONSUMPTION:
+                return
+
+            self.globals[SMAPPEES][dev.id][channel.cursorKey] = float(from_time_midnight_utc * 1000)
+            if "accumEnergyTotal" in dev.states:
+                self.smappeeInterfaceLogger.info(f"reset '{dev.name}' {channel.totalDescription} to 0.0")
+                stateUpdates = SmappeeStateUpdates(self.globals)  # Keeps the state shadow in step, so the re-accumulated total isn't skipped as unchanged
+                stateUpdates.update(dev, "accumEnergyTotal", 0.0, uiValue="0.000 kWh")
+                stateUpdates.flush()
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def get_consumption_from_time_utc(self, service_location_id):
+        # Returns the 'from' time (ms) for a consumption request: just after the oldest cursor (LAST_READING_*_UTC) of the location's channels
+        try:
+            cursors_utc = list()
+            for channel in SMAPPEE_CONSUMPTION_CHANNELS:
+                dev_id = int(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][service_location_id][channel.devIdKey])
+                if dev_id != 0 and dev_id in self.globals[SMAPPEES] and channel.cursorKey in self.globals[SMAPPEES][dev_id]:
+                    cursors_utc.append(int(self.globals[SMAPPEES][dev_id][channel.cursorKey]))
+
+            if len(cursors_utc) == 0:
+                return 0
+            return str(min(cursors_utc) + 1)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return 0
+
     def process_get_reset_sensor_consumption(self, smappeeCommand, service_location_id):
+        try:
+            self.process_sensor_api_requests(self.prepare_get_reset_sensor_consumption(smappeeCommand, service_location_id))
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def prepare_get_reset_sensor_consumption(self, smappeeCommand, service_location_id):
+        api_requests = list()
         try:
             self.serviceLocationId = service_location_id
 
@@ -351,13 +406,12 @@ class ThreadSmappeeInterface(threading.Thread):
             # #TIME# self.currentTimeDay = int(datetime.datetime.fromtimestamp(self.toTimeUtc).strftime("%j"))
 
             for key, value in self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS].items():
-                self.smappeeInterfaceLogger.debug(f"GET_SENSOR_CONSUMPTION - sensorIds = [Type = {type(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS])}]"
-                                                  f" {self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS]}")
-                self.smappeeInterfaceLogger.debug(f"GET_SENSOR_CONSUMPTION = [Key = {key}] {value}")
-                self.smappeeInterfaceLogger.debug(f"GET_SENSOR_CONSUMPTION = [DevId = {value[DEV_ID]}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION - sensorIds = [Type = {}] {}", type(self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS]), self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][SENSOR_IDS])
+                self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION = [Key = {}] {}", key, value)
+                self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION = [DevId = {}]", value[DEV_ID])
 
                 if value[DEV_ID] == 0:
-                    self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - GET_SENSOR_CONSUMPTION - No Indigo Sensor Device defined for Smappee Sensor {key}")
+                    self.tracer.debug(self.smappeeInterfaceLogger, "{} - GET_SENSOR_CONSUMPTION - No Indigo Sensor Device defined for Smappee Sensor {}", smappeeCommand, key)
                     continue
 
                 # self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - GET_SENSOR_CONSUMPTION - smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
@@ -366,13 +420,10 @@ class ThreadSmappeeInterface(threading.Thread):
 
                 devSensor = indigo.devices[sensorId]
 
-                self.smappeeInterfaceLogger.debug(f"GET_SENSOR_CONSUMPTION - {smappeeCommand} -"
-                                                  f" lastReadingSensorUtc[{type(self.globals[SMAPPEES][devSensor.id][LAST_READING_SENSOR_UTC])}]"
-                                                  f" = [{self.globals[SMAPPEES][devSensor.id][LAST_READING_SENSOR_UTC]}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION - {} - lastReadingSensorUtc[{}] = [{}]", smappeeCommand, type(self.globals[SMAPPEES][devSensor.id][LAST_READING_SENSOR_UTC]), self.globals[SMAPPEES][devSensor.id][LAST_READING_SENSOR_UTC])
                 self.lastReadingSensorDay = int(datetime.datetime.fromtimestamp(float(self.globals[SMAPPEES][devSensor.id][LAST_READING_SENSOR_UTC] / 1000)).strftime("%j"))
 
-                self.smappeeInterfaceLogger.debug(f"GET_SENSOR_CONSUMPTION - {smappeeCommand} -"
-                                                  f" lastReadingSensorDay=[{self.lastReadingSensorDay}] vs currentTimeDay=[{self.currentTimeDay}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION - {} - lastReadingSensorDay=[{}] vs currentTimeDay=[{}]", smappeeCommand, self.lastReadingSensorDay, self.currentTimeDay)
 
                 if self.globals[SMAPPEES][devSensor.id][
                         LAST_READING_SENSOR_UTC] > 0 and self.lastReadingSensorDay == self.currentTimeDay and smappeeCommand != COMMAND_RESET_SENSOR_CONSUMPTION:
@@ -388,27 +439,26 @@ class ThreadSmappeeInterface(threading.Thread):
                         kwhStr = f"{kwh:0.3f} kWh"
                         self.smappeeInterfaceLogger.info(f"reset '{devSensor.name}' sensor total to 0.0")
                         kwhReformatted = float(f"{kwh:0.3f}")
-                        devSensor.updateStateOnServer("accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
+                        stateUpdates = SmappeeStateUpdates(self.globals)  # Keeps the state shadow in step, so the re-accumulated total isn't skipped as unchanged
+                        stateUpdates.update(devSensor, "accumEnergyTotal", kwhReformatted, uiValue=kwhStr)
+                        stateUpdates.flush()
 
                 self.sensorFromTimeUtc = self.fromTimeSensorUtc
 
                 sensor_to_time_utc = int(self.currentTimeUtc + float(3600))  # Add +1 hour to current time
                 self.sensorToTimeUtc = f"{sensor_to_time_utc}000"
 
-                self.smappeeInterfaceLogger.debug(f"GET_SENSOR_CONSUMPTION [BC] - {smappeeCommand} - SENSOR From=[{self.sensorFromTimeUtc}], To=[{self.sensorToTimeUtc}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "GET_SENSOR_CONSUMPTION [BC] - {} - SENSOR From=[{}], To=[{}]", smappeeCommand, self.sensorFromTimeUtc, self.sensorToTimeUtc)
 
                 self.aggregationType = "1"  # 1 = 5 min values (only available for the last 14 days), 2 = hourly values, 3 = daily values, 4 = monthly values, 5 = yearly values
 
                 self.sensorAddress = str(int(str(devSensor.address)[2:4]))
-                self.smappeeInterfaceLogger.debug(f"Sensor Address = '{self.sensorAddress}'")
+                self.tracer.debug(self.smappeeInterfaceLogger, "Sensor Address = '{}'", self.sensorAddress)
 
                 url = f"https://app1pub.smappee.net/dev/v3/servicelocation/{self.serviceLocationId}/sensor/{self.sensorAddress}/consumption?aggregation={self.aggregationType}&from={self.sensorFromTimeUtc}&to={self.sensorToTimeUtc}"
 
                 # Documentation: https://smappee.atlassian.net/wiki/spaces/DEVAPI/pages/526581817/Get+Sensor+Consumption
-                result_ok, reply = self.smappee_api_call(SMAPPEE_GET_API_CALL, url)
-
-                if result_ok:
-                    self.globals[QUEUES][PROCESS].put([COMMAND_GET_SENSOR_CONSUMPTION, self.serviceLocationId, reply])
+                api_requests.append([COMMAND_GET_SENSOR_CONSUMPTION, self.serviceLocationId, url, f"sensor '{devSensor.name}' [{self.sensorAddress}]"])
 
                 # process = subprocess.Popen(
                 #     ['curl', '-H', 'Authorization: Bearer ' + self.globals[CONFIG][ACCESS_TOKEN],
@@ -459,19 +509,30 @@ class ThreadSmappeeInterface(threading.Thread):
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
+        return api_requests
+
     def process_get_events(self, smappeeCommand, service_location_id):
+        try:
+            self.process_api_requests(self.prepare_get_events(smappeeCommand, service_location_id))
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def prepare_get_events(self, smappeeCommand, service_location_id):
+        api_requests = list()
         try:
             self.serviceLocationId = service_location_id
 
-            self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - smappeeServiceLocationIdToDevId = [{self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID]}]")
-            if self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID] != 0:
+            self.tracer.debug(self.smappeeInterfaceLogger, "{} - smappeeServiceLocationIdToDevId = [{}]", smappeeCommand, self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID])
+            if self.serviceLocationId not in self.fromTimeUtc:
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - No consumption 'from' time yet determined for location [{}]", smappeeCommand, self.serviceLocationId)
+            elif self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID] != 0:
                 dev = indigo.devices[self.globals[SMAPPEE_SERVICE_LOCATION_ID_TO_DEV_ID][self.serviceLocationId][ELECTRICITY_ID]]
 
                 # #TIME# self.toTimeUtc = time.mktime(indigo.server.getTime().timetuple())
                 # #TIME# self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - self.toTimeUtc[{type(self.toTimeUtc)}] =[{self.toTimeUtc}]")
 
-                self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - lastReadingElectricityUtc[{type(self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_UTC])}]"
-                                                  f" = [{self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_UTC]}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - lastReadingElectricityUtc[{}] = [{}]", smappeeCommand, type(self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_UTC]), self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_UTC])
                 self.lastReadingDay = int(datetime.datetime.fromtimestamp(float(self.globals[SMAPPEES][dev.id][LAST_READING_ELECTRICITY_UTC] / 1000)).strftime("%j"))
 
                 # #TIME# self.currentTimeDay = int(datetime.datetime.fromtimestamp(self.toTimeUtc).strftime("%j"))
@@ -480,18 +541,15 @@ class ThreadSmappeeInterface(threading.Thread):
                 # to_time_utc_plus_one_hour = int(self.toTimeUtc + float(3600))
                 # #TIME# self.toTimeUtc = f"{to_time_utc_plus_one_hour}000"
 
-                self.smappeeInterfaceLogger.debug(f"{smappeeCommand} - From=[{self.fromTimeUtc}], To=[{self.toTimeUtc}]")
+                self.tracer.debug(self.smappeeInterfaceLogger, "{} - From=[{}], To=[{}]", smappeeCommand, self.fromTimeUtc[self.serviceLocationId], self.toTimeUtc)
 
                 self.appliances = "applianceId=1&applianceId=2&applianceId=15&applianceId=3&applianceId=34"
                 self.maxNumber = "20"
 
-                url = f"https://app1pub.smappee.net/dev/v3/servicelocation/{self.serviceLocationId}/events?{self.appliances}&maxNumber={self.maxNumber}&from={self.fromTimeUtc}&to={self.toTimeUtc}"
+                url = f"https://app1pub.smappee.net/dev/v3/servicelocation/{self.serviceLocationId}/events?{self.appliances}&maxNumber={self.maxNumber}&from={self.fromTimeUtc[self.serviceLocationId]}&to={self.toTimeUtc}"
 
                 # Documentation: https://smappee.atlassian.net/wiki/spaces/DEVAPI/pages/526450713/Get+Events
-                result_ok, reply = self.smappee_api_call(SMAPPEE_GET_API_CALL, url)
-
-                if result_ok:
-                    self.globals[QUEUES][PROCESS].put([COMMAND_GET_EVENTS, self.serviceLocationId, reply])
+                api_requests.append([COMMAND_GET_EVENTS, self.serviceLocationId, url, "events"])
 
                 #
                 # process = subprocess.Popen(
@@ -512,12 +570,21 @@ class ThreadSmappeeInterface(threading.Thread):
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
+        return api_requests
+
     def process_initialise(self):
         try:
+            # Avoid a full password grant if the token saved when the plugin last ran is still valid or can be refreshed
+            token_manager = self.globals[THREADS][TOKEN_MANAGER][THREAD]
+            if token_manager.access_token_valid() or (self.globals[CONFIG][REFRESH_TOKEN] != "" and token_manager.refresh_access_token(None)):
+                self.smappeeInterfaceLogger.info("Authenticated with Smappee (using saved token) but initialisation still in progress ...")
+                self.process_get_service_locations()
+                return
+
             url = "https://app1pub.smappee.net/dev/v3/oauth2/token"
 
             # Documentation: https://smappee.atlassian.net/wiki/spaces/DEVAPI/pages/8552463/Get+token
-            result_ok, reply = self.smappee_api_call(SMAPPEE_POST_API_CALL, url)
+            result_ok, reply = self.smappee_api_call(SMAPPEE_POST_API_CALL, url, self.get_token_post_data("password"))
 
             if result_ok:
                 self.globals[QUEUES][PROCESS].put([COMMAND_INITIALISE, "", reply])
@@ -593,71 +660,114 @@ class ThreadSmappeeInterface(threading.Thread):
             self.serviceLocationId = service_location_id
             self.actuatorId = actuator_id
 
-            process = subprocess.Popen(['curl', '-H', 'Content-Type: application/json', '-H',
-                                        'Authorization: Bearer ' + self.globals[CONFIG][ACCESS_TOKEN],
-                                        '-d', '{}',
-                                        'https://app1pub.smappee.net/dev/v1/servicelocation/' + self.serviceLocationId + '/actuator/' + self.actuatorId + '/'
-                                        + str(smappeeCommand).lower(), ''], stdout=subprocess.PIPE)
+            url = f"https://app1pub.smappee.net/dev/v1/servicelocation/{self.serviceLocationId}/actuator/{self.actuatorId}/{str(smappeeCommand).lower()}"
+
+            result_ok, reply = self.smappee_api_call(SMAPPEE_POST_API_CALL, url, None)
+
+            self.tracer.debug(self.smappeeInterfaceLogger, "Response to '{}' = {}", smappeeCommand, reply)
+
+            if result_ok:
+                self.globals[QUEUES][PROCESS].put([smappeeCommand, self.serviceLocationId, {"actuatorId": self.actuatorId, "response": reply}])
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def request_token_refresh(self):
+        # Called by the token manager (which ensures only one refresh is in progress at a time)
+        url = "https://app1pub.smappee.net/dev/v1/oauth2/token"
 
-            response = ""
-            for line in process.stdout:
-                line_string = line.decode("utf-8")
-                # self.smappeeInterfaceLogger.debug(f"Response to '{smappeeCommand}' = {line}")
-                response = response + line_string.strip()
+        # Documentation: https://smappee.atlassian.net/wiki/spaces/DEVAPI/pages/8552463/Get+token
+        result_ok, reply = self.smappee_api_call(SMAPPEE_POST_API_CALL, url, self.get_token_post_data("refresh_token"))
 
-            self.smappeeInterfaceLogger.debug(f"MERGED Response to '{smappeeCommand}' = {response}")
+        self.tracer.debug(self.smappeeInterfaceLogger, "Response to Refresh Token = {}", reply)
 
-            # No need to handle response
+        if not result_ok:
+            # The refresh token may itself have expired (e.g. saved before a long shutdown) - fall back to the password grant
+            self.tracer.debug(self.smappeeInterfaceLogger, "Refresh token rejected - authenticating with user name and password")
+            url = "https://app1pub.smappee.net/dev/v3/oauth2/token"
+            result_ok, reply = self.smappee_api_call(SMAPPEE_POST_API_CALL, url, self.get_token_post_data("password"))
+
+        return result_ok, reply
+
+    def create_api_session(self):
+        try:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=SMAPPEE_API_POOL_SIZE)
+            session.mount("https://", adapter)
+            return session
 
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-    def process_check_token_refresh(self):
+    def get_api_auth_headers(self):
         try:
-            # #TIME# self.currentTimeUtc = time.mktime(indigo.server.getTime().timetuple())
-            if self.currentTimeUtc > self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC]:
-                self.smappeeInterfaceLogger.debug(f"Refresh Token Request = {self.globals[CONFIG][REFRESH_TOKEN]}")
-                self.smappeeInterfaceLogger.debug(f"Refresh Token, currentUTC[{type(self.currentTimeUtc)}] = {self.currentTimeUtc},"
-                                                  f" expiresUTC[{type(self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC])}] = {self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC]}")
-
-                process = subprocess.Popen(
-                    ['curl', '-XPOST', '-H', 'application/x-www-form-urlencoded;charset=UTF-8', '-d',
-                     'grant_type=refresh_token&refresh_token='
-                     + self.globals[CONFIG][REFRESH_TOKEN]
-                     + '&client_id=' + self.globals[CONFIG][CLIENT_ID]
-                     + '&client_secret=' + self.globals[CONFIG][SECRET],
-                     'https://app1pub.smappee.net/dev/v1/oauth2/token', '-d', ''], stdout=subprocess.PIPE)
-
-                response = ""
-                for line in process.stdout:
-                    line_string = line.decode("utf-8")
-                    # self.smappeeInterfaceLogger.debug(f"Response to '{smappeeCommand}' = {line}")
-                    response = response + line_string.strip()
-
-                self.smappeeInterfaceLogger.debug(f"MERGED Response to Refresh Token = {response}")
-
-                self.globals[QUEUES][PROCESS].put([COMMAND_REFRESH_TOKEN, "", response])
+            # Only rebuild the authorisation headers when the access token has changed (initialise / refresh)
+            access_token = self.globals[CONFIG][ACCESS_TOKEN]
+            api_auth_cache = self.api_auth_cache
+            if api_auth_cache[0] != access_token:
+                api_auth_cache = (access_token, {"Authorization": f"Bearer {access_token}"})
+                self.api_auth_cache = api_auth_cache  # Single assignment publishes the token and its headers together
+            return api_auth_cache[1]
+
         except Exception as exception_error:
             self.exception_handler(exception_error, True)  # Log error and display failing statement
 
-    def smappee_api_call(self, is_post_api_call, api_url):
+    def get_token_post_data(self, grant_type):
+        try:
+            post_data = dict()
+            post_data["grant_type"] = grant_type
+            if grant_type == "refresh_token":
+                post_data["refresh_token"] = self.globals[CONFIG][REFRESH_TOKEN]
+            post_data["client_id"] = self.globals[CONFIG][CLIENT_ID]
+            post_data["client_secret"] = self.globals[CONFIG][SECRET]
+            if grant_type == "password":
+                post_data["username"] = self.globals[CONFIG][USER_NAME]
+                post_data["password"] = self.globals[CONFIG][PASSWORD]
+            return post_data
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+    def send_api_request(self, is_post_api_call, api_url, post_data):
+        if is_post_api_call and post_data is not None:
+            headers = {"Content-type": "application/x-www-form-urlencoded;charset=UTF-8"}
+            return self.api_session.post(api_url, headers=headers, data=post_data, timeout=(SMAPPEE_API_CONNECT_TIMEOUT, SMAPPEE_API_READ_TIMEOUT))
+        elif is_post_api_call:
+            return self.api_session.post(api_url, headers=self.get_api_auth_headers(), json=dict(), timeout=(SMAPPEE_API_CONNECT_TIMEOUT, SMAPPEE_API_READ_TIMEOUT))
+        else:
+            return self.api_session.get(api_url, headers=self.get_api_auth_headers(), timeout=(SMAPPEE_API_CONNECT_TIMEOUT, SMAPPEE_API_READ_TIMEOUT))
+
+    def send_api_request_with_backoff(self, is_post_api_call, api_url, post_data, reserve_tokens=0.0):
+        # Sends the request, retrying (after backing off) if Smappee responds 429 / 503
+        api_call_start_time = time.time()
+        for attempt in range(SMAPPEE_API_MAX_RETRIES + 1):
+            self.globals[API_RATE_LIMITER].acquire(reserve_tokens)  # Wait for permission to send (rate limit / backoff)
+            reply = self.send_api_request(is_post_api_call, api_url, post_data)
+            self.tracer.debug(self.smappeeInterfaceLogger, "Smappee API call completed in {:.3f} seconds [Status={}]: {}", time.time() - api_call_start_time, reply.status_code, api_url)
+            if (reply.status_code != 429 and reply.status_code != 503) or attempt == SMAPPEE_API_MAX_RETRIES:
+                return reply
+            self.globals[API_RATE_LIMITER].throttled(reply.headers.get("Retry-After"))
+
+    def smappee_api_call(self, is_post_api_call, api_url, post_data=None, reserve_tokens=0.0):
+        # post_data: form data for an OAuth2 token request; if None, a POST is sent as an authorised empty JSON body (e.g. actuator on / off)
+        # reserve_tokens: rate limiter tokens a background request (e.g. backfill) must leave for live requests
         try:
             error_code = None
             error_message_ui = ""
             try:
                 status_code = -1
-                if is_post_api_call:
-                    post_data = dict()
-                    post_data["grant_type"] = "password"
-                    post_data["client_id"] = self.globals[CONFIG][CLIENT_ID]
-                    post_data["client_secret"] = self.globals[CONFIG][SECRET]
-                    post_data["username"] = self.globals[CONFIG][USER_NAME]
-                    post_data["password"] = self.globals[CONFIG][PASSWORD]
-                    headers = {"Content-type": "application/x-www-form-urlencoded;charset=UTF-8"}
-                    reply = requests.post(api_url, headers=headers, data=post_data)
+                if post_data is None:
+                    # Authorised call: wait for any token refresh in progress and retry once with the new token if rejected as unauthorised
+                    token_manager = self.globals[THREADS][TOKEN_MANAGER][THREAD]
+                    token_manager.wait_for_refresh()
+                    access_token = self.globals[CONFIG][ACCESS_TOKEN]
+                    reply = self.send_api_request_with_backoff(is_post_api_call, api_url, post_data, reserve_tokens)
+                    if reply.status_code == 401 and token_manager.refresh_access_token(access_token):
+                        reply = self.send_api_request_with_backoff(is_post_api_call, api_url, post_data, reserve_tokens)
                 else:
-                    headers = {"Authorization": f"Bearer {self.globals[CONFIG][ACCESS_TOKEN]}"}
-                    reply = requests.get(api_url, headers=headers)
+                    reply = self.send_api_request_with_backoff(is_post_api_call, api_url, post_data)
+                if reply.status_code < 400:
+                    self.globals[API_RATE_LIMITER].succeeded()
                 reply.raise_for_status()  # raise an HTTP error if one coccurred
                 status_code = reply.status_code
                 # print(f"Reply Status: {reply.status_code}, Text: {reply.text}")
@@ -700,7 +810,7 @@ class ThreadSmappeeInterface(threading.Thread):
                 return False, [error_code, error_message_ui]
 
             if status_code == 200:
-                reply = reply.json()  # decode JSON
+                reply = reply.json() if reply.content else dict()  # decode JSON (actuator calls may return an empty body)
                 # # Check Filter
                 # if FILTERS in self.globals:
                 #     if len(self.globals[FILTERS]) > 0 and self.globals[FILTERS] != ["-0-"]:
@@ -712,10 +822,10 @@ class ThreadSmappeeInterface(threading.Thread):
             else:
                 # TODO: Sort this out!
                 return_ok = False
-                if error_message_ui is "":
-                    self.smappeeInterfaceLogger.error(f"Error [{status_code}] accessing Smappee '{starling_hub_dev.name}': {error_code}")
+                if error_message_ui == "":
+                    self.smappeeInterfaceLogger.error(f"Error [{status_code}] accessing Smappee '{api_url}': {error_code}")
                 else:
-                    self.smappeeInterfaceLogger.error(f"Error [{status_code}] accessing Smappee '{starling_hub_dev.name}': {error_code} - {error_message_ui}")
+                    self.smappeeInterfaceLogger.error(f"Error [{status_code}] accessing Smappee '{api_url}': {error_code} - {error_message_ui}")
                 return return_ok, [error_code, error_message_ui]
 
         except Exception as exception_error:
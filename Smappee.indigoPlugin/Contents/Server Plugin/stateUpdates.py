@@ -0,0 +1,124 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - State Updates © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import logging
+import sys
+import threading
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeStateUpdates:
+
+    # This class collects the device state updates made whilst handling a Smappee response.
+    # Each device's updates are then written to the Indigo server by flush with a single updateStatesOnServer call, rather than one call per state.
+    # A collector is created per response handled, so responses for different service locations never share one.
+    # Updates that wouldn't change the value last written (see SmappeeStateShadow) are skipped
+
+    def __init__(self, pluginGlobals):
+
+        self.globals = pluginGlobals
+
+        self.stateUpdatesLogger = logging.getLogger("Plugin.stateUpdates")
+        self.tracer = self.globals[TRACER]
+        self.stateShadow = self.globals[STATE_SHADOW]
+
+        self.devices = dict()  # Per device id, the device to be updated
+        self.updates = dict()  # Per device id, dict of state key -> keyValue dict (a later update of a state replaces an earlier one)
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.stateUpdatesLogger.error(log_message)
+
+    def update(self, dev, key, value, uiValue=None, decimalPlaces=None):
+        # Same arguments as dev.updateStateOnServer
+        keyValue = {"key": key, "value": value}
+        if uiValue is not None:
+            keyValue["uiValue"] = uiValue
+        if decimalPlaces is not None:
+            keyValue["decimalPlaces"] = decimalPlaces
+        self.devices[dev.id] = dev
+        self.updates.setdefault(dev.id, dict())[key] = keyValue
+
+    def flush(self):
+        statesWritten = 0
+        statesSkipped = 0
+        for devId, updates in self.updates.items():
+            try:
+                changedUpdates = [keyValue for keyValue in updates.values() if self.stateShadow.changed(devId, keyValue)]
+                statesSkipped += len(updates) - len(changedUpdates)
+                if len(changedUpdates) > 0:
+                    self.devices[devId].updateStatesOnServer(changedUpdates)
+                    self.stateShadow.written(devId, changedUpdates)
+                    statesWritten += len(changedUpdates)
+
+            except Exception as exception_error:
+                self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+        self.stateShadow.count(statesWritten, statesSkipped)
+        self.tracer.debug(self.stateUpdatesLogger, "{} states written to {} devices, {} unchanged states skipped", statesWritten, len(self.updates), statesSkipped)
+
+        self.devices = dict()
+        self.updates = dict()
+
+
+class SmappeeStateShadow:
+
+    # This class remembers the value and uiValue last written by SmappeeStateUpdates for each device state, so that unchanged states aren't rewritten.
+    # States also written other than through SmappeeStateUpdates must be kept in step: deviceStartComm / deviceStopComm forget the device's entries
+    # and the resets of accumulated totals (smappeeInterface) and the MQTT handlers write through SmappeeStateUpdates
+
+    def __init__(self):
+
+        self.shadowLock = threading.Lock()
+        self.shadowStates = dict()  # Per device id, dict of state key -> (value, uiValue) last written
+        self.statesWritten = 0
+        self.statesSkipped = 0
+
+    def changed(self, devId, keyValue):
+        # True if the update would change the state (or the state hasn't been written since the device was last forgotten)
+        with self.shadowLock:
+            shadowState = self.shadowStates.get(devId, dict()).get(keyValue["key"])
+        if shadowState is None:
+            return True
+        shadowValue, shadowUiValue = shadowState
+        if keyValue.get("uiValue") != shadowUiValue:
+            return True  # Always written if the displayed value would change
+        tolerance = SMAPPEE_STATE_WRITE_TOLERANCES.get(keyValue["key"])
+        if tolerance is not None and isinstance(shadowValue, (int, float)) and isinstance(keyValue["value"], (int, float)):
+            return abs(keyValue["value"] - shadowValue) > tolerance
+        return keyValue["value"] != shadowValue
+
+    def written(self, devId, keyValues):
+        with self.shadowLock:
+            shadowStates = self.shadowStates.setdefault(devId, dict())
+            for keyValue in keyValues:
+                shadowStates[keyValue["key"]] = (keyValue["value"], keyValue.get("uiValue"))
+
+    def forget_device(self, devId):
+        with self.shadowLock:
+            self.shadowStates.pop(devId, None)
+
+    def count(self, statesWritten, statesSkipped):
+        with self.shadowLock:
+            self.statesWritten += statesWritten
+            self.statesSkipped += statesSkipped
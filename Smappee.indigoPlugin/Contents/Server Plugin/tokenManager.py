@@ -0,0 +1,121 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Token Manager © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import logging
+import sys
+import threading
+import time
+import traceback
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class ThreadTokenManager(threading.Thread):
+
+    # This class refreshes the Smappee access token ahead of its expiry. Only one refresh runs at a time; API calls wait for it to complete
+
+    def __init__(self, pluginGlobals, event, requestTokenRefresh, saveToken):
+
+        threading.Thread.__init__(self)
+
+        self.globals = pluginGlobals
+        self.threadStop = event
+        self.requestTokenRefresh = requestTokenRefresh  # Function that sends the refresh grant to Smappee and returns (result_ok, reply)
+        self.saveToken = saveToken  # Function that saves the token in the plugin preferences so that it survives a restart
+
+        self.tokenManagerLogger = logging.getLogger("Plugin.tokenManager")
+
+        self.refreshLock = threading.Lock()  # Held for the duration of a refresh (single-flight)
+        self.refreshFailed = False  # Used to log a failing refresh once rather than on every retry
+
+        self.refreshCount = 0
+        self.unauthorisedRetryCount = 0
+
+    def exception_handler(self, exception_error_message, log_failing_statement):
+        filename, line_number, method, statement = traceback.extract_tb(sys.exc_info()[2])[-1]
+        module = filename.split('/')
+        log_message = f"'{exception_error_message}' in module '{module[-1]}', method '{method}'"
+        if log_failing_statement:
+            log_message = log_message + f"\n   Failing statement [line {line_number}]: '{statement}'"
+        else:
+            log_message = log_message + f" at line {line_number}"
+        self.tokenManagerLogger.error(log_message)
+
+    def run(self):
+        try:
+            waitSeconds = SMAPPEE_TOKEN_CHECK_SECONDS
+            while not self.threadStop.wait(waitSeconds):
+                waitSeconds = SMAPPEE_TOKEN_CHECK_SECONDS
+                if self.globals[CONFIG][REFRESH_TOKEN] == "":
+                    continue  # Not yet authenticated
+
+                secondsToRefresh = self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC] - time.time()
+                if secondsToRefresh <= 0.0:
+                    if not self.refresh_access_token(None):
+                        waitSeconds = SMAPPEE_TOKEN_RETRY_SECONDS
+                else:
+                    waitSeconds = min(secondsToRefresh, SMAPPEE_TOKEN_CHECK_SECONDS)
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+
+        self.tokenManagerLogger.debug(f"Token Manager Thread ended.")
+
+    def wait_for_refresh(self):
+        # Blocks whilst a refresh is in progress so that API calls are sent with the new access token
+        with self.refreshLock:
+            pass
+
+    def refresh_access_token(self, failedAccessToken):
+        # failedAccessToken is the access token a call was rejected with (401); if it has already been replaced, no further refresh is needed
+        # Returns True if a valid access token is now available
+        try:
+            with self.refreshLock:
+                if failedAccessToken is not None:
+                    self.unauthorisedRetryCount += 1
+                    if failedAccessToken != self.globals[CONFIG][ACCESS_TOKEN]:
+                        return True
+
+                self.tokenManagerLogger.debug(f"Refreshing access token, expiresUTC = {self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC]}")
+
+                result_ok, reply = self.requestTokenRefresh()
+                if not result_ok or "access_token" not in reply:
+                    if not self.refreshFailed:
+                        self.tokenManagerLogger.error(f"Unable to refresh the Smappee access token: {reply}")
+                    self.refreshFailed = True
+                    return False
+
+                self.store_token(reply)
+                self.refreshCount += 1
+                if self.refreshFailed:
+                    self.tokenManagerLogger.info("Smappee access token refreshed")
+                self.refreshFailed = False
+                return True
+
+        except Exception as exception_error:
+            self.exception_handler(exception_error, True)  # Log error and display failing statement
+            return False
+
+    def store_token(self, reply):
+        # The access token is stored last so that calls picking it up already see the matching expiry and refresh token
+        self.globals[CONFIG][TOKEN_EXPIRES_IN] = int(reply.get("expires_in", 0))
+        self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC] = time.time() + float(self.globals[CONFIG][TOKEN_EXPIRES_IN] - SMAPPEE_TOKEN_REFRESH_MARGIN_SECONDS)
+        if "refresh_token" in reply:
+            self.globals[CONFIG][REFRESH_TOKEN] = reply["refresh_token"]
+        self.globals[CONFIG][ACCESS_TOKEN] = reply["access_token"]
+        self.saveToken()
+
+    def access_token_valid(self):
+        return self.globals[CONFIG][ACCESS_TOKEN] != "" and time.time() < self.globals[CONFIG][TOKEN_EXPIRES_DATETIME_UTC]
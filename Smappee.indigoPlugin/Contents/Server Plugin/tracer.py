@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Smappee - Tracer © Autolog 2018-2023
+#
+
+# noinspection PyUnresolvedReferences
+# ============================== Native Imports ===============================
+import datetime
+import threading
+
+# ============================== Custom Imports ===============================
+try:
+    import indigo  # noqa
+except ImportError:
+    pass
+
+# ============================== Plugin Imports ===============================
+from constants import *
+
+
+class SmappeeTracer:
+
+    # This class outputs the plugin's debug (trace) messages. The logging levels are set on the Event Log and Plugin Log handlers rather than the
+    # loggers, so a logger always accepts debug messages and any f-string passed to it is built even when it will be discarded.
+    # Instead, a trace message is a str.format template plus arguments that is only formatted (and passed to the logger) if debugging is enabled
+
+    def __init__(self):
+
+        self.enabled = False  # True if either the Event Log or the Plugin Log is at the debugging level - checked before doing any work
+
+        self.sampleEvery = SMAPPEE_TRACE_SAMPLE_EVERY
+        self.sampleCounts = dict()  # Per sample key, number of sampled trace calls made
+        self.sampleLock = threading.Lock()
+
+    def set_level(self, event_log_level, plugin_log_level):
+        self.enabled = min(event_log_level, plugin_log_level) <= LOG_LEVEL_DEBUGGING
+        with self.sampleLock:
+            self.sampleCounts = dict()
+
+    def debug(self, logger, message, *args):
+        # e.g. self.tracer.debug(self.logger, "Location [{}]: {} records", serviceLocationId, len(records))
+        if not self.enabled:
+            return
+        logger.debug(message.format(*args) if args else message, stacklevel=2)  # stacklevel: log the caller's function name
+
+    def sampled(self, key):
+        # True for the first and then every sampleEvery'th call for the key (e.g. a trace message output for every reading of a poll)
+        if not self.enabled:
+            return False
+        with self.sampleLock:
+            count = self.sampleCounts.get(key, 0)
+            self.sampleCounts[key] = count + 1
+        return count % self.sampleEvery == 0
+
+    def debug_sampled(self, logger, key, message, *args):
+        if not self.sampled(key):
+            return
+        logger.debug((message.format(*args) if args else message) + f" [sampled 1 in {self.sampleEvery}]", stacklevel=2)
+
+
+class TraceTimestamp:
+
+    # A Smappee timestamp (utc ms) as a trace argument - only converted to a date / time string if the trace message is output
+
+    __slots__ = ("timestampUtc", "timestampFormat")
+
+    def __init__(self, timestampUtc, timestampFormat="%Y-%m-%d %H:%M:%S"):
+        self.timestampUtc = timestampUtc
+        self.timestampFormat = timestampFormat
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+    def __str__(self):
+        return datetime.datetime.fromtimestamp(int(int(self.timestampUtc) / 1000)).strftime(self.timestampFormat)